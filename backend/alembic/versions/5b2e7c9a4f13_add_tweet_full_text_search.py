@@ -0,0 +1,82 @@
+"""Add full-text search vector and index to tweets
+
+Revision ID: 5b2e7c9a4f13
+Revises: d81e1c886be2
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e7c9a4f13'
+down_revision = 'd81e1c886be2'
+branch_labels = None
+depends_on = None
+
+
+# Weights: the learner's own text first, then the correction, then the explanation
+SEARCH_VECTOR_FUNCTION = """
+    CREATE OR REPLACE FUNCTION tweet_search_vector(original_text text, corrected_text text, explanation text)
+    RETURNS tsvector LANGUAGE sql IMMUTABLE AS $$
+        SELECT setweight(to_tsvector('english'::regconfig, coalesce(original_text, '')), 'A') ||
+               setweight(to_tsvector('english'::regconfig, coalesce(corrected_text, '')), 'B') ||
+               setweight(to_tsvector('english'::regconfig, coalesce(explanation, '')), 'C')
+    $$
+"""
+TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION tweet_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := tweet_search_vector(NEW.original_text, NEW.corrected_text, NEW.explanation);
+        RETURN NEW;
+    END
+    $$
+"""
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    # A generated column would rewrite the whole table under an ACCESS EXCLUSIVE
+    # lock. Instead a nullable column (no rewrite) is kept up to date by a trigger
+    # from now on, existing rows are filled in short batches, and the index is
+    # built without blocking writes.
+    op.execute("ALTER TABLE tweet ADD COLUMN IF NOT EXISTS search_vector tsvector")
+    op.execute(SEARCH_VECTOR_FUNCTION)
+    op.execute(TRIGGER_FUNCTION)
+    op.execute("DROP TRIGGER IF EXISTS tweet_search_vector_update ON tweet")
+    op.execute(
+        "CREATE TRIGGER tweet_search_vector_update "
+        "BEFORE INSERT OR UPDATE OF original_text, corrected_text, explanation ON tweet "
+        "FOR EACH ROW EXECUTE FUNCTION tweet_search_vector_trigger()"
+    )
+    # btree_gin lets user_id share the GIN index, so a search only visits the user's postings
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        # Rows inserted from here on already have a vector, so walking up to the current max id is enough
+        low, high = bind.execute(sa.text("SELECT min(id), max(id) FROM tweet")).one()
+        while low is not None and low <= high:
+            # Each batch commits on its own and locks only its rows
+            bind.execute(
+                sa.text(
+                    "UPDATE tweet SET search_vector = tweet_search_vector(original_text, corrected_text, explanation) "
+                    "WHERE id >= :low AND id < :high AND search_vector IS NULL"
+                ),
+                {"low": low, "high": low + BACKFILL_BATCH_SIZE},
+            )
+            low += BACKFILL_BATCH_SIZE
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tweet_user_id_search_vector "
+            "ON tweet USING gin (user_id, search_vector)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tweet_user_id_search_vector")
+    op.execute("DROP TRIGGER IF EXISTS tweet_search_vector_update ON tweet")
+    op.execute("DROP FUNCTION IF EXISTS tweet_search_vector_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS tweet_search_vector(text, text, text)")
+    op.drop_column('tweet', 'search_vector')
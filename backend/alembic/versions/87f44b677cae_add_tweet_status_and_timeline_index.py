@@ -0,0 +1,31 @@
+"""Add tweet status and per-user timeline index
+
+Revision ID: 87f44b677cae
+Revises: 3feced372fec
+Create Date: 2026-10-18 12:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '87f44b677cae'
+down_revision = '3feced372fec'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tweet', sa.Column('status', sa.String(length=16), server_default='done', nullable=False))
+    op.create_index(
+        'ix_tweet_user_id_created_at_id',
+        'tweet',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tweet_user_id_created_at_id', table_name='tweet')
+    op.drop_column('tweet', 'status')
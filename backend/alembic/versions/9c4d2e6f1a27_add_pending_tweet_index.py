@@ -0,0 +1,30 @@
+"""Add partial index on pending tweets for the stale correction sweep
+
+Revision ID: 9c4d2e6f1a27
+Revises: 5b2e7c9a4f13
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4d2e6f1a27'
+down_revision = '5b2e7c9a4f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Only pending tweets are indexed, so the index stays tiny however large the table grows
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tweet_pending_updated_at "
+            "ON tweet (updated_at) WHERE status = 'pending'"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tweet_pending_updated_at")
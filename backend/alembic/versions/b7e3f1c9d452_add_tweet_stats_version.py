@@ -0,0 +1,24 @@
+"""Add timeline version to tweet_stats
+
+Revision ID: b7e3f1c9d452
+Revises: 9c4d2e6f1a27
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3f1c9d452'
+down_revision = '9c4d2e6f1a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tweet_stats', sa.Column('version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('tweet_stats', 'version')
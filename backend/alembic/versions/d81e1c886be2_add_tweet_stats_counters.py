@@ -0,0 +1,49 @@
+"""Add per-user tweet counters
+
+Revision ID: d81e1c886be2
+Revises: 87f44b677cae
+Create Date: 2026-10-18 13:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81e1c886be2'
+down_revision = '87f44b677cae'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('tweet_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('perfect', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('corrections', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_tweet_stats_id'), 'tweet_stats', ['id'], unique=False)
+
+    # Backfill from the existing tweets
+    op.execute("""
+        INSERT INTO tweet_stats (user_id, total, perfect, corrections)
+        SELECT user_id,
+               count(*),
+               count(*) FILTER (WHERE status != 'pending' AND original_text = corrected_text),
+               count(*) FILTER (WHERE status != 'pending' AND original_text != corrected_text)
+        FROM tweet
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tweet_stats_id'), table_name='tweet_stats')
+    op.drop_table('tweet_stats')
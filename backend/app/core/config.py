@@ -13,299 +13,131 @@ class Settings(BaseSettings):
     
     # Database Settings
     DATABASE_URL: str
+    TWEET_STORE: str = "database"  # "database" or "memory" (process-local, for benchmarks)
+    TWEET_COUNTERS_RECONCILE_SECONDS: int = 3600  # Recompute per-user counters to repair drift, 0 disables
+    TWEET_ETAG_ENABLED: bool = True  # ETag/304 on GET /tweets and /tweets/count, versioned by the tweet_stats row
+    TWEET_EXPORT_BATCH_SIZE: int = 1000  # Rows fetched from the server-side cursor and sent per chunk
+    TWEET_IMPORT_BATCH_SIZE: int = 1000  # Rows per multi-row INSERT and commit
+    TWEET_IMPORT_MAX_ROWS: int = 100000  # Per request
+    TWEET_IMPORT_MAX_LINE_BYTES: int = 65536
+    DB_ECHO: bool = False  # Log every SQL statement (debugging only)
+    DB_POOL_SIZE: int = 10  # Connections kept open per process
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT_SECONDS: float = 5.0  # Max wait for a free connection
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this
+    DB_POOL_PRE_PING: bool = True  # Check connections on checkout, drops ones the server closed
+    DB_STATEMENT_CACHE_SIZE: int = 500  # asyncpg prepared statements per connection, 0 behind pgbouncer
     
     # Redis Settings
     REDIS_URL: str
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.5
+    REDIS_RETRY_AFTER_SECONDS: float = 30.0  # Back off after a Redis error
     
     # JWT Settings
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Password hashing Settings (bcrypt runs on a bounded thread pool, off the event loop)
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # Hashes with another cost are re-hashed on the next login
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32  # Running + queued hashes before logins get a 503
+    
+    # Authenticated-user cache Settings (skip the user lookup on every request)
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60  # Upper bound on how stale is_active can be
+    USER_CACHE_REDIS_ENABLED: bool = False
+    
+    # Response compression Settings (brotli when installed and accepted, else gzip)
+    RESPONSE_COMPRESSION_ENABLED: bool = True
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024  # Smaller bodies are sent as is
+    RESPONSE_GZIP_LEVEL: int = 6  # 9 costs much more CPU for a few percent less
+    RESPONSE_BROTLI_QUALITY: int = 4  # Dynamic-content level; 11 is for static assets
+    
     # OpenAI Settings
     OPENAI_API_KEY: Optional[str] = None
+    OPENAI_BASE_URL: Optional[str] = None  # Point at a local stub for benchmarks
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
+    OPENAI_MAX_CONCURRENCY: int = 16  # Max in-flight completions per process
+    OPENAI_MAX_CONNECTIONS: int = 32
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 16
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    OPENAI_TIMEOUT_SECONDS: float = 30.0  # Per-call deadline
+    OPENAI_MAX_RETRIES: int = 1
+    OPENAI_EXPLANATION_MAX_TOKENS: int = 200  # Output budget for the explanation, on top of the corrected text
+    OPENAI_MAX_OUTPUT_TOKENS: int = 4096  # Completion limit of OPENAI_MODEL; larger batches are split
+    OPENAI_LOG_TOKEN_SAVINGS: bool = True  # Print prompt and max_tokens savings per completion
+    OPENAI_SINGLE_FLIGHT_ENABLED: bool = True  # Identical concurrent corrections share one call
+
+    # Hedged requests Settings (second attempt when the first is slower than usual)
+    OPENAI_HEDGE_ENABLED: bool = False
+    OPENAI_HEDGE_PERCENTILE: float = 95.0  # Hedge after this percentile of recent latencies
+    OPENAI_HEDGE_DELAY_SECONDS: Optional[float] = None  # Fixed delay instead of the percentile
+    OPENAI_HEDGE_MIN_DELAY_SECONDS: float = 0.25
+    OPENAI_HEDGE_MAX_RATIO: float = 0.1  # At most this share of requests is hedged
+
+    # Circuit breaker Settings (fail fast to the fallback while the API is failing)
+    OPENAI_CIRCUIT_ENABLED: bool = True
+    OPENAI_CIRCUIT_FAILURE_RATE: float = 0.5
+    OPENAI_CIRCUIT_MIN_CALLS: int = 20  # Calls in the window before the rate is trusted
+    OPENAI_CIRCUIT_WINDOW_SECONDS: float = 30.0
+    OPENAI_CIRCUIT_OPEN_SECONDS: float = 15.0  # Time before half-open probing
+    OPENAI_CIRCUIT_HALF_OPEN_PROBES: int = 3
+
+    # Rate limiting Settings (POST /tweets and /tweets/stream; 429 + Retry-After when exceeded)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REDIS_ENABLED: bool = True  # Shared limits; per-process limits while Redis is unavailable
+    RATE_LIMIT_USER_PER_MINUTE: float = 20.0  # Sustained corrections per user
+    RATE_LIMIT_USER_BURST: int = 10
+    RATE_LIMIT_GLOBAL_PER_MINUTE: float = 3000.0  # Keep below the OpenAI requests-per-minute limit
+    RATE_LIMIT_GLOBAL_BURST: int = 100
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 10000  # Full buckets are dropped past this many
+    CORRECTION_USER_MAX_IN_FLIGHT: int = 3  # Concurrent synchronous corrections per user
+    CORRECTION_SLOT_LEASE_SECONDS: float = 120.0  # Frees slots of a process that died mid-correction
+    CORRECTION_SLOT_RETRY_AFTER_SECONDS: int = 2
+
+    # Model routing Settings (fast model first, OPENAI_MODEL only when needed)
+    OPENAI_FAST_MODEL: Optional[str] = None  # e.g. "gpt-4o-mini" with OPENAI_MODEL="gpt-4o"; unset disables routing
+    OPENAI_ROUTING_FAST_MAX_CHARS: int = 140  # Longer tweets go straight to OPENAI_MODEL
+    OPENAI_ROUTING_MIN_CONFIDENCE: float = 0.8  # Escalate when the fast model is less sure
+    OPENAI_ROUTING_MAX_EDIT_RATIO: float = 0.35  # Escalate when the fast model rewrote more than this share
+
+    # Micro-batching Settings (pack concurrent corrections into one completion)
+    OPENAI_BATCH_ENABLED: bool = False
+    OPENAI_BATCH_MAX_SIZE: int = 8
+    OPENAI_BATCH_WINDOW_MS: int = 20
+
+    # Background correction Settings
+    TWEET_CORRECTION_MODE: str = "sync"  # "sync" or "async" (202 + background workers)
+    CORRECTION_QUEUE_BACKEND: str = "memory"  # "memory" or "redis"
+    CORRECTION_QUEUE_MAX_SIZE: int = 1000
+    CORRECTION_WORKERS: int = 4
+    CORRECTION_MAX_ATTEMPTS: int = 3
+    CORRECTION_RETRY_BASE_SECONDS: float = 1.0
+    CORRECTION_DEAD_LETTER_MAX_SIZE: int = 1000
+    CORRECTION_JOB_LEASE_SECONDS: float = 600.0  # Redis backend: jobs held longer by a worker are re-queued
+    CORRECTION_PENDING_TIMEOUT_SECONDS: int = 900  # Pending tweets untouched this long get one last attempt
+    CORRECTION_SWEEP_SECONDS: int = 60  # How often to look for both, 0 disables
+
+    # Local grammar pre-check Settings (skip the LLM for text that is already correct)
+    PRECHECK_ENABLED: bool = True
+    PRECHECK_MIN_CONFIDENCE: float = 0.9
+    PRECHECK_MAX_WORDS: int = 40
+    # Share of "clean" tweets still sent to the LLM to measure accuracy (llm_corrected_by_decision
+    # in the pre-check stats). 1.0 is shadow mode: nothing is skipped, for trying out new rules.
+    PRECHECK_SHADOW_RATE: float = 0.1
+    PRECHECK_DICTIONARY_PATH: Optional[str] = None  # Extra word list, e.g. /usr/share/dict/words
+
+    # Correction cache Settings
+    CORRECTION_CACHE_ENABLED: bool = True
+    CORRECTION_CACHE_MAX_SIZE: int = 10000  # Entries kept in the in-process LRU
+    CORRECTION_CACHE_LOCAL_TTL_SECONDS: int = 600
+    CORRECTION_CACHE_REDIS_ENABLED: bool = True
+    CORRECTION_CACHE_REDIS_TTL_SECONDS: int = 7 * 24 * 3600
     
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 
 settings = Settings()
-
-
-# app/core/security.py
-from datetime import datetime, timedelta
-from typing import Any, Optional, Union
-
-from jose import jwt
-from passlib.context import CryptContext
-
-from app.core.config import settings
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
-    """
-    Create a JWT access token
-    """
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """
-    Verify a password against a hash
-    """
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """
-    Hash a password
-    """
-    return pwd_context.hash(password)
-
-
-# app/schemas/user.py
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
-
-
-class UserBase(BaseModel):
-    email: Optional[EmailStr] = None
-    username: str
-    is_active: Optional[bool] = True
-
-
-class UserCreate(UserBase):
-    email: EmailStr
-    password: str = Field(..., min_length=8)
-
-
-class UserUpdate(UserBase):
-    password: Optional[str] = Field(None, min_length=8)
-
-
-class UserInDBBase(UserBase):
-    id: int
-
-    class Config:
-        from_attributes = True
-
-
-class User(UserInDBBase):
-    pass
-
-
-class UserInDB(UserInDBBase):
-    hashed_password: str
-
-
-# app/schemas/token.py
-from pydantic import BaseModel
-from typing import Optional
-
-
-class Token(BaseModel):
-    access_token: str
-    token_type: str = "bearer"
-
-
-class TokenPayload(BaseModel):
-    sub: Optional[int] = None
-
-
-# app/schemas/tweet.py
-from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
-
-
-class TweetBase(BaseModel):
-    original_text: str = Field(..., max_length=280)
-
-
-class TweetCreate(TweetBase):
-    pass
-
-
-class TweetUpdate(TweetBase):
-    corrected_text: Optional[str] = Field(None, max_length=280)
-    explanation: Optional[str] = None
-
-
-class TweetInDBBase(TweetBase):
-    id: int
-    user_id: int
-    created_at: datetime
-    corrected_text: Optional[str] = None
-    explanation: Optional[str] = None
-
-    class Config:
-        from_attributes = True
-
-
-class Tweet(TweetInDBBase):
-    pass
-
-
-# app/services/auth.py
-from datetime import timedelta
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
-
-from app.core.config import settings
-from app.core.security import verify_password
-from app.db.session import get_db
-from app.models.user import User
-from app.schemas.token import TokenPayload
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
-
-async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
-    """
-    Authenticate a user by username and password
-    """
-    user = await db.query(User).filter(User.username == username).first()
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):
-        return None
-    return user
-
-async def get_current_user(
-    db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
-    """
-    Get the current user from the token
-    """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-        
-        if token_data.sub is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = await db.query(User).filter(User.id == token_data.sub).first()
-    
-    if not user:
-        raise credentials_exception
-    
-    if not user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    
-    return user
-
-
-# app/routers/auth.py
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.core.config import settings
-from app.core.security import create_access_token
-from app.db.session import get_db
-from app.schemas.token import Token
-from app.services.auth import authenticate_user
-
-router = APIRouter()
-
-@router.post("/login", response_model=Token)
-async def login_access_token(
-    db: AsyncSession = Depends(get_db),
-    form_data: OAuth2PasswordRequestForm = Depends()
-) -> Token:
-    """
-    OAuth2 compatible token login, get an access token for future requests
-    """
-    user = await authenticate_user(db, form_data.username, form_data.password)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    return Token(
-        access_token=create_access_token(
-            user.id, expires_delta=access_token_expires
-        )
-    )
-
-
-# app/routers/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any
-
-from app.core.security import get_password_hash
-from app.db.session import get_db
-from app.models.user import User
-from app.schemas.user import User as UserSchema, UserCreate
-from app.services.auth import get_current_user
-
-router = APIRouter()
-
-@router.post("/", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
-async def create_user(
-    user_in: UserCreate,
-    db: AsyncSession = Depends(get_db),
-) -> Any:
-    """
-    Create a new user
-    """
-    # Check if user already exists
-    db_user = await db.query(User).filter(
-        (User.email == user_in.email) | (User.username == user_in.username)
-    ).first()
-    
-    if db_user:
-        if db_user.email == user_in.email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered",
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken",
-            )
-    
-    # Create new user
-    db_user = User(
-        email=user_in.email,
-        username=user_in.username,
-        hashed_password=get_password_hash(user_in.password),
-    )
-    
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
-    
-    return db_user
-
-@router.get("/me", response_model=UserSchema)
-async def read_users_me(
-    current_user: User = Depends(get_current_user),
-) -> Any:
-    """
-    Get current user
-    """
-    return current_user
\ No newline at end of file
@@ -0,0 +1,44 @@
+# app/core/responses.py
+import json
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the standard library encoder
+    orjson = None
+
+
+def json_bytes(content: Any) -> bytes:
+    """
+    Compact UTF-8 JSON, with orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when it is installed
+
+    Routes that already hold plain, trusted dicts (e.g. rows from the tweet store)
+    can return this directly to skip response_model validation; FastAPI then
+    only uses the model for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_bytes(content)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against etag, as required for GET
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
@@ -1,13 +1,38 @@
 # app/core/security.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional, Union
+from typing import Any, Optional, Tuple, Union
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes with any other cost factor count as outdated and are upgraded on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool keeps it off the event loop
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_pending = 0
+
+AUTH_SECONDS = Histogram("twinglish_auth_seconds", "Time spent authenticating, per step (login, token)", ("step",))
+AUTH_FAILURES = Counter("twinglish_auth_failures_total", "Rejected logins and tokens by reason", ("reason",))
+PASSWORD_HASH_REJECTED = Counter(
+    "twinglish_password_hash_rejected_total", "Password checks refused because PASSWORD_HASH_MAX_PENDING was reached"
+)
+Gauge("twinglish_password_hash_pending", "Password hashes running or queued on the hashing pool", lambda: _hash_pending)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when PASSWORD_HASH_MAX_PENDING password hashes are already running or queued"""
 
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -32,4 +57,42 @@ def get_password_hash(password: str) -> str:
     """
     Hash a password
     """
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+async def _run_password_work(func, *args):
+    global _hash_executor, _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        PASSWORD_HASH_REJECTED.inc()
+        raise PasswordHasherBusy("Too many password checks in progress")
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the hashing pool
+
+    Returns (valid, new_hash). new_hash is set when the stored hash uses an outdated
+    scheme or cost factor and should replace it. Raises PasswordHasherBusy when the
+    pool is saturated.
+    """
+    return await _run_password_work(pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password on the hashing pool, raising PasswordHasherBusy when it is saturated
+    """
+    return await _run_password_work(pwd_context.hash, password)
+
+def password_hash_stats() -> dict:
+    return {"pending": _hash_pending, "workers": settings.PASSWORD_HASH_WORKERS}
+
+def close_password_executor() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
\ No newline at end of file
@@ -4,3 +4,4 @@ from app.models.base import Base
 from app.models.user import User
 from app.models.tweet import Tweet
 
+from app.models.tweet_stats import TweetStats
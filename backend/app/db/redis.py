@@ -0,0 +1,78 @@
+# app/db/redis.py
+import time
+from typing import Any, Optional
+
+from app.core.config import settings
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # Redis is optional, callers fall back to in-process state
+    aioredis = None
+
+_redis: Optional[Any] = None
+_blocking_redis: Optional[Any] = None
+_retry_at = 0.0
+
+
+def get_redis() -> Optional[Any]:
+    """
+    Return the shared async Redis client, or None if Redis is unavailable
+
+    After a connection error (see mark_redis_failed) Redis is skipped for
+    REDIS_RETRY_AFTER_SECONDS so that a missing server does not add a timeout to
+    every request.
+    """
+    global _redis
+    if aioredis is None or not settings.REDIS_URL:
+        return None
+    if _retry_at and time.monotonic() < _retry_at:
+        return None
+    if _redis is None:
+        _redis = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        )
+    return _redis
+
+
+def get_blocking_redis() -> Optional[Any]:
+    """
+    Return a Redis client without a socket timeout, for blocking commands such as
+    BLMOVE that wait longer than REDIS_SOCKET_TIMEOUT_SECONDS on purpose
+    """
+    global _blocking_redis
+    if aioredis is None or not settings.REDIS_URL:
+        return None
+    if _blocking_redis is None:
+        _blocking_redis = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=None,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        )
+    return _blocking_redis
+
+
+def mark_redis_failed(exc: Exception) -> None:
+    """
+    Record a Redis failure and stop using Redis for a while
+    """
+    global _retry_at
+    if not _retry_at or time.monotonic() >= _retry_at:
+        print(f"WARNING: Redis unavailable ({exc}), retrying in {settings.REDIS_RETRY_AFTER_SECONDS}s")
+    _retry_at = time.monotonic() + settings.REDIS_RETRY_AFTER_SECONDS
+
+
+async def close_redis() -> None:
+    """
+    Close the shared Redis connection pools
+    """
+    global _redis, _blocking_redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+    if _blocking_redis is not None:
+        await _blocking_redis.aclose()
+        _blocking_redis = None
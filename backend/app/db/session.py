@@ -1,16 +1,100 @@
 # app/db/session.py
+import time
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from typing import AsyncGenerator
 
 from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-    future=True,
+POOL_CHECKOUT_WAIT = Histogram(
+    "twinglish_db_pool_checkout_wait_seconds", "Time spent waiting for a database connection from the pool"
+)
+POOL_SATURATED = Counter(
+    "twinglish_db_pool_saturated_total", "Checkouts that found every pooled and overflow connection in use"
+)
+POOL_OVERFLOW_CHECKOUTS = Counter(
+    "twinglish_db_pool_overflow_checkouts_total", "Checkouts made while the pool was running on overflow connections"
 )
+POOL_TIMEOUTS = Counter(
+    "twinglish_db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS"
+)
+DB_QUERY_SECONDS = Histogram("twinglish_db_query_seconds", "Statement execution time by statement type", ("statement",))
+DB_ERRORS = Counter("twinglish_db_errors_total", "Statements that raised a database error", ("statement",))
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records checkout wait time and saturation
+    """
+
+    def _do_get(self):
+        if self.checkedout() >= self.size() + max(self._max_overflow, 0):
+            POOL_SATURATED.inc()
+        elif self.overflow() > 0:
+            POOL_OVERFLOW_CHECKOUTS.inc()
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+def _engine_options() -> dict:
+    """
+    Engine profile from settings; SQLite (local runs, benchmarks) keeps its defaults
+    """
+    options = {"echo": settings.DB_ECHO, "future": True}
+    if settings.DATABASE_URL.startswith("sqlite"):
+        return options
+    options.update(
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if "+asyncpg" in settings.DATABASE_URL:
+        # SQLAlchemy's prepared statement cache and asyncpg's own statement cache
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+# Create async engine
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options())
+
+def _pool_stat(name: str):
+    def read():
+        pool = engine.pool
+        return getattr(pool, name)() if isinstance(pool, AsyncAdaptedQueuePool) else None
+    return read
+
+Gauge("twinglish_db_pool_size", "Configured number of pooled connections", _pool_stat("size"))
+Gauge("twinglish_db_pool_checked_out", "Connections currently checked out", _pool_stat("checkedout"))
+Gauge("twinglish_db_pool_overflow", "Overflow connections currently open (negative: pool not filled yet)", _pool_stat("overflow"))
+
+def _statement_type(statement: str) -> str:
+    # First keyword only (SELECT, INSERT, ...) to keep label cardinality bounded
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "OTHER"
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _record_query_time(conn, cursor, statement, parameters, context, executemany):
+    DB_QUERY_SECONDS.labels(_statement_type(statement)).observe(time.perf_counter() - context._query_start)
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _record_query_error(exception_context):
+    DB_ERRORS.labels(_statement_type(exception_context.statement or "")).inc()
 
 # Create async session
 async_session = sessionmaker(
@@ -25,4 +109,4 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
@@ -1,19 +1,85 @@
 # backend/app/main.py
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from typing import Optional
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.metrics import Counter, MetricsMiddleware, render
+from app.core.responses import FastJSONResponse
+from app.core.security import close_password_executor
+from app.db.redis import close_redis
+from app.db.session import engine
 from app.routers import auth, tweets
+from app.services.openai_service import close_client, get_client
+from app.services.precheck import prechecker
+from app.services.prompts import get_encoding
+from app.services.tweet_store import ensure_user, reconcile_counters_periodically
+from app.simple_auth import load_test_user
+
+UNHANDLED_ERRORS = Counter("twinglish_unhandled_errors_total", "Exceptions that reached the global error handler", ("type",))
+
+async def _prepare_test_user():
+    await ensure_user(await load_test_user())
+
+async def warm_up():
+    """
+    Build the per-process resources concurrently, once, instead of at import time
+    or on the first requests: the test user's bcrypt hash (hashing pool) and its
+    database row, the pre-check vocabulary, the OpenAI client and the tokenizer
+    (threads)
+    """
+    steps = {
+        "test user": _prepare_test_user(),
+        "pre-check vocabulary": asyncio.to_thread(lambda: prechecker.words),
+    }
+    if settings.OPENAI_API_KEY:
+        steps["OpenAI client"] = asyncio.to_thread(get_client)
+        steps["tokenizer"] = asyncio.to_thread(get_encoding)
+    results = await asyncio.gather(*steps.values(), return_exceptions=True)
+    for name, result in zip(steps, results):
+        if isinstance(result, Exception):
+            print(f"WARNING: Warm-up of {name} failed: {str(result)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up, start background correction workers and counter reconciliation, and
+    release shared clients on shutdown
+    """
+    await warm_up()
+    await tweets.correction_workers.start()
+    reconcile = asyncio.create_task(reconcile_counters_periodically()) if settings.TWEET_COUNTERS_RECONCILE_SECONDS else None
+    yield
+    if reconcile is not None:
+        reconcile.cancel()
+    await tweets.correction_workers.stop()
+    await close_client()
+    await close_redis()
+    await engine.dispose()
+    close_password_executor()
 
 # Initialize the app
 app = FastAPI(
     title="Twinglish API",
     description="Twitter-style application for language learning",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+# Added first so it is innermost: CORS and metrics see the compressed response
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+        gzip_level=settings.RESPONSE_GZIP_LEVEL,
+        brotli_quality=settings.RESPONSE_BROTLI_QUALITY,
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -21,12 +87,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Added last so it wraps CORS and sees every response
+app.add_middleware(MetricsMiddleware)
+
 # Global error handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     print(f"Error: {exc}")
+    UNHANDLED_ERRORS.labels(type(exc).__name__).inc()
     return JSONResponse(
         status_code=500,
         content={"detail": f"Server error: {str(exc)}"}
@@ -41,6 +112,11 @@ app.include_router(tweets.router, prefix=f"{settings.API_V1_STR}/tweets", tags=[
 def root():
     return {"message": "Welcome to Twinglish API", "version": "0.1.0"}
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
 # Debug endpoint for token validation
 @app.get("/api/v1/debug-token")
 def debug_token(authorization: Optional[str] = Header(None), token: Optional[str] = Header(None)):
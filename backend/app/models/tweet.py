@@ -1,13 +1,35 @@
 # backend/app/models/tweet.py
-from sqlalchemy import Column, String, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
+# Correction status of a tweet
+TWEET_STATUS_PENDING = "pending"
+TWEET_STATUS_DONE = "done"
+TWEET_STATUS_FAILED = "failed"
+
 class Tweet(Base):
     original_text = Column(String(280))
     corrected_text = Column(String(280))
     explanation = Column(Text)
     user_id = Column(Integer, ForeignKey("user.id"))
+    status = Column(String(16), nullable=False, default=TWEET_STATUS_DONE, server_default=TWEET_STATUS_DONE)
     
     # Relationship with user
-    user = relationship("User", back_populates="tweets")
\ No newline at end of file
+    user = relationship("User", back_populates="tweets")
+
+# Serves the per-user timeline (newest first) and per-user counts
+Index("ix_tweet_user_id_created_at_id", Tweet.user_id, Tweet.created_at.desc(), Tweet.id.desc())
+
+# Finds tweets whose background correction was lost (see claim_stale_pending)
+Index(
+    "ix_tweet_pending_updated_at", Tweet.updated_at,
+    postgresql_where=Tweet.status == TWEET_STATUS_PENDING, sqlite_where=Tweet.status == TWEET_STATUS_PENDING,
+)
+
+# Full-text search uses the search_vector column, kept up to date by a trigger, and
+# its (user_id, search_vector) GIN index. All are Postgres-only and managed by
+# migration 5b2e7c9a4f13, so they are not mapped here (see app/services/search.py)
+
+# Maximum tweet length, taken from the column definition
+MAX_TWEET_LENGTH = Tweet.__table__.c.original_text.type.length
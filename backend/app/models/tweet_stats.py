@@ -0,0 +1,16 @@
+# backend/app/models/tweet_stats.py
+from sqlalchemy import BigInteger, Column, Integer, ForeignKey
+from app.models.base import Base
+
+class TweetStats(Base):
+    """
+    Per-user tweet counters, kept up to date as tweets are created, corrected or deleted,
+    and the version of the user's timeline (the ETag), incremented by each of those changes
+    """
+    __tablename__ = "tweet_stats"
+
+    user_id = Column(Integer, ForeignKey("user.id"), unique=True, nullable=False)
+    total = Column(Integer, nullable=False, default=0, server_default="0")
+    perfect = Column(Integer, nullable=False, default=0, server_default="0")
+    corrections = Column(Integer, nullable=False, default=0, server_default="0")
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
@@ -45,11 +45,13 @@ async def login_access_token(
 
 
 # app/routers/auth.py
+import time
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.core.config import settings
+from app.core.security import AUTH_FAILURES, AUTH_SECONDS, PasswordHasherBusy
 from app.schemas.token import Token
 from app.simple_auth import authenticate_user, create_access_token
 
@@ -61,8 +63,18 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     OAuth2 compatible token login, get an access token for future requests
     """
     try:
-        print(f"Attempting login with username: {form_data.username}")
-        user = authenticate_user(form_data.username, form_data.password)
+        start = time.perf_counter()
+        try:
+            user = await authenticate_user(form_data.username, form_data.password)
+        except PasswordHasherBusy:
+            AUTH_FAILURES.labels("busy").inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many login attempts in progress, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            AUTH_SECONDS.labels("login").observe(time.perf_counter() - start)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,11 +1,26 @@
 # app/routers/tweets.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
 
+from app.core.config import settings
+from app.core.metrics import CounterFunction
+from app.core.responses import FastJSONResponse, etag_matches
+from app.models.tweet import MAX_TWEET_LENGTH, TWEET_STATUS_DONE, TWEET_STATUS_FAILED, TWEET_STATUS_PENDING
 from app.simple_auth import get_current_user
-from app.services.openai_service import correct_tweet
+from app.services.correction_queue import CorrectionWorkerPool, QueueFullError
+from app.services.openai_service import PRECHECK_EXPLANATION, correct_tweet, precheck, stream_correction
+from app.services.precheck import prechecker
+from app.services.rate_limit import RateLimited, correction_limiter
+from app.services.search import decode_search_cursor, encode_search_cursor
+from app.services.timeline_version import timeline_versions
+from app.services.tweet_store import decode_cursor, encode_cursor, get_tweet_store, tweet_store_session
+from app.services.tweet_transfer import EXPORT_FORMATS, ImportLineTooLong, export_chunks, import_tweets
 
 router = APIRouter()
 
@@ -22,83 +37,379 @@ class Tweet(TweetBase):
     explanation: str
     created_at: str
     user_id: int
+    status: str = TWEET_STATUS_DONE
 
-# Sample tweets for testing
-sample_tweets = []
+class TweetSearchResult(Tweet):
+    rank: float
+    highlights: Dict[str, str]  # Field -> HTML-escaped text with matches in <mark>
+
+def _validate_text(original_text: str) -> None:
+    if not original_text:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tweet text cannot be empty"
+        )
+    if len(original_text) > MAX_TWEET_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tweet text cannot be longer than {MAX_TWEET_LENGTH} characters"
+        )
+
+def _too_many_requests(e: RateLimited) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many corrections in progress, please wait for them to finish" if e.scope == "concurrency"
+        else "Too many corrections requested, please try again shortly",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+async def _timeline_etag(request: Request, store: Any, user_id: int, endpoint: str) -> Tuple[Optional[str], Optional[Response]]:
+    """
+    ETag of the user's timeline, and a 304 response when If-None-Match matches it
+
+    Only the timeline version is read (the user's tweet_stats row), so unchanged
+    data is answered without querying the timeline. No ETag is sent while ETags
+    are disabled.
+    """
+    etag = await timeline_versions.etag(store, user_id)
+    if etag is None:
+        timeline_versions.record(endpoint, "unversioned")
+        return None, None
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        timeline_versions.record(endpoint, "not_modified")
+        return etag, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(etag))
+    timeline_versions.record(endpoint, "modified")
+    return etag, None
+
+def _cache_headers(etag: Optional[str]) -> Dict[str, str]:
+    if etag is None:
+        return {}
+    # Clients may keep a copy but must revalidate it on every use
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+async def _correct(original_text: str, raise_errors: bool = False) -> Tuple[str, str]:
+    """
+    Correct a tweet, skipping the LLM when the local pre-check finds it clean
+    """
+    check = precheck(original_text)
+    if check.skip_llm:
+        return original_text, PRECHECK_EXPLANATION
+
+    corrected_text, explanation = await correct_tweet(original_text, raise_errors=raise_errors)
+    prechecker.record_llm_outcome(check, corrected_text != original_text)
+    return corrected_text, explanation
+
+async def _process_correction(job: Dict[str, Any]) -> None:
+    """
+    Background worker handler: correct a pending tweet and store the result
+    """
+    async with tweet_store_session() as store:
+        tweet = await store.get(job["tweet_id"])
+    if tweet is None or tweet["status"] != TWEET_STATUS_PENDING:
+        return
+
+    corrected_text, explanation = await _correct(tweet["original_text"], raise_errors=True)
+    async with tweet_store_session() as store:
+        await store.update(tweet["id"], corrected_text=corrected_text, explanation=explanation, status=TWEET_STATUS_DONE)
+
+async def _mark_failed(job: Dict[str, Any], exc: Exception) -> None:
+    """
+    Called once a job is dead-lettered: keep the original text, like the sync fallback
+    """
+    async with tweet_store_session() as store:
+        await store.update(job["tweet_id"], explanation=f"Could not process correction: {str(exc)}", status=TWEET_STATUS_FAILED)
+
+async def _find_stale() -> List[int]:
+    """
+    Pending tweets whose job was lost, claimed for one last attempt
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.CORRECTION_PENDING_TIMEOUT_SECONDS)
+    async with tweet_store_session() as store:
+        return await store.claim_stale_pending(cutoff, settings.CORRECTION_QUEUE_MAX_SIZE)
+
+# Background workers for tweets created in async mode (started in the app lifespan)
+correction_workers = CorrectionWorkerPool(_process_correction, _mark_failed, _find_stale)
+
+CounterFunction(
+    "twinglish_correction_jobs_total", "Background correction jobs by outcome",
+    lambda: {
+        ("processed",): correction_workers.processed,
+        ("retried",): correction_workers.retried,
+        ("dead_lettered",): correction_workers.dead_lettered,
+        ("rejected",): correction_workers.rejected,
+        ("recovered",): correction_workers.recovered,
+    },
+    ("outcome",),
+)
 
 @router.get("/", response_model=List[Tweet])
 async def read_tweets(
+    request: Request,
     current_user: dict = Depends(get_current_user),
+    store = Depends(get_tweet_store),
     skip: int = Query(0, ge=0, description="Number of tweets to skip (for pagination)"),
-    limit: int = Query(10, ge=1, le=100, description="Number of tweets to return (page size)")
+    limit: int = Query(10, ge=1, le=100, description="Number of tweets to return (page size)"),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page")
 ):
     """
     Get tweets for the current user with pagination support
+
+    When a full page is returned, the X-Next-Cursor header holds a cursor for the
+    next page. Passing it as `after` costs the same for every page, while `skip`
+    gets slower the deeper the page.
+
+    The response carries the timeline's ETag; a request with a matching
+    If-None-Match gets a 304 until a tweet is created, corrected or deleted.
+
+    The store already returns Tweet-shaped dicts, so the page is encoded directly
+    instead of being re-validated against response_model (kept for the docs).
     """
-    # Filter tweets for current user
-    user_tweets = [t for t in sample_tweets if t["user_id"] == current_user["id"]]
-    
-    # Sort tweets by created_at, newest first
-    user_tweets.sort(key=lambda x: x["created_at"], reverse=True)
-    
-    # Apply pagination
-    paginated_tweets = user_tweets[skip:skip + limit]
-    
-    return paginated_tweets
+    try:
+        cursor = decode_cursor(after) if after else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+    # Read before the page, so a change racing with it yields an older ETag, never a stale 304
+    etag, not_modified = await _timeline_etag(request, store, current_user["id"], "list")
+    if not_modified is not None:
+        return not_modified
+
+    # Newest first, served by the (user_id, created_at, id) index
+    tweets = await store.list_for_user(current_user["id"], skip, limit, after=cursor)
+    response = FastJSONResponse(tweets, headers=_cache_headers(etag))
+    if len(tweets) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(tweets[-1])
+    return response
 
 @router.post("/", response_model=Tweet)
-async def create_tweet(tweet: Dict[str, Any], current_user: dict = Depends(get_current_user)):
+async def create_tweet(
+    tweet: Dict[str, Any],
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    store = Depends(get_tweet_store),
+    mode: Optional[str] = Query(None, pattern="^(sync|async)$", description="'async' returns 202 at once and corrects in the background")
+):
     """
     Create a new tweet and correct it using OpenAI
+
+    In async mode the tweet is stored with a pending status and corrected by a
+    background worker; poll GET /tweets/{id} or GET /tweets/{id}/wait for the result.
+
+    Corrections are rate limited per user and globally (429 with Retry-After).
+    Synchronous ones also count against the user's in-flight cap; queued ones
+    are bounded by the rate limit and the queue size instead.
     """
     # Get the original text from request
     original_text = tweet.get("original_text", "")
-    
-    if not original_text:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Tweet text cannot be empty"
-        )
+    _validate_text(original_text)
+    try:
+        await correction_limiter.check(current_user["id"])
+    except RateLimited as e:
+        raise _too_many_requests(e)
+
+    if (mode or settings.TWEET_CORRECTION_MODE) == "async":
+        new_tweet = await store.create(current_user["id"], original_text, original_text, "", TWEET_STATUS_PENDING)
+        try:
+            await correction_workers.enqueue({"tweet_id": new_tweet["id"]})
+        except QueueFullError:
+            await store.delete(new_tweet["id"])
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many corrections in progress, please try again shortly",
+                headers={"Retry-After": "5"}
+            )
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = f"{settings.API_V1_STR}/tweets/{new_tweet['id']}"
+        return new_tweet
     
+    try:
+        release = await correction_limiter.acquire_slot(current_user["id"])
+    except RateLimited as e:
+        raise _too_many_requests(e)
     try:
         # Use OpenAI service to correct the text and get explanation
-        corrected_text, explanation = await correct_tweet(original_text)
+        corrected_text, explanation = await _correct(original_text)
         
         # Create new tweet with the corrected text
-        # Store in ISO 8601 format with UTC timezone explicitly marked
-        new_id = max([t["id"] for t in sample_tweets], default=0) + 1
-        new_tweet = {
-            "id": new_id,
-            "original_text": original_text,
-            "corrected_text": corrected_text,
-            "explanation": explanation,
-            "created_at": datetime.now(timezone.utc).isoformat(),  # ISO 8601 format with Z for UTC
-            "user_id": current_user["id"]
-        }
-        
-        # Add to sample data
-        sample_tweets.append(new_tweet)
-        
-        return new_tweet
+        return await store.create(current_user["id"], original_text, corrected_text, explanation, TWEET_STATUS_DONE)
     except Exception as e:
         print(f"Error creating tweet: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create tweet: {str(e)}"
         )
+    finally:
+        await release()
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/stream")
+async def create_tweet_stream(tweet: Dict[str, Any], current_user: dict = Depends(get_current_user)):
+    """
+    Create a new tweet and stream its correction as server-sent events
+
+    Events: "corrected" ({"corrected_text"}) as soon as the corrected sentence is
+    known, "explanation" ({"delta"}) while the explanation is generated, "error"
+    ({"detail"}) if the correction failed, and "done" with the persisted tweet.
+    Rate limited like POST /tweets; the in-flight slot is held until the stream ends.
+    """
+    original_text = tweet.get("original_text", "")
+    _validate_text(original_text)
+    try:
+        await correction_limiter.check(current_user["id"])
+        release = await correction_limiter.acquire_slot(current_user["id"])
+    except RateLimited as e:
+        raise _too_many_requests(e)
+
+    check = precheck(original_text)
+
+    async def skipped_correction():
+        yield "corrected", original_text
+        yield "explanation", PRECHECK_EXPLANATION
+        yield "done", (original_text, PRECHECK_EXPLANATION)
+
+    async def events():
+        try:
+            async for event in correction_events():
+                yield event
+        finally:
+            await release()
+
+    async def correction_events():
+        source = skipped_correction() if check.skip_llm else stream_correction(original_text)
+        failed = False
+        async for kind, value in source:
+            if kind == "corrected":
+                yield _sse("corrected", {"corrected_text": value})
+            elif kind == "explanation":
+                yield _sse("explanation", {"delta": value})
+            elif kind == "error":
+                failed = True
+                yield _sse("error", {"detail": value})
+            elif kind == "done":
+                corrected_text, explanation = value
+                if not check.skip_llm and not failed:
+                    prechecker.record_llm_outcome(check, corrected_text != original_text)
+                # The request's session is closed once the response starts, so use our own
+                async with tweet_store_session() as store:
+                    new_tweet = await store.create(current_user["id"], original_text, corrected_text, explanation, TWEET_STATUS_DONE)
+                yield _sse("done", new_tweet)
+
+    # The background task releases the slot if the stream never started
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release)
+    )
 
 @router.get("/count", response_model=Dict[str, int])
-async def get_tweet_count(current_user: dict = Depends(get_current_user)):
+async def get_tweet_count(request: Request, current_user: dict = Depends(get_current_user), store = Depends(get_tweet_store)):
     """
     Get the count of tweets for the current user, useful for pagination
+
+    Tweets still waiting for a background correction count towards the total only.
+    Conditional requests are answered like GET /tweets.
     """
-    user_tweets = [t for t in sample_tweets if t["user_id"] == current_user["id"]]
-    
-    perfect_count = len([t for t in user_tweets if t["original_text"] == t["corrected_text"]])
-    corrections_count = len(user_tweets) - perfect_count
-    
-    return {
-        "total": len(user_tweets),
-        "perfect": perfect_count,
-        "corrections": corrections_count
-    }
+    etag, not_modified = await _timeline_etag(request, store, current_user["id"], "count")
+    if not_modified is not None:
+        return not_modified
+    return FastJSONResponse(await store.count_for_user(current_user["id"]), headers=_cache_headers(etag))
+
+@router.get("/export")
+async def export_tweets(
+    current_user: dict = Depends(get_current_user),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="'ndjson' (one JSON tweet per line) or 'csv'")
+):
+    """
+    Download every tweet of the current user, oldest first
+
+    The body is streamed from a server-side cursor, so memory stays constant
+    however long the history. NDJSON exports can be imported again as they are.
+    """
+    return StreamingResponse(
+        export_chunks(current_user["id"], format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="tweets.{format}"'},
+    )
+
+@router.post("/import")
+async def import_tweets_stream(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    correct: bool = Query(False, description="Queue tweets without a corrected_text for correction")
+):
+    """
+    Import tweets from an NDJSON body (e.g. an export), one tweet per line
+
+    Each line needs original_text; corrected_text, explanation, created_at and
+    status are kept when present. Lines are inserted in batches while the body is
+    still uploading. Invalid lines are skipped and listed in "errors".
+    With correct, every queued correction counts against the rate limits of
+    POST /tweets; lines over the limit are stored as failed.
+    """
+    try:
+        return await import_tweets(current_user["id"], request.stream(), correct, correction_workers.enqueue)
+    except ImportLineTooLong as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+@router.get("/search", response_model=List[TweetSearchResult])
+async def search_tweets(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in the text, correction or explanation"),
+    current_user: dict = Depends(get_current_user),
+    store = Depends(get_tweet_store),
+    limit: int = Query(10, ge=1, le=100, description="Number of results to return (page size)"),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page")
+):
+    """
+    Search the current user's tweets, best matches first
+
+    Results carry their rank and highlighted fields. Pagination and conditional
+    requests work like GET /tweets.
+    """
+    try:
+        cursor = decode_search_cursor(after) if after else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+    etag, not_modified = await _timeline_etag(request, store, current_user["id"], "search")
+    if not_modified is not None:
+        return not_modified
+
+    results = await store.search(current_user["id"], q, limit, after=cursor)
+    response = FastJSONResponse(results, headers=_cache_headers(etag))
+    if len(results) == limit:
+        response.headers["X-Next-Cursor"] = encode_search_cursor(results[-1]["rank"], results[-1]["id"])
+    return response
+
+@router.get("/{tweet_id}", response_model=Tweet)
+async def read_tweet(tweet_id: int, current_user: dict = Depends(get_current_user), store = Depends(get_tweet_store)):
+    """
+    Get a single tweet, e.g. to poll a pending correction
+    """
+    tweet = await store.get(tweet_id)
+    if tweet is None or tweet["user_id"] != current_user["id"]:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tweet not found")
+    return tweet
+
+@router.get("/{tweet_id}/wait", response_model=Tweet)
+async def wait_for_tweet(
+    tweet_id: int,
+    current_user: dict = Depends(get_current_user),
+    timeout: float = Query(25, gt=0, le=60, description="Seconds to wait for the correction")
+):
+    """
+    Long-poll until a pending tweet has been corrected or the timeout expires
+    """
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        # A fresh session per check, so no connection is held while waiting
+        async with tweet_store_session() as store:
+            tweet = await read_tweet(tweet_id, current_user, store)
+        remaining = deadline - asyncio.get_running_loop().time()
+        if tweet["status"] != TWEET_STATUS_PENDING or remaining <= 0:
+            return tweet
+        # Re-check at least once a second in case another process finished the job
+        await correction_workers.wait_for(tweet_id, min(remaining, 1.0))
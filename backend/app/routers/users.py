@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 from typing import Any
 
-from app.core.security import get_password_hash
+from app.core.security import PasswordHasherBusy, get_password_hash_async
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserCreate
@@ -26,25 +26,34 @@ async def create_user(
             or_(User.email == user_in.email, User.username == user_in.username)
         )
     )
-    db_user = result.scalar_one_or_none()
+    # The email and the username may belong to two different users
+    existing = result.scalars().all()
     
-    if db_user:
-        if db_user.email == user_in.email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered",
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken",
-            )
+    if any(db_user.email == user_in.email for db_user in existing):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already taken",
+        )
+    
+    try:
+        hashed_password = await get_password_hash_async(user_in.password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ups in progress, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
     
     # Create new user
     db_user = User(
         email=user_in.email,
         username=user_in.username,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password,
     )
     
     db.add(db_user)
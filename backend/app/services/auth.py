@@ -8,24 +8,32 @@ from sqlalchemy import select
 from typing import Optional
 
 from app.core.config import settings
-from app.core.security import verify_password
+from app.core.security import verify_password_async
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.token import TokenPayload
+from app.services.user_cache import snapshot, user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """
     Authenticate a user by username and password
+
+    The bcrypt check runs on the password hashing pool (PasswordHasherBusy when it
+    is saturated), and hashes with an outdated cost factor are replaced.
     """
     result = await db.execute(select(User).where(User.username == username))
     user = result.scalar_one_or_none()
     
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await verify_password_async(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 async def get_current_user(
@@ -33,6 +41,9 @@ async def get_current_user(
 ) -> User:
     """
     Get the current user from the token
+
+    The user is served from user_cache when possible, so most requests skip the
+    database. The returned User is then a detached copy without hashed_password.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,8 +62,14 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    result = await db.execute(select(User).where(User.id == token_data.sub))
-    user = result.scalar_one_or_none()
+    cached = await user_cache.get(token_data.sub)
+    if cached is not None:
+        user = User(**cached)
+    else:
+        result = await db.execute(select(User).where(User.id == token_data.sub))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            await user_cache.set(snapshot(user))
     
     if not user:
         raise credentials_exception
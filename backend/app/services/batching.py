@@ -0,0 +1,108 @@
+# app/services/batching.py
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+Correction = Tuple[str, str]
+SendBatch = Callable[[List[str]], Awaitable[List[Optional[Correction]]]]
+SendOne = Callable[[str], Awaitable[Correction]]
+
+
+class MicroBatcher:
+    """
+    Collects concurrent correction requests and sends them as one LLM call
+
+    A batch is flushed when it reaches max_size items or when window_seconds have
+    passed since its first item, whichever comes first. send_batch returns one
+    result per input, or None for an element the model got wrong; those items are
+    retried on their own through send_one so a single bad element never fails the
+    whole batch.
+    """
+
+    def __init__(self, send_batch: SendBatch, send_one: SendOne, max_size: int, window_seconds: float):
+        self.send_batch = send_batch
+        self.send_one = send_one
+        self.max_size = max_size
+        self.window_seconds = window_seconds
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.batches_sent = 0
+        self.items_batched = 0
+        self.item_fallbacks = 0
+        self.batch_failures = 0
+
+    async def submit(self, text: str) -> Correction:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self._spawn(self._run(batch))
+
+    def _spawn(self, coro) -> None:
+        # Keep a reference so pending batches are not garbage collected mid-flight
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+
+        if len(batch) == 1:
+            text, future = batch[0]
+            await self._run_one(text, future)
+            return
+
+        self.batches_sent += 1
+        self.items_batched += len(batch)
+        try:
+            results = await self.send_batch([text for text, _ in batch])
+        except Exception as e:
+            self.batch_failures += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for index, (text, future) in enumerate(batch):
+            result = results[index] if index < len(results) else None
+            if future.done():
+                continue
+            if result is None:
+                self.item_fallbacks += 1
+                self._spawn(self._run_one(text, future))
+            else:
+                future.set_result(result)
+
+    async def _run_one(self, text: str, future: asyncio.Future) -> None:
+        try:
+            result = await self.send_one(text)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches_sent": self.batches_sent,
+            "items_batched": self.items_batched,
+            "avg_batch_size": round(self.items_batched / self.batches_sent, 2) if self.batches_sent else 0.0,
+            "item_fallbacks": self.item_fallbacks,
+            "batch_failures": self.batch_failures,
+        }
@@ -0,0 +1,116 @@
+# app/services/circuit_breaker.py
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+# Circuit states
+CLOSED = "closed"        # Calls go through, outcomes are counted
+OPEN = "open"            # Calls fail fast until open_seconds have passed
+HALF_OPEN = "half_open"  # A few probe calls decide between CLOSED and OPEN
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker for one upstream
+
+    The circuit opens when, over the last window_seconds, at least min_calls calls
+    were made and failure_rate of them failed. While open, before_call() raises
+    CircuitOpenError so callers go straight to their fallback. After open_seconds
+    the circuit is half-open: up to half_open_probes calls are let through, and it
+    closes once that many succeed or opens again on the first failure.
+
+    Callers report every call they were allowed to make through record_success,
+    record_failure or record_ignored (cancelled calls, client errors), so probe
+    slots are always released.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float,
+        min_calls: int,
+        window_seconds: float,
+        open_seconds: float,
+        half_open_probes: int,
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()  # (time, failed)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self.rejected = 0
+        self.transitions: Dict[str, int] = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+
+    def before_call(self) -> None:
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                raise CircuitOpenError("Upstream circuit is open")
+            self._transition(HALF_OPEN)
+            self._probes = 0
+            self._probe_successes = 0
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                self.rejected += 1
+                raise CircuitOpenError("Upstream circuit is half-open and its probes are in flight")
+            self._probes += 1
+
+    def record_success(self) -> None:
+        if self.state == HALF_OPEN:
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._transition(CLOSED)
+        elif self.state == CLOSED:
+            self._add(False)
+
+    def record_failure(self) -> None:
+        if self.state == HALF_OPEN:
+            self._open()
+        elif self.state == CLOSED:
+            self._add(True)
+            calls = len(self._outcomes)
+            if calls >= self.min_calls and self._failures / calls >= self.failure_rate:
+                self._open()
+
+    def record_ignored(self) -> None:
+        if self.state == HALF_OPEN and self._probes > self._probe_successes:
+            self._probes -= 1
+
+    def _add(self, failed: bool) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, failed))
+        self._failures += failed
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            _, old_failed = self._outcomes.popleft()
+            self._failures -= old_failed
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        self.transitions[state] += 1
+        self._outcomes.clear()
+        self._failures = 0
+
+    def stats(self) -> Dict[str, object]:
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "window_failure_rate": round(self._failures / calls, 4) if calls else 0.0,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+        }
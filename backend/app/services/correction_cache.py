@@ -0,0 +1,205 @@
+# app/services/correction_cache.py
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import CounterFunction, Gauge
+from app.db.redis import get_redis, mark_redis_failed
+
+KEY_PREFIX = "twinglish:correction"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize tweet text for cache lookups
+
+    Unicode forms and runs of whitespace are collapsed. Case and punctuation are kept
+    because they change what the correction looks like.
+    """
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def make_key(text: str, model: str, prompt_version: str) -> str:
+    """
+    Build the cache key for a correction
+
+    The prompt version is part of the key, so bumping it makes every older entry
+    unreachable without an explicit flush.
+    """
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{prompt_version}:{model}:{digest}"
+
+
+class LRUCache:
+    """
+    Bounded in-process LRU with per-entry expiry
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        return self._data.pop(key, None) is not None
+
+    def delete_prefix(self, prefix: str) -> int:
+        keys = [key for key in self._data if key.startswith(prefix)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CorrectionCache:
+    """
+    Two-tier cache for (corrected_text, explanation) results
+
+    Lookups hit the in-process LRU first, then the shared Redis tier. Redis hits
+    are promoted into the LRU. Redis errors are counted and treated as misses.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(settings.CORRECTION_CACHE_MAX_SIZE, settings.CORRECTION_CACHE_LOCAL_TTL_SECONDS)
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+
+    def _redis(self):
+        if not settings.CORRECTION_CACHE_REDIS_ENABLED:
+            return None
+        return get_redis()
+
+    async def get(self, key: str) -> Optional[Tuple[str, str]]:
+        if not settings.CORRECTION_CACHE_ENABLED:
+            return None
+
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        redis = self._redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(key)
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_failed(e)
+            return None
+        if raw is None:
+            self.redis_misses += 1
+            return None
+
+        self.redis_hits += 1
+        corrected_text, explanation = json.loads(raw)
+        value = (corrected_text, explanation)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Tuple[str, str]) -> None:
+        if not settings.CORRECTION_CACHE_ENABLED:
+            return
+
+        self.local.set(key, value)
+
+        redis = self._redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(key, json.dumps(value), ex=settings.CORRECTION_CACHE_REDIS_TTL_SECONDS)
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_failed(e)
+
+    async def invalidate(self, prompt_version: Optional[str] = None) -> int:
+        """
+        Drop cached corrections, either all of them or those of one prompt version
+
+        Returns the number of entries removed across both tiers.
+        """
+        prefix = f"{KEY_PREFIX}:{prompt_version}:" if prompt_version else f"{KEY_PREFIX}:"
+        removed = self.local.delete_prefix(prefix)
+
+        redis = self._redis()
+        if redis is None:
+            return removed
+        try:
+            batch = []
+            async for key in redis.scan_iter(match=f"{prefix}*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    removed += await redis.delete(*batch)
+                    batch = []
+            if batch:
+                removed += await redis.delete(*batch)
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_failed(e)
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "local_size": len(self.local),
+            "local_hits": self.local.hits,
+            "local_misses": self.local.misses,
+            "local_evictions": self.local.evictions,
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "redis_errors": self.redis_errors,
+        }
+
+
+correction_cache = CorrectionCache()
+
+
+def _hit_ratio() -> float:
+    lookups = correction_cache.local.hits + correction_cache.local.misses
+    return (correction_cache.local.hits + correction_cache.redis_hits) / lookups if lookups else 0.0
+
+
+CounterFunction(
+    "twinglish_correction_cache_hits_total", "Correction cache hits per tier",
+    lambda: {("local",): correction_cache.local.hits, ("redis",): correction_cache.redis_hits}, ("tier",),
+)
+CounterFunction(
+    "twinglish_correction_cache_misses_total", "Correction cache misses per tier",
+    lambda: {("local",): correction_cache.local.misses, ("redis",): correction_cache.redis_misses}, ("tier",),
+)
+CounterFunction(
+    "twinglish_correction_cache_redis_errors_total", "Redis errors in the correction cache", lambda: correction_cache.redis_errors
+)
+Gauge("twinglish_correction_cache_hit_ratio", "Share of correction lookups answered by either tier", _hit_ratio)
@@ -0,0 +1,329 @@
+# app/services/correction_queue.py
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.db.redis import get_blocking_redis, get_redis
+
+QUEUE_KEY = "twinglish:corrections:queue"
+PROCESSING_KEY = "twinglish:corrections:processing"
+LEASES_KEY = "twinglish:corrections:leases"
+DEAD_LETTER_KEY = "twinglish:corrections:dead"
+
+# Seconds a worker blocks waiting for a job before asking again
+BLOCK_SECONDS = 5
+
+# Moves jobs whose lease (score in LEASES_KEY) expired back from the processing
+# list to the consuming end of the queue; returns how many were moved
+REQUEUE_EXPIRED_SCRIPT = """
+local moved = 0
+for _, raw in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[1])) do
+    if redis.call('LREM', KEYS[2], 1, raw) > 0 then
+        redis.call('RPUSH', KEYS[1], raw)
+        moved = moved + 1
+    end
+    redis.call('ZREM', KEYS[3], raw)
+end
+return moved
+"""
+
+Job = Dict[str, Any]
+JobHandler = Callable[[Job], Awaitable[None]]
+FailureHandler = Callable[[Job, Exception], Awaitable[None]]
+StaleFinder = Callable[[], Awaitable[List[int]]]
+
+
+class QueueFullError(Exception):
+    """Raised when the correction queue is at capacity"""
+
+
+class InProcessQueue:
+    """
+    Bounded asyncio queue for a single API process
+    """
+
+    def __init__(self, max_size: int, dead_letter_size: int):
+        self.max_size = max_size
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._dead: deque = deque(maxlen=dead_letter_size)
+
+    async def put(self, job: Job) -> None:
+        if self._queue.qsize() >= self.max_size:
+            raise QueueFullError("Correction queue is full")
+        self._queue.put_nowait(job)
+
+    async def requeue(self, job: Job) -> None:
+        self._queue.put_nowait(job)
+
+    async def get(self) -> Job:
+        return await self._queue.get()
+
+    async def ack(self, job: Job) -> None:
+        return None
+
+    async def requeue_expired(self) -> int:
+        return 0
+
+    async def dead_letter(self, job: Job) -> None:
+        self._dead.append(job)
+
+    async def dead_letters(self) -> List[Job]:
+        return list(self._dead)
+
+    async def size(self) -> int:
+        return self._queue.qsize()
+
+
+class RedisQueue:
+    """
+    Redis list shared by every API process
+
+    get() moves a job atomically to a processing list and gives it a lease of
+    CORRECTION_JOB_LEASE_SECONDS; ack() removes it once it is done, dead-lettered
+    or re-queued for a retry. requeue_expired() puts jobs of workers that died
+    back in the queue.
+    """
+
+    def __init__(self, max_size: int, dead_letter_size: int):
+        self.max_size = max_size
+        self.dead_letter_size = dead_letter_size
+        self._receipts: Dict[int, str] = {}  # id(job) -> payload in the processing list
+
+    def _redis(self, client=None):
+        redis = client or get_redis()
+        if redis is None:
+            raise RuntimeError("Redis queue backend selected but Redis is unavailable")
+        return redis
+
+    async def put(self, job: Job) -> None:
+        redis = self._redis()
+        if await redis.llen(QUEUE_KEY) >= self.max_size:
+            raise QueueFullError("Correction queue is full")
+        await redis.lpush(QUEUE_KEY, json.dumps(job))
+
+    async def requeue(self, job: Job) -> None:
+        await self._redis().lpush(QUEUE_KEY, json.dumps(job))
+
+    async def get(self) -> Job:
+        while True:
+            # Own client: the shared one times out reads after REDIS_SOCKET_TIMEOUT_SECONDS
+            raw = await self._redis(get_blocking_redis()).blmove(QUEUE_KEY, PROCESSING_KEY, BLOCK_SECONDS, "RIGHT", "LEFT")
+            if raw is not None:
+                await self._redis().zadd(LEASES_KEY, {raw: time.time() + settings.CORRECTION_JOB_LEASE_SECONDS})
+                job = json.loads(raw)
+                self._receipts[id(job)] = raw
+                return job
+
+    async def ack(self, job: Job) -> None:
+        raw = self._receipts.pop(id(job), None)
+        if raw is None:
+            return
+        pipeline = self._redis().pipeline(transaction=True)
+        pipeline.lrem(PROCESSING_KEY, 1, raw)
+        pipeline.zrem(LEASES_KEY, raw)
+        await pipeline.execute()
+
+    async def requeue_expired(self) -> int:
+        script = self._redis().register_script(REQUEUE_EXPIRED_SCRIPT)
+        return int(await script(keys=[QUEUE_KEY, PROCESSING_KEY, LEASES_KEY], args=[time.time()]))
+
+    async def dead_letter(self, job: Job) -> None:
+        redis = self._redis()
+        await redis.lpush(DEAD_LETTER_KEY, json.dumps(job))
+        await redis.ltrim(DEAD_LETTER_KEY, 0, self.dead_letter_size - 1)
+
+    async def dead_letters(self) -> List[Job]:
+        return [json.loads(item) for item in await self._redis().lrange(DEAD_LETTER_KEY, 0, -1)]
+
+    async def size(self) -> int:
+        return await self._redis().llen(QUEUE_KEY)
+
+
+class CorrectionWorkerPool:
+    """
+    Background workers that run corrections for tweets created in async mode
+
+    Jobs are retried with exponential backoff and jitter. After
+    CORRECTION_MAX_ATTEMPTS failures the job goes to the dead-letter list and
+    on_failure is called so the tweet can be marked as failed.
+
+    Every CORRECTION_SWEEP_SECONDS jobs held by dead workers are re-queued, and
+    find_stale() names tweets still pending after CORRECTION_PENDING_TIMEOUT_SECONDS
+    (e.g. lost with an in-process queue on restart); they get one last attempt.
+    """
+
+    def __init__(self, handler: JobHandler, on_failure: FailureHandler, find_stale: Optional[StaleFinder] = None):
+        self.handler = handler
+        self.on_failure = on_failure
+        self.find_stale = find_stale
+        self._queue = None
+        self._workers: List[asyncio.Task] = []
+        self._sweeper: Optional[asyncio.Task] = None
+        self._retries = set()
+        self._events: Dict[Any, Set[asyncio.Event]] = {}  # Tweet id -> one event per waiter
+        self.processed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.rejected = 0
+        self.recovered = 0
+
+    @property
+    def queue(self):
+        if self._queue is None:
+            queue_class = RedisQueue if settings.CORRECTION_QUEUE_BACKEND == "redis" else InProcessQueue
+            self._queue = queue_class(settings.CORRECTION_QUEUE_MAX_SIZE, settings.CORRECTION_DEAD_LETTER_MAX_SIZE)
+        return self._queue
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        for _ in range(settings.CORRECTION_WORKERS):
+            self._workers.append(asyncio.create_task(self._work()))
+        if settings.CORRECTION_SWEEP_SECONDS:
+            self._sweeper = asyncio.create_task(self._sweep_periodically())
+
+    async def stop(self) -> None:
+        tasks = [*self._workers, *self._retries, *([self._sweeper] if self._sweeper else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._sweeper = None
+        self._retries = set()
+
+    async def enqueue(self, job: Job) -> None:
+        """
+        Queue a job, raising QueueFullError when the queue is at capacity
+        """
+        job.setdefault("attempts", 0)
+        try:
+            await self.queue.put(job)
+        except QueueFullError:
+            self.rejected += 1
+            raise
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                job = await self.queue.get()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Correction queue error: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+
+            try:
+                await self.handler(job)
+                self.processed += 1
+                await self.queue.ack(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                try:
+                    await self._handle_failure(job, e)
+                except Exception as failure:
+                    # Left unacknowledged, so the lease brings it back
+                    print(f"Error handling failed correction job: {str(failure)}")
+            finally:
+                self._notify(job.get("tweet_id"))
+
+    def _notify(self, tweet_id: Any) -> None:
+        for event in self._events.pop(tweet_id, ()):
+            event.set()
+
+    async def wait_for(self, tweet_id: int, timeout: float) -> None:
+        """
+        Wait until a job for the tweet has been processed by this process or the
+        timeout expires. Callers re-read the tweet afterwards, since the job may have
+        been handled by another process or re-queued for a retry.
+        """
+        event = asyncio.Event()
+        waiters = self._events.setdefault(tweet_id, set())
+        waiters.add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            # The job may never run here, so each waiter removes its own event
+            waiters.discard(event)
+            if not waiters and self._events.get(tweet_id) is waiters:
+                del self._events[tweet_id]
+
+    async def _handle_failure(self, job: Job, exc: Exception) -> None:
+        job["attempts"] = job.get("attempts", 0) + 1
+        job["last_error"] = str(exc)
+
+        if job["attempts"] >= settings.CORRECTION_MAX_ATTEMPTS:
+            self.dead_lettered += 1
+            print(f"Correction for tweet {job.get('tweet_id')} failed {job['attempts']} times: {str(exc)}")
+            await self.queue.dead_letter(job)
+            await self.on_failure(job, exc)
+            await self.queue.ack(job)
+            return
+
+        self.retried += 1
+        delay = settings.CORRECTION_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+        task = asyncio.create_task(self._retry_later(job, delay * random.uniform(0.8, 1.2)))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _retry_later(self, job: Job, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            # Retries bypass the size check so accepted jobs are never dropped
+            await self.queue.requeue(job)
+        except Exception as e:
+            await self._handle_failure(job, e)
+            return
+        await self.queue.ack(job)
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.CORRECTION_SWEEP_SECONDS)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Error sweeping correction jobs: {str(e)}")
+
+    async def sweep(self) -> int:
+        """
+        Re-queue jobs of dead workers and give stale pending tweets a last attempt.
+        Returns the number of jobs recovered.
+        """
+        recovered = await self.queue.requeue_expired()
+        for tweet_id in await self.find_stale() if self.find_stale else []:
+            job = {"tweet_id": tweet_id, "attempts": settings.CORRECTION_MAX_ATTEMPTS - 1}
+            try:
+                await self.queue.put(job)
+            except Exception as e:
+                await self.on_failure(job, e)
+                continue
+            recovered += 1
+        if recovered:
+            print(f"Recovered {recovered} stale correction jobs")
+        self.recovered += recovered
+        return recovered
+
+    async def dead_letters(self) -> List[Job]:
+        return await self.queue.dead_letters()
+
+    async def stats(self) -> Dict[str, Any]:
+        try:
+            depth: Optional[int] = await self.queue.size()
+        except Exception:
+            depth = None
+        return {
+            "queue_depth": depth,
+            "workers": len(self._workers),
+            "processed": self.processed,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "rejected": self.rejected,
+            "recovered": self.recovered,
+        }
@@ -0,0 +1,92 @@
+# app/services/hedging.py
+import asyncio
+import math
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from app.core.config import settings
+
+# Latencies kept per model, and how many are needed before the percentile is trusted
+WINDOW_SIZE = 500
+MIN_SAMPLES = 20
+
+
+class Hedger:
+    """
+    Hedged requests: when an attempt has not answered by the recent
+    OPENAI_HEDGE_PERCENTILE latency of its model, a second identical attempt is
+    started and whichever succeeds first wins; the other is cancelled.
+
+    Hedges are capped at OPENAI_HEDGE_MAX_RATIO of all requests so a slow upstream
+    is not hit with twice the load, and are skipped until MIN_SAMPLES latencies
+    have been seen (unless OPENAI_HEDGE_DELAY_SECONDS fixes the delay).
+    """
+
+    def __init__(self):
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record_latency(self, model: str, seconds: float) -> None:
+        window = self._latencies.get(model)
+        if window is None:
+            window = self._latencies[model] = deque(maxlen=WINDOW_SIZE)
+        window.append(seconds)
+
+    def delay(self, model: str) -> Optional[float]:
+        """
+        Seconds to wait before hedging, or None when there is no basis yet
+        """
+        if settings.OPENAI_HEDGE_DELAY_SECONDS is not None:
+            return settings.OPENAI_HEDGE_DELAY_SECONDS
+        window = self._latencies.get(model)
+        if window is None or len(window) < MIN_SAMPLES:
+            return None
+        ordered = sorted(window)
+        index = min(len(ordered) - 1, math.ceil(settings.OPENAI_HEDGE_PERCENTILE / 100 * len(ordered)) - 1)
+        return max(ordered[index], settings.OPENAI_HEDGE_MIN_DELAY_SECONDS)
+
+    def _within_budget(self) -> bool:
+        return self.hedges < settings.OPENAI_HEDGE_MAX_RATIO * self.requests
+
+    async def run(self, attempt: Callable[[], Awaitable[Any]], model: str, can_hedge: Callable[[], bool]) -> Any:
+        """
+        Run attempt(), hedging it with a second attempt() when it is slow
+
+        can_hedge is checked at the deadline, e.g. to skip hedging while the
+        upstream is known to be unhealthy. If both attempts fail, the exception
+        of the one that failed last is raised.
+        """
+        self.requests += 1
+        delay = self.delay(model)
+        first = asyncio.ensure_future(attempt())
+        tasks = [first]
+        try:
+            if delay is None:
+                return await first
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._within_budget() or not can_hedge():
+                return await first
+
+            self.hedges += 1
+            second = asyncio.ensure_future(attempt())
+            tasks.append(second)
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
@@ -0,0 +1,150 @@
+# app/services/json_stream.py
+from typing import List, Optional, Tuple
+
+# Events produced by JsonFieldStreamer.feed
+FIELD_DELTA = "delta"  # (FIELD_DELTA, key, text decoded so far in this chunk)
+FIELD_END = "end"      # (FIELD_END, key, full decoded value)
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# Parser states
+_EXPECT_KEY = 0
+_IN_KEY = 1
+_EXPECT_COLON = 2
+_EXPECT_VALUE = 3
+_IN_STRING = 4
+_IN_OTHER = 5
+
+# Sentinel returned by _decode for the closing quote of a string
+_END_OF_STRING = object()
+
+
+class JsonFieldStreamer:
+    """
+    Incremental parser for the top-level string fields of a streamed JSON object
+
+    feed() accepts arbitrary chunks of the model output and returns the events it
+    can emit so far, so a caller can forward the decoded text of a field while it
+    is still being generated and act as soon as the field closes. Values that are
+    not strings (numbers, nested objects) are skipped.
+    """
+
+    def __init__(self):
+        self._state = _EXPECT_KEY
+        self._started = False
+        self._key: List[str] = []
+        self._value: List[str] = []
+        self._escape: Optional[str] = None  # Pending escape sequence, e.g. "\\u00"
+        self._high_surrogate: Optional[int] = None
+        self._depth = 0
+        self._in_nested_string = False
+        self._nested_escape = False
+        self.fields = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, str, str]]:
+        events: List[Tuple[str, str, str]] = []
+        delta: List[str] = []
+
+        for char in chunk:
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                continue
+
+            state = self._state
+            if state == _EXPECT_KEY:
+                if char == '"':
+                    self._key = []
+                    self._state = _IN_KEY
+            elif state == _IN_KEY:
+                if self._escape is not None:
+                    self._escape = None
+                    self._key.append(_ESCAPES.get(char, char))
+                elif char == "\\":
+                    self._escape = "\\"
+                elif char == '"':
+                    self._state = _EXPECT_COLON
+                else:
+                    self._key.append(char)
+            elif state == _EXPECT_COLON:
+                if char == ":":
+                    self._state = _EXPECT_VALUE
+            elif state == _EXPECT_VALUE:
+                if char == '"':
+                    self._value = []
+                    self._state = _IN_STRING
+                elif not char.isspace():
+                    self._depth = 1 if char in "{[" else 0
+                    self._state = _IN_OTHER
+            elif state == _IN_STRING:
+                decoded = self._decode(char)
+                if decoded is None:
+                    continue
+                if decoded is _END_OF_STRING:
+                    key = "".join(self._key)
+                    if delta:
+                        events.append((FIELD_DELTA, key, "".join(delta)))
+                        delta = []
+                    value = "".join(self._value)
+                    self.fields[key] = value
+                    events.append((FIELD_END, key, value))
+                    self._state = _EXPECT_KEY
+                else:
+                    self._value.append(decoded)
+                    delta.append(decoded)
+            elif state == _IN_OTHER:
+                self._skip_other(char)
+
+        if delta:
+            events.append((FIELD_DELTA, "".join(self._key), "".join(delta)))
+        return events
+
+    def _decode(self, char: str):
+        """
+        Decode one character of a string value; None means more input is needed
+        """
+        if self._escape is not None:
+            self._escape += char
+            if self._escape.startswith("\\u"):
+                if len(self._escape) < 6:
+                    return None
+                code = int(self._escape[2:], 16)
+                self._escape = None
+                # Join UTF-16 surrogate pairs (e.g. emoji) into one character
+                if 0xD800 <= code < 0xDC00:
+                    self._high_surrogate = code
+                    return None
+                if self._high_surrogate is not None and 0xDC00 <= code < 0xE000:
+                    code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+                self._high_surrogate = None
+                return chr(code)
+            escaped = self._escape[1]
+            self._escape = None
+            return _ESCAPES.get(escaped, escaped)
+        if char == "\\":
+            self._escape = "\\"
+            return None
+        if char == '"':
+            return _END_OF_STRING
+        return char
+
+    def _skip_other(self, char: str) -> None:
+        if self._in_nested_string:
+            if self._nested_escape:
+                self._nested_escape = False
+            elif char == "\\":
+                self._nested_escape = True
+            elif char == '"':
+                self._in_nested_string = False
+            return
+        if char == '"':
+            self._in_nested_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            if self._depth == 0:
+                self._state = _EXPECT_KEY
+            else:
+                self._depth -= 1
+        elif char == "," and self._depth == 0:
+            self._state = _EXPECT_KEY
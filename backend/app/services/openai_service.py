@@ -1,75 +1,512 @@
 # app/services/openai_service.py
-from typing import Dict, Any, Tuple
-from openai import OpenAI
+import asyncio
+import json
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
+
 from app.core.config import settings
+from app.core.metrics import Counter, CounterFunction, Gauge, Histogram
+from app.models.tweet import MAX_TWEET_LENGTH
+from app.services.batching import MicroBatcher
+from app.services.circuit_breaker import CLOSED, STATE_VALUES, CircuitBreaker, CircuitOpenError
+from app.services.correction_cache import correction_cache, make_key
+from app.services.hedging import Hedger
+from app.services.json_stream import FIELD_DELTA, FIELD_END, JsonFieldStreamer
+from app.services.precheck import PrecheckResult, prechecker
+from app.services.prompts import PROMPT_VERSION, build_batch_prompt, build_correction_prompt, count_message_tokens, count_tokens, split_batch
+from app.services.routing import (
+    FAST, FAST_ERROR, INVALID_ANSWER, STRONG, cache_namespace, choose_tier, escalation_reason, model_for, parse_confidence
+)
+from app.services.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# Explanation returned when the local pre-checker finds nothing to correct
+PRECHECK_EXPLANATION = "Great job! Your text looks correct, no changes needed."
+
+# Shared async client and concurrency limiter. They are created on first use so that
+# every correction in the process reuses the same pool of keep-alive connections.
+_client: Optional["AsyncOpenAI"] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_batcher: Optional[MicroBatcher] = None
+
+# Fails fast to the fallback while the OpenAI API is failing, see OPENAI_CIRCUIT_*
+circuit_breaker = CircuitBreaker(
+    failure_rate=settings.OPENAI_CIRCUIT_FAILURE_RATE,
+    min_calls=settings.OPENAI_CIRCUIT_MIN_CALLS,
+    window_seconds=settings.OPENAI_CIRCUIT_WINDOW_SECONDS,
+    open_seconds=settings.OPENAI_CIRCUIT_OPEN_SECONDS,
+    half_open_probes=settings.OPENAI_CIRCUIT_HALF_OPEN_PROBES,
+)
+hedger = Hedger()
+
+# Identical corrections requested at the same time (same cache key: normalized
+# text, models and prompt version) share one LLM call
+correction_flights = SingleFlight()
+
+LLM_REQUEST_SECONDS = Histogram(
+    "twinglish_llm_request_seconds", "Chat completion latency, including the wait for a concurrency slot", ("kind", "model")
+)
+LLM_ERRORS = Counter("twinglish_llm_errors_total", "Failed chat completions", ("kind", "model"))
+LLM_TRUNCATED = Counter(
+    "twinglish_llm_truncated_total", "Completions cut off by max_tokens (finish_reason=length)", ("kind",)
+)
+LLM_TOKENS = Counter("twinglish_llm_tokens_total", "Tokens reported by the API (counted locally for streams)", ("type",))
+ROUTED_SECONDS = Histogram(
+    "twinglish_llm_routed_seconds", "Single correction latency by route: fast, strong, or fast then escalated", ("route",)
+)
+ROUTING_ESCALATIONS = Counter("twinglish_llm_escalations_total", "Fast-tier answers redone by the strong model", ("reason",))
+CORRECTION_SECONDS = Histogram("twinglish_correction_seconds", "correct_tweet latency by where the answer came from", ("outcome",))
+
+
+def get_client() -> "AsyncOpenAI":
+    """
+    Return the process-wide AsyncOpenAI client, creating it on first use
+
+    openai and httpx are imported here rather than at module level: together they
+    are the slowest imports of the app, and echo mode never needs them.
+    """
+    global _client
+    if _client is None:
+        import httpx
+        from openai import AsyncOpenAI
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.OPENAI_TIMEOUT_SECONDS,
+                connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+        _client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            http_client=http_client,
+        )
+    return _client
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def close_client() -> None:
+    """
+    Close the shared client and release its pooled connections
+    """
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def _record_usage(usage: Any) -> None:
+    if usage is None:
+        return
+    _record_tokens(usage.prompt_tokens or 0, usage.completion_tokens or 0)
+
+
+def _record_tokens(prompt_tokens: int, completion_tokens: int) -> None:
+    LLM_TOKENS.labels("prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels("completion").inc(completion_tokens)
+
+
+def _correction_request(original_text: str, model: Optional[str] = None, with_confidence: bool = False) -> Dict[str, Any]:
+    """
+    Keyword arguments for a single-tweet chat completion
+    """
+    prompt = build_correction_prompt(original_text, with_confidence=with_confidence)
+    return dict(
+        model=model or settings.OPENAI_MODEL,
+        response_format={"type": "json_object"},
+        messages=prompt.messages,
+        temperature=0.3,  # Lower temperature for more consistent corrections
+        max_tokens=prompt.max_tokens,
+        timeout=settings.OPENAI_TIMEOUT_SECONDS,
+    )
+
+
+def _is_upstream_failure(exc: BaseException) -> bool:
+    # Connection errors, timeouts (an APIConnectionError), 5xx and rate limits say the
+    # upstream is unhealthy. Other 4xx responses are our own bad requests, and any
+    # other exception is a local error that must not shed traffic.
+    import openai
+
+    if isinstance(exc, openai.APIConnectionError):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code >= 500 or exc.status_code == 429
+    return False
+
+
+def _record_outcome(exc: Optional[BaseException]) -> None:
+    if exc is None:
+        circuit_breaker.record_success()
+    elif isinstance(exc, Exception) and _is_upstream_failure(exc):
+        circuit_breaker.record_failure()
+    else:
+        circuit_breaker.record_ignored()
+
+
+async def _attempt_completion(kind: str, request: Dict[str, Any]) -> Any:
+    """
+    One chat completion call under the concurrency limit and the circuit breaker
+    """
+    if settings.OPENAI_CIRCUIT_ENABLED:
+        circuit_breaker.before_call()
+    start = time.perf_counter()
+    try:
+        async with _get_semaphore():
+            response = await get_client().chat.completions.create(**request)
+    except BaseException as e:
+        if settings.OPENAI_CIRCUIT_ENABLED:
+            _record_outcome(e)
+        if isinstance(e, Exception):
+            LLM_ERRORS.labels(kind, request["model"]).inc()
+        raise
+    if settings.OPENAI_CIRCUIT_ENABLED:
+        _record_outcome(None)
+    elapsed = time.perf_counter() - start
+    LLM_REQUEST_SECONDS.labels(kind, request["model"]).observe(elapsed)
+    hedger.record_latency(request["model"], elapsed)
+    _record_usage(response.usage)
+    if response.choices[0].finish_reason == "length":
+        LLM_TRUNCATED.labels(kind).inc()
+    return response
+
+
+def _can_hedge() -> bool:
+    # Only hedge into a healthy upstream with a free concurrency slot
+    return circuit_breaker.state == CLOSED and not _get_semaphore().locked()
+
+
+async def _create_completion(kind: str, **request: Any) -> Any:
+    """
+    Run a (non-streamed) chat completion; single corrections are hedged when
+    OPENAI_HEDGE_ENABLED is set
+    """
+    if kind == "single" and settings.OPENAI_HEDGE_ENABLED:
+        return await hedger.run(lambda: _attempt_completion(kind, request), request["model"], _can_hedge)
+    return await _attempt_completion(kind, request)
+
+
+async def _request_tier(original_text: str, tier: str) -> Tuple[str, str, Optional[float]]:
+    with_confidence = tier == FAST
+    response = await _create_completion(
+        "single", **_correction_request(original_text, model_for(tier), with_confidence=with_confidence)
+    )
+
+    # Parse the JSON response
+    result = json.loads(response.choices[0].message.content)
+
+    corrected_text = _checked_correction(result.get("corrected_text", original_text))
+    explanation = result.get("explanation", "No explanation provided.")
+    confidence = parse_confidence(result.get("confidence")) if with_confidence else None
+
+    return corrected_text, explanation, confidence
+
+
+async def request_correction(original_text: str) -> Tuple[str, str]:
+    """
+    Send a single correction request to the OpenAI API
+
+    With OPENAI_FAST_MODEL set, short tweets go to the fast model first and its
+    answer is redone by OPENAI_MODEL when it reports low confidence, rewrites too
+    much of the text, or fails. Unlike correct_tweet this does not swallow errors,
+    so callers can decide how to handle timeouts and upstream failures.
+    """
+    start = time.perf_counter()
+    if choose_tier(original_text) == FAST:
+        try:
+            corrected_text, explanation, confidence = await _request_tier(original_text, FAST)
+        except (ValueError, AttributeError):
+            reason = INVALID_ANSWER
+        except Exception as e:
+            print(f"Fast model failed, escalating: {str(e)}")
+            reason = FAST_ERROR
+        else:
+            reason = escalation_reason(original_text, corrected_text, confidence)
+            if reason is None:
+                ROUTED_SECONDS.labels("fast").observe(time.perf_counter() - start)
+                return corrected_text, explanation
+        ROUTING_ESCALATIONS.labels(reason).inc()
+        route = "escalated"
+    else:
+        route = "strong"
+
+    corrected_text, explanation, _ = await _request_tier(original_text, STRONG)
+    ROUTED_SECONDS.labels(route).observe(time.perf_counter() - start)
+    return corrected_text, explanation
+
+
+def _checked_correction(corrected_text: Any) -> str:
+    """
+    The model's corrected text, or ValueError (an invalid answer) when it is not a
+    string or does not fit the tweet column
+    """
+    if not isinstance(corrected_text, str):
+        raise ValueError("Invalid corrected_text in model answer")
+    if len(corrected_text) > MAX_TWEET_LENGTH:
+        raise ValueError(f"Corrected text is longer than {MAX_TWEET_LENGTH} characters")
+    return corrected_text
+
+
+def _parse_batch_item(item: Any) -> Optional[Tuple[str, str]]:
+    if not isinstance(item, dict):
+        return None
+    corrected_text = item.get("corrected_text")
+    explanation = item.get("explanation")
+    if not isinstance(corrected_text, str) or not isinstance(explanation, str):
+        return None
+    if len(corrected_text) > MAX_TWEET_LENGTH:
+        return None
+    return corrected_text, explanation
+
+
+async def request_batch_correction(texts: List[str]) -> List[Optional[Tuple[str, str]]]:
+    """
+    Correct several texts with a single chat completion
+
+    Returns one (corrected_text, explanation) per input, in order. Elements the model
+    left out or returned malformed come back as None so the caller can retry them.
+    Batches whose answers would not fit one completion are split and sent concurrently.
+    """
+    groups = split_batch(texts)
+    if len(groups) > 1:
+        answers = await asyncio.gather(*(request_batch_correction([texts[i] for i in group]) for group in groups))
+        results: List[Optional[Tuple[str, str]]] = [None] * len(texts)
+        for group, answer in zip(groups, answers):
+            for index, result in zip(group, answer):
+                results[index] = result
+        return results
+
+    prompt = build_batch_prompt(texts)
+    response = await _create_completion(
+        "batch",
+        model=settings.OPENAI_MODEL,
+        response_format={"type": "json_object"},
+        messages=prompt.messages,
+        temperature=0.3,
+        max_tokens=prompt.max_tokens,
+        timeout=settings.OPENAI_TIMEOUT_SECONDS,
+    )
+
+    results: List[Optional[Tuple[str, str]]] = [None] * len(texts)
+    try:
+        items = json.loads(response.choices[0].message.content).get("results", [])
+    except (ValueError, AttributeError):
+        return results
+    if not isinstance(items, list):
+        return results
+
+    for position, item in enumerate(items):
+        # Prefer the echoed id, fall back to array position
+        index = item.get("id", position) if isinstance(item, dict) else position
+        if isinstance(index, int) and 0 <= index < len(texts) and results[index] is None:
+            results[index] = _parse_batch_item(item)
+    return results
+
+
+def _batcher_stat(name: str):
+    return lambda: getattr(_batcher, name) if _batcher is not None else None
+
+
+CounterFunction("twinglish_llm_batches_total", "Batched chat completions sent", _batcher_stat("batches_sent"))
+CounterFunction("twinglish_llm_batched_items_total", "Corrections sent as part of a batch", _batcher_stat("items_batched"))
+CounterFunction("twinglish_llm_batch_failures_total", "Batched chat completions that failed as a whole", _batcher_stat("batch_failures"))
+CounterFunction(
+    "twinglish_correction_singleflight_total", "Corrections that started an LLM call or joined one already in flight",
+    lambda: {("leader",): correction_flights.calls, ("deduplicated",): correction_flights.deduplicated}, ("role",),
+)
+Gauge("twinglish_llm_circuit_state", "OpenAI circuit breaker: 0 closed, 1 half-open, 2 open", lambda: STATE_VALUES[circuit_breaker.state])
+CounterFunction("twinglish_llm_circuit_rejected_total", "Calls failed fast by the open circuit", lambda: circuit_breaker.rejected)
+CounterFunction(
+    "twinglish_llm_circuit_transitions_total", "Circuit breaker state changes",
+    lambda: {(state,): count for state, count in circuit_breaker.transitions.items()}, ("state",),
+)
+CounterFunction(
+    "twinglish_llm_hedges_total", "Hedged second attempts sent, and how many answered first",
+    lambda: {("sent",): hedger.hedges, ("won",): hedger.hedge_wins}, ("result",),
+)
+Gauge("twinglish_llm_semaphore_free", "Free OpenAI concurrency slots", lambda: _semaphore._value if _semaphore is not None else None)
+
+
+def get_batcher() -> MicroBatcher:
+    """
+    Return the process-wide micro-batcher, creating it on first use
+    """
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher(
+            request_batch_correction,
+            request_correction,
+            max_size=settings.OPENAI_BATCH_MAX_SIZE,
+            window_seconds=settings.OPENAI_BATCH_WINDOW_MS / 1000,
+        )
+    return _batcher
+
+
+async def _correct_uncached(original_text: str, cache_key: str) -> Tuple[str, str]:
+    if settings.OPENAI_BATCH_ENABLED:
+        result = await get_batcher().submit(original_text)
+    else:
+        result = await request_correction(original_text)
+    await correction_cache.set(cache_key, result)
+    return result
 
-# Initialize the OpenAI client using the API key from settings
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
-async def correct_tweet(original_text: str) -> Tuple[str, str]:
+async def correct_tweet(original_text: str, raise_errors: bool = False) -> Tuple[str, str]:
     """
     Uses OpenAI API to correct grammar and provide explanations for the given text
-    
+
     Args:
         original_text: The original text to correct
-        
+        raise_errors: Re-raise API errors instead of returning the original text,
+            for callers that retry on their own
+
     Returns:
         A tuple of (corrected_text, explanation)
     """
+    start = time.perf_counter()
+    outcome = "error"
     try:
         # Skip API call if no API key is configured
         if not settings.OPENAI_API_KEY:
             print("WARNING: No OpenAI API key found. Using echo mode.")
+            outcome = "echo"
             return original_text, "No grammar correction available (API key not configured)."
-        
-        # Construct the prompt for OpenAI
-        prompt = f"""
-        You are a helpful language learning assistant. Correct the following English text, 
-        fixing any grammar, spelling, or punctuation errors. Then explain the corrections you made.
-        
-        Original text: "{original_text}"
-        
-        Provide your response in JSON format with two fields:
-        1. corrected_text: The corrected version
-        2. explanation: A friendly explanation of the changes and why they improve the text
-        
-        Keep the original meaning and style. If the text is already correct, say so in the explanation.
-        """
-        
-        # Call the OpenAI API
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # You can adjust the model as needed
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": "You are a language correction assistant that helps non-native English speakers improve their writing."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,  # Lower temperature for more consistent corrections
-            max_tokens=1000
-        )
-        
-        # Extract the response
-        response_content = response.choices[0].message.content
-        
-        # Parse the JSON response
-        import json
-        result = json.loads(response_content)
-        
-        corrected_text = result.get("corrected_text", original_text)
-        explanation = result.get("explanation", "No explanation provided.")
-        
-        return corrected_text, explanation
-        
+
+        cache_key = make_key(original_text, cache_namespace(), PROMPT_VERSION)
+        cached = await correction_cache.get(cache_key)
+        if cached is not None:
+            outcome = "cache"
+            return cached
+
+        if settings.OPENAI_SINGLE_FLIGHT_ENABLED:
+            result = await correction_flights.do(cache_key, lambda: _correct_uncached(original_text, cache_key))
+        else:
+            result = await _correct_uncached(original_text, cache_key)
+        outcome = "llm"
+        return result
+
     except Exception as e:
         print(f"Error calling OpenAI API: {str(e)}")
+        if raise_errors:
+            raise
         # Fallback in case of error
         return original_text, f"Could not process correction: {str(e)}"
 
+    finally:
+        CORRECTION_SECONDS.labels(outcome).observe(time.perf_counter() - start)
+
+async def stream_correction(original_text: str) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Stream a correction while the model is still generating it
+
+    Yields ("corrected", corrected_text) as soon as that field of the JSON answer
+    is complete, ("explanation", text) for each new piece of the explanation, and
+    finally ("done", (corrected_text, explanation)). On failure, including an answer
+    cut off or malformed before both fields were complete, an ("error", message)
+    event is yielded, "done" carries the same fallback as correct_tweet and nothing
+    is cached.
+    Streams always use OPENAI_MODEL: a fast-tier answer could not be taken back
+    once its corrected text has been sent.
+    """
+    if not settings.OPENAI_API_KEY:
+        print("WARNING: No OpenAI API key found. Using echo mode.")
+        explanation = "No grammar correction available (API key not configured)."
+        yield "corrected", original_text
+        yield "explanation", explanation
+        yield "done", (original_text, explanation)
+        return
+
+    cache_key = make_key(original_text, cache_namespace(), PROMPT_VERSION)
+    cached = await correction_cache.get(cache_key)
+    if cached is not None:
+        yield "corrected", cached[0]
+        yield "explanation", cached[1]
+        yield "done", cached
+        return
+
+    parser = JsonFieldStreamer()
+    completion_tokens = 0
+    corrected_sent = False
+    start = time.perf_counter()
+    circuit = False  # Set once the breaker lets the call through; only those report an outcome
+    try:
+        request = _correction_request(original_text)
+        if settings.OPENAI_CIRCUIT_ENABLED:
+            circuit_breaker.before_call()
+            circuit = True
+        async with _get_semaphore():
+            # stream_options (usage in the last chunk) needs a newer openai client
+            # than the pinned one, so streamed tokens are counted locally
+            stream = await get_client().chat.completions.create(stream=True, **request)
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].finish_reason == "length":
+                    LLM_TRUNCATED.labels("stream").inc()
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                completion_tokens += count_tokens(chunk.choices[0].delta.content)
+                for kind, key, value in parser.feed(chunk.choices[0].delta.content):
+                    if key == "corrected_text" and kind == FIELD_END:
+                        value = _checked_correction(value)
+                        corrected_sent = True
+                        yield "corrected", value
+                    elif key == "explanation" and kind == FIELD_DELTA:
+                        yield "explanation", value
+            missing = [key for key in ("corrected_text", "explanation") if key not in parser.fields]
+            if missing:
+                raise ValueError(f"Incomplete answer, missing {' and '.join(missing)}")
+    except Exception as e:
+        print(f"Error calling OpenAI API: {str(e)}")
+        if not isinstance(e, CircuitOpenError):
+            LLM_ERRORS.labels("stream", settings.OPENAI_MODEL).inc()
+        if circuit:
+            _record_outcome(e)
+        if not corrected_sent:
+            yield "corrected", original_text
+        yield "error", f"Could not process correction: {str(e)}"
+        yield "done", (original_text, f"Could not process correction: {str(e)}")
+        return
+    except BaseException:
+        # Client went away (generator closed or task cancelled)
+        if circuit:
+            circuit_breaker.record_ignored()
+        raise
+    if circuit:
+        _record_outcome(None)
+
+    _record_tokens(count_message_tokens(request["messages"]), completion_tokens)
+    LLM_REQUEST_SECONDS.labels("stream", settings.OPENAI_MODEL).observe(time.perf_counter() - start)
+    corrected_text = parser.fields["corrected_text"]
+    explanation = parser.fields["explanation"] or "No explanation provided."
+    result = (corrected_text, explanation)
+    await correction_cache.set(cache_key, result)
+    yield "done", result
+
 # Function to determine if a text needs correction
 async def needs_correction(text: str) -> bool:
     """
     Determines if the given text needs grammatical correction
-    This is a simplified version that always returns True
-    In a production environment, you might want to implement more sophisticated logic
+
+    Runs the local pre-checker; False means the text is confidently correct and
+    the LLM call can be skipped.
+    """
+    return not precheck(text).skip_llm
+
+
+def precheck(text: str) -> PrecheckResult:
+    """
+    Run the local pre-checker and record its decision
     """
-    return True
\ No newline at end of file
+    return prechecker.check(text)
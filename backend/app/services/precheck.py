@@ -0,0 +1,230 @@
+# app/services/precheck.py
+import random
+import re
+import time
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.metrics import CounterFunction
+
+# Pre-check decisions
+CLEAN = "clean"          # Confidently correct, the LLM call can be skipped
+NEEDS_LLM = "needs_llm"  # A learner-error rule or an unknown word matched
+UNSURE = "unsure"        # Nothing wrong found, but not confident enough to skip
+
+WORDS_FILE = Path(__file__).parent / "data" / "common_words.txt"
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?|\d+(?:[.,:]\d+)*|\S")
+_SENTENCE_END_RE = re.compile(r"[.!?][\"')\]]*$")
+
+# Common learner errors. Any match sends the tweet to the LLM, so a false positive
+# only costs a call that would have happened anyway. RULES run on the lowercased
+# text (case-insensitive matching is several times slower), CASED_RULES on the
+# original text, and LEARNER_WORDS are looked up per token.
+_PRESENT_VERBS = (
+    r"(?:go|goes|come|comes|eat|eats|see|sees|have|has|do|does|is|are|am|make|makes|take|takes|buy|buys|"
+    r"get|gets|play|plays|visit|visits|watch|watches|meet|meets|walk|walks|tell|tells|say|says|forget|forgets)"
+)
+_PAST_TIME = r"(?:yesterday|last (?:night|week|weekend|month|year|summer|winter|time)|\w+ ago)"
+
+RULES = {
+    "repeated_word": re.compile(r"\b(?P<word>\w+) (?P=word)\b"),
+    "be_agree": re.compile(r"\b(?:am|is|are|was|were) agree\b"),
+    "a_before_vowel": re.compile(r"\ba (?!uni|use|usu|eu|one|once)[aeiou]"),
+    "an_before_consonant": re.compile(r"\ban (?!hour|honest|honor|honour|heir|herb)[b-df-hj-np-tv-z]"),
+    "third_person_s": re.compile(
+        r"\b(?:he|she|it) (?:go|do|have|want|like|need|make|say|think|know|come|see|get|take|work|live|play|study|watch)\b"
+    ),
+    "double_comparative": re.compile(
+        r"\bmore (?:better|worse|bigger|faster|easier|smaller|older|younger|happier|cheaper|longer|shorter)\b"
+    ),
+    "past_after_did": re.compile(
+        r"\b(?:did|didn't|does|doesn't|do|don't) (?:not )?(?:\w+ed|went|saw|came|ate|took|made|got|gave|knew|thought|bought)\b"
+    ),
+    "people_singular_verb": re.compile(r"\bpeople (?:is|was|has|does)\b"),
+    "singular_subject_plural_verb": re.compile(r"\b(?:he|she|it|this|that) (?:don't|do not|are|were|haven't)\b"),
+    "i_verb_agreement": re.compile(r"\bi (?:has|hasn't|is|isn't|are|aren't|does|doesn't|goes|wants|likes|needs|lives|works)\b"),
+    "plural_subject_singular_verb": re.compile(r"\b(?:you|we|they) (?:has|hasn't|is|isn't|was|wasn't|does|doesn't)\b"),
+    "object_pronoun_subject": re.compile(r"(?:^|[.!?] )(?:me|him|her|us|them) and \w+|\b(?:him|her|them) and (?:me|i)\b"),
+    "present_with_past_time": re.compile(
+        rf"\b(?:i|you|we|they|he|she|it) {_PRESENT_VERBS}\b[^.!?]*\b{_PAST_TIME}\b"
+        rf"|\b{_PAST_TIME}\b,? (?:i|you|we|they|he|she|it) {_PRESENT_VERBS}\b"
+    ),
+    "modal_to": re.compile(r"\b(?:can|can't|cannot|could|must|should|will|won't|would|might|may|shall) to\b"),
+    "modal_inflected_verb": re.compile(
+        r"\b(?:can|can't|could|must|should|will|won't|would|might|may) (?:not )?(?:goes|has|is|was|went|did|does|wants|likes|\w+ed)\b"
+    ),
+    "explain_me": re.compile(r"\bexplain (?:me|him|her|us|them)\b"),
+    "discuss_about": re.compile(r"\bdiscuss about\b"),
+    "since_duration": re.compile(r"\bsince \d+ (?:year|month|week|day|hour)"),
+    "have_years_old": re.compile(r"\bi have \d+ years\b"),
+    "modal_of": re.compile(r"\b(?:could|would|should|must|might) of\b"),
+    "your_youre": re.compile(r"\byour (?:welcome|right|wrong|going|coming|doing|not)\b"),
+    "its_its": re.compile(r"\bits (?:a|an|the|not|been|going|very|so)\b"),
+    "then_than": re.compile(r"\b(?:more|less|better|worse|bigger|smaller|older|younger|rather) then\b"),
+}
+
+CASED_RULES = {
+    "lowercase_i": re.compile(r"(?<![\w'])i(?!\w)"),
+    "space_before_punctuation": re.compile(r"\s[,.!?;:]"),
+    "double_space": re.compile(r"\S  +\S"),
+}
+
+LEARNER_WORDS = {
+    **dict.fromkeys(
+        "goed runned eated buyed thinked teached catched bringed writed speaked taked maked gived comed "
+        "sayed knowed drinked swimmed sleeped feeled keeped leaved meeted selled telled finded builded "
+        "spended standed understanded winned".split(),
+        "irregular_past",
+    ),
+    **dict.fromkeys("childs mans womans foots tooths mouses persons peoples".split(), "irregular_plural"),
+    **dict.fromkeys(
+        "informations advices furnitures equipments homeworks knowledges luggages researches evidences".split(),
+        "uncountable_plural",
+    ),
+    "alot": "alot",
+}
+
+
+class PrecheckResult(NamedTuple):
+    decision: str
+    confidence: float
+    reasons: List[str]
+    skip_llm: bool
+
+
+def load_words(extra_path: Optional[str] = None) -> FrozenSet[str]:
+    """
+    Load the built-in vocabulary plus an optional extra word list
+    """
+    words = set()
+    paths = [WORDS_FILE] + ([Path(extra_path)] if extra_path else [])
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.startswith("#"):
+                        words.update(word.lower() for word in line.split())
+        except OSError as e:
+            print(f"WARNING: Could not load pre-check dictionary {path}: {e}")
+    return frozenset(words)
+
+
+class Prechecker:
+    """
+    Local, network-free grammar pre-check that decides whether a tweet needs the LLM
+
+    Every decision is counted, and the outcome of the LLM calls that still happen
+    is recorded per decision, so the share of calls saved (and missed savings in
+    the "unsure" bucket) can be measured. A sample of "clean" tweets can still be
+    sent to the LLM (PRECHECK_SHADOW_RATE) to measure how often "clean" is wrong.
+    """
+
+    def __init__(self):
+        self._words: Optional[FrozenSet[str]] = None
+        self.decisions: Dict[str, int] = {CLEAN: 0, NEEDS_LLM: 0, UNSURE: 0}
+        self.rule_hits: Dict[str, int] = {}
+        self.llm_calls_skipped = 0
+        self.llm_perfect: Dict[str, int] = {CLEAN: 0, NEEDS_LLM: 0, UNSURE: 0}
+        self.llm_corrected: Dict[str, int] = {CLEAN: 0, NEEDS_LLM: 0, UNSURE: 0}
+        self.total_check_seconds = 0.0
+
+    @property
+    def words(self) -> FrozenSet[str]:
+        if self._words is None:
+            self._words = load_words(settings.PRECHECK_DICTIONARY_PATH)
+        return self._words
+
+    def check(self, text: str) -> PrecheckResult:
+        start = time.perf_counter()
+        result = self._check(text)
+        self.total_check_seconds += time.perf_counter() - start
+
+        self.decisions[result.decision] += 1
+        if result.skip_llm:
+            self.llm_calls_skipped += 1
+        return result
+
+    def _check(self, text: str) -> PrecheckResult:
+        if not settings.PRECHECK_ENABLED:
+            return PrecheckResult(UNSURE, 0.0, ["disabled"], False)
+
+        text = text.replace("’", "'").strip()
+        lowered = " ".join(text.lower().split())
+        reasons = [name for name, rule in RULES.items() if rule.search(lowered)]
+        reasons += [name for name, rule in CASED_RULES.items() if rule.search(text)]
+
+        tokens = _TOKEN_RE.findall(text)
+        words = [token for token in tokens if token[0].isalpha()]
+        unknown = []
+        proper_nouns = 0
+        for index, word in enumerate(words):
+            lowered_word = word.lower()
+            if lowered_word in self.words:
+                continue
+            if lowered_word in LEARNER_WORDS:
+                reasons.append(LEARNER_WORDS[lowered_word])
+                continue
+            # A capitalized unknown word after the first one is probably a name
+            if index > 0 and word[0].isupper() and word[1:].islower():
+                proper_nouns += 1
+            elif word.isascii():
+                unknown.append(word)
+            else:
+                reasons.append("non_ascii_word")
+
+        for name in reasons:
+            self.rule_hits[name] = self.rule_hits.get(name, 0) + 1
+        if unknown:
+            reasons.append("unknown_word")
+        if reasons:
+            return PrecheckResult(NEEDS_LLM, 0.9, reasons, False)
+
+        confidence = 1.0 - 0.1 * proper_nouns
+        if not words or not text[0].isupper():
+            confidence -= 0.5
+            reasons.append("sentence_start")
+        if not _SENTENCE_END_RE.search(text):
+            confidence -= 0.5
+            reasons.append("sentence_end")
+        if len(words) > settings.PRECHECK_MAX_WORDS:
+            confidence -= 0.3
+            reasons.append("long_text")
+
+        if confidence < settings.PRECHECK_MIN_CONFIDENCE:
+            return PrecheckResult(UNSURE, max(confidence, 0.0), reasons, False)
+
+        # Shadow sample: still ask the LLM to measure how often "clean" is wrong
+        shadow = random.random() < settings.PRECHECK_SHADOW_RATE
+        return PrecheckResult(CLEAN, confidence, ["shadow"] if shadow else [], not shadow)
+
+    def record_llm_outcome(self, result: PrecheckResult, corrected: bool) -> None:
+        """
+        Record what the LLM did with a tweet that was not skipped
+        """
+        bucket = self.llm_corrected if corrected else self.llm_perfect
+        bucket[result.decision] += 1
+
+    def stats(self) -> Dict[str, object]:
+        checks = sum(self.decisions.values())
+        return {
+            "decisions": dict(self.decisions),
+            "llm_calls_skipped": self.llm_calls_skipped,
+            "skip_ratio": round(self.llm_calls_skipped / checks, 4) if checks else 0.0,
+            "llm_perfect_by_decision": dict(self.llm_perfect),
+            "llm_corrected_by_decision": dict(self.llm_corrected),
+            "rule_hits": dict(self.rule_hits),
+            "avg_check_us": round(self.total_check_seconds / checks * 1e6, 2) if checks else 0.0,
+        }
+
+
+prechecker = Prechecker()
+
+CounterFunction(
+    "twinglish_precheck_decisions_total", "Local pre-check decisions",
+    lambda: {(decision,): count for decision, count in prechecker.decisions.items()}, ("decision",),
+)
+CounterFunction(
+    "twinglish_precheck_llm_calls_skipped_total", "LLM calls saved by the pre-checker", lambda: prechecker.llm_calls_skipped
+)
@@ -0,0 +1,234 @@
+# app/services/prompts.py
+import json
+import math
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.models.tweet import MAX_TWEET_LENGTH
+
+# Bump whenever a prompt changes so cached corrections from the old prompt are not reused
+PROMPT_VERSION = "2"
+
+# The instructions live in the system message and the user message is only the
+# text, so the static prefix is identical across requests and no indentation or
+# boilerplate is paid for per call
+SYSTEM_PROMPT = (
+    "You correct English written by language learners. Fix grammar, spelling and punctuation "
+    "while keeping the meaning and style. Answer in JSON with two fields: corrected_text (the "
+    "corrected text) and explanation (a brief, friendly explanation of the changes and why they "
+    "help, or a note that the text is already correct)."
+)
+
+# Fast routing tier: the same task plus a self-reported confidence that decides
+# whether the answer is escalated to the stronger model
+CONFIDENCE_SYSTEM_PROMPT = (
+    "You correct English written by language learners. Fix grammar, spelling and punctuation "
+    "while keeping the meaning and style. Answer in JSON with three fields: corrected_text (the "
+    "corrected text), explanation (a brief, friendly explanation of the changes and why they "
+    "help, or a note that the text is already correct) and confidence (a number from 0 to 1: how "
+    "sure you are that the correction is complete and right)."
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You correct English written by language learners. Fix grammar, spelling and punctuation "
+    "while keeping the meaning and style. The input is a JSON array of {id, text} objects. Answer "
+    "in JSON with one field, results: an array with one {id, corrected_text, explanation} object "
+    "per input, where explanation briefly and kindly explains the changes and why they help, or "
+    "notes that the text is already correct."
+)
+
+# Output budget: the JSON keys and quotes, the corrected text (which can be a
+# little longer than the original) and the explanation
+JSON_OVERHEAD_TOKENS = 16
+BATCH_ITEM_OVERHEAD_TOKENS = 8
+CONFIDENCE_TOKENS = 8
+CORRECTION_GROWTH = 1.3
+
+# The version 1 prompt, kept only to report how many tokens version 2 saves
+_V1_MAX_TOKENS = 1000  # Batches reserved min(4000, 500 per text)
+_V1_SINGLE_TEMPLATE = """
+        You are a helpful language learning assistant. Correct the following English text,
+        fixing any grammar, spelling, or punctuation errors. Then explain the corrections you made.
+
+        Original text: "{text}"
+
+        Provide your response in JSON format with two fields:
+        1. corrected_text: The corrected version
+        2. explanation: A friendly explanation of the changes and why they improve the text
+
+        Keep the original meaning and style. If the text is already correct, say so in the explanation.
+        """
+_V1_BATCH_TEMPLATE = """
+        You are a helpful language learning assistant. Correct each of the following English texts,
+        fixing any grammar, spelling, or punctuation errors. Then explain the corrections you made.
+
+        The texts are given as a JSON array of objects with an id and a text.
+
+        Provide your response as a JSON object with a single field "results": an array with one
+        object per input text, each with three fields:
+        1. id: The id of the input text
+        2. corrected_text: The corrected version
+        3. explanation: A friendly explanation of the changes and why they improve the text
+
+        Keep the original meaning and style. If a text is already correct, say so in its explanation.
+
+        Texts: {items}
+        """
+_V1_SYSTEM_PROMPT = "You are a language correction assistant that helps non-native English speakers improve their writing."
+
+PROMPT_TOKENS_SAVED = Counter(
+    "twinglish_llm_prompt_tokens_saved_total", "Prompt tokens saved by the compact prompt, compared with prompt version 1"
+)
+MAX_TOKENS_SAVED = Counter(
+    "twinglish_llm_max_tokens_saved_total", "Output tokens no longer reserved through max_tokens, compared with prompt version 1"
+)
+
+# Fallback token estimate: words and punctuation, long words counting as several tokens
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+_encoding: Any = None
+_encoding_loaded = False
+
+
+class Prompt(NamedTuple):
+    messages: List[Dict[str, str]]
+    max_tokens: int
+    prompt_tokens: int
+
+
+def get_encoding() -> Optional[Any]:
+    """
+    tiktoken encoding for OPENAI_MODEL, or None when tiktoken is not installed
+
+    tiktoken is optional and may need to download its BPE file the first time, so
+    it is loaded once (in the warm-up) and any failure falls back to an estimate.
+    """
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        try:
+            import tiktoken
+
+            try:
+                _encoding = tiktoken.encoding_for_model(settings.OPENAI_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            print(f"WARNING: tiktoken unavailable, estimating token counts: {str(e)}")
+            _encoding = None
+        _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum(1 + len(piece) // 6 for piece in _PIECE_RE.findall(text))
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    # Roughly 4 tokens of chat framing per message
+    return sum(count_tokens(message["content"]) + 4 for message in messages)
+
+
+def _output_budget(text_tokens: int) -> int:
+    return JSON_OVERHEAD_TOKENS + math.ceil(text_tokens * CORRECTION_GROWTH) + settings.OPENAI_EXPLANATION_MAX_TOKENS
+
+
+# Hard ceiling per text: a full-length tweet at one token per character
+MAX_TOKENS_CAP = JSON_OVERHEAD_TOKENS + math.ceil(MAX_TWEET_LENGTH * CORRECTION_GROWTH) + settings.OPENAI_EXPLANATION_MAX_TOKENS
+
+
+def _check_length(text: str) -> None:
+    if len(text) > MAX_TWEET_LENGTH:
+        raise ValueError(f"Text is longer than {MAX_TWEET_LENGTH} characters")
+
+
+_v1_overhead: Dict[str, int] = {}
+
+
+def _v1_prompt_tokens(template: str, content_tokens: int) -> int:
+    """
+    Tokens version 1 would have sent: its fixed text (counted once) plus the content
+    """
+    if template not in _v1_overhead:
+        _v1_overhead[template] = count_message_tokens([
+            {"role": "system", "content": _V1_SYSTEM_PROMPT},
+            {"role": "user", "content": template.format(text="", items="")},
+        ])
+    return _v1_overhead[template] + content_tokens
+
+
+def _log_savings(kind: str, prompt_tokens: int, v1_prompt_tokens: int, max_tokens: int, v1_max_tokens: int) -> None:
+    prompt_saved = max(v1_prompt_tokens - prompt_tokens, 0)
+    max_tokens_saved = max(v1_max_tokens - max_tokens, 0)
+    PROMPT_TOKENS_SAVED.inc(prompt_saved)
+    MAX_TOKENS_SAVED.inc(max_tokens_saved)
+    if settings.OPENAI_LOG_TOKEN_SAVINGS:
+        print(
+            f"Prompt ({kind}): {prompt_tokens} tokens, {prompt_saved} fewer than v1; "
+            f"max_tokens {max_tokens}, {max_tokens_saved} fewer than v1"
+        )
+
+
+def build_correction_prompt(text: str, with_confidence: bool = False) -> Prompt:
+    """
+    Messages and max_tokens for correcting one text
+
+    with_confidence also asks for a confidence field (fast routing tier).
+    Raises ValueError for text longer than a tweet.
+    """
+    _check_length(text)
+    system_prompt = CONFIDENCE_SYSTEM_PROMPT if with_confidence else SYSTEM_PROMPT
+    messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": text}]
+    text_tokens = count_tokens(text)
+    prompt_tokens = count_message_tokens(messages)
+    max_tokens = min(_output_budget(text_tokens), MAX_TOKENS_CAP)
+    if with_confidence:
+        max_tokens += CONFIDENCE_TOKENS
+
+    _log_savings("single", prompt_tokens, _v1_prompt_tokens(_V1_SINGLE_TEMPLATE, text_tokens), max_tokens, _V1_MAX_TOKENS)
+    return Prompt(messages, max_tokens, prompt_tokens)
+
+
+def _batch_item_budget(text: str) -> int:
+    return min(_output_budget(count_tokens(text)), MAX_TOKENS_CAP) + BATCH_ITEM_OVERHEAD_TOKENS
+
+
+def split_batch(texts: List[str]) -> List[List[int]]:
+    """
+    Group the positions of texts, in order, so that no group's answer needs more
+    than OPENAI_MAX_OUTPUT_TOKENS
+    """
+    groups: List[List[int]] = []
+    budget = settings.OPENAI_MAX_OUTPUT_TOKENS
+    for index, text in enumerate(texts):
+        needed = _batch_item_budget(text)
+        if not groups or budget < needed:
+            groups.append([])
+            budget = settings.OPENAI_MAX_OUTPUT_TOKENS - JSON_OVERHEAD_TOKENS
+        groups[-1].append(index)
+        budget -= needed
+    return groups
+
+
+def build_batch_prompt(texts: List[str]) -> Prompt:
+    """
+    Messages and max_tokens for correcting several texts in one completion
+
+    max_tokens never exceeds OPENAI_MAX_OUTPUT_TOKENS; use split_batch() first so
+    that every answer fits. Raises ValueError when any text is longer than a tweet.
+    """
+    for text in texts:
+        _check_length(text)
+    items = [{"id": i, "text": text} for i, text in enumerate(texts)]
+    payload = json.dumps(items, ensure_ascii=False, separators=(",", ":"))
+    messages = [{"role": "system", "content": BATCH_SYSTEM_PROMPT}, {"role": "user", "content": payload}]
+    prompt_tokens = count_message_tokens(messages)
+    max_tokens = min(JSON_OVERHEAD_TOKENS + sum(_batch_item_budget(text) for text in texts), settings.OPENAI_MAX_OUTPUT_TOKENS)
+
+    v1_prompt_tokens = _v1_prompt_tokens(_V1_BATCH_TEMPLATE, count_tokens(json.dumps(items, ensure_ascii=False)))
+    _log_savings("batch", prompt_tokens, v1_prompt_tokens, max_tokens, min(4000, 500 * len(texts)))
+    return Prompt(messages, max_tokens, prompt_tokens)
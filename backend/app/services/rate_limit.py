@@ -0,0 +1,286 @@
+# app/services/rate_limit.py
+import math
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.metrics import CounterFunction
+from app.db.redis import get_redis, mark_redis_failed
+
+KEY_PREFIX = "twinglish:ratelimit"
+
+# Limit scopes, also the "scope" label of the metrics
+USER = "user"
+GLOBAL = "global"
+CONCURRENCY = "concurrency"
+
+# Buckets to take a token from at once: (key, tokens per second, capacity)
+Bucket = Tuple[str, float, float]
+
+# Takes one token from every bucket, or from none when any is empty. Uses the
+# Redis clock so that all processes agree. Returns {0, 0} when allowed,
+# otherwise {milliseconds until every bucket has a token, index of the bucket
+# that needs longest}.
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local wait = 0
+local limiting = 0
+local tokens = {}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    available = math.min(capacity, available + math.max(0, now - ts) * rate)
+    if available < 1 and (1 - available) / rate > wait then
+        wait = (1 - available) / rate
+        limiting = i
+    end
+    tokens[i] = available
+end
+if wait > 0 then
+    return {math.ceil(wait), limiting}
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    redis.call('HSET', key, 'tokens', tokens[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate) + 1000)
+end
+return {0, 0}
+"""
+
+# Slots are members of a sorted set scored by their lease expiry. Drops expired
+# leases (slots of processes that died before releasing them), then takes slot
+# ARGV[3] with a lease of ARGV[2] ms if fewer than ARGV[1] are held. Returns 1 or 0.
+ACQUIRE_SLOT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class RateLimited(Exception):
+    """Raised when a request is over a limit; retry_after is in whole seconds"""
+
+    def __init__(self, scope: str, retry_after: int):
+        super().__init__(f"Rate limit exceeded ({scope})")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class LocalTokenBuckets:
+    """
+    Process-local token buckets with the semantics of TOKEN_BUCKET_SCRIPT
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float, float, float]] = {}  # key -> (tokens, time, rate, capacity)
+
+    def take(self, buckets: Sequence[Bucket]) -> Tuple[float, int]:
+        """
+        Take a token from every bucket; returns (0, -1) or the seconds to wait
+        and the index of the bucket that needs longest
+        """
+        now = time.monotonic()
+        wait = 0.0
+        limiting = -1
+        tokens: List[float] = []
+        for i, (key, rate, capacity) in enumerate(buckets):
+            available, ts, _, _ = self._buckets.get(key, (capacity, now, rate, capacity))
+            available = min(capacity, available + (now - ts) * rate)
+            if available < 1 and (1 - available) / rate > wait:
+                wait = (1 - available) / rate
+                limiting = i
+            tokens.append(available)
+        if wait > 0:
+            return wait, limiting
+        for (key, rate, capacity), available in zip(buckets, tokens):
+            self._buckets[key] = (available - 1, now, rate, capacity)
+        if len(self._buckets) > settings.RATE_LIMIT_LOCAL_MAX_KEYS:
+            self._evict_full(now)
+        return 0.0, -1
+
+    def _evict_full(self, now: float) -> None:
+        # Buckets that have refilled behave exactly like missing ones
+        for key, (available, ts, rate, capacity) in list(self._buckets.items()):
+            if available + (now - ts) * rate >= capacity:
+                del self._buckets[key]
+
+
+class CorrectionLimiter:
+    """
+    Admission control for the correction endpoints
+
+    check() takes a token from the user's bucket and from the global one
+    (RATE_LIMIT_USER_* and RATE_LIMIT_GLOBAL_*, refilled continuously) and raises
+    RateLimited when either is empty. slot() caps the corrections a user has in
+    flight at CORRECTION_USER_MAX_IN_FLIGHT.
+
+    State lives in Redis, updated by Lua scripts so each decision is one atomic
+    round trip shared by all processes. While Redis is unavailable the same
+    limits are applied per process.
+    """
+
+    def __init__(self):
+        self._local_buckets = LocalTokenBuckets()
+        self._local_slots: Dict[int, int] = {}
+        self._scripts: Dict[str, object] = {}
+        self.allowed = 0
+        self.limited: Dict[str, int] = {USER: 0, GLOBAL: 0, CONCURRENCY: 0}
+        self.redis_errors = 0
+
+    def _redis(self):
+        if not settings.RATE_LIMIT_REDIS_ENABLED:
+            return None
+        return get_redis()
+
+    def _script(self, redis, source: str):
+        # Registered per client, so a reconnected client gets its own
+        script = self._scripts.get(source)
+        if script is None or script.registered_client is not redis:
+            script = self._scripts[source] = redis.register_script(source)
+        return script
+
+    def _buckets(self, user_id: int) -> List[Bucket]:
+        return [
+            (f"{KEY_PREFIX}:{user_id}:{USER}", settings.RATE_LIMIT_USER_PER_MINUTE / 60, settings.RATE_LIMIT_USER_BURST),
+            (f"{KEY_PREFIX}:{GLOBAL}", settings.RATE_LIMIT_GLOBAL_PER_MINUTE / 60, settings.RATE_LIMIT_GLOBAL_BURST),
+        ]
+
+    async def check(self, user_id: int) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        buckets = self._buckets(user_id)
+        outcome = await self._take_redis(buckets)
+        wait, limiting = outcome if outcome is not None else self._local_buckets.take(buckets)
+        if wait <= 0:
+            self.allowed += 1
+            return
+
+        scope = USER if limiting == 0 else GLOBAL
+        self.limited[scope] += 1
+        raise RateLimited(scope, max(1, math.ceil(wait)))
+
+    async def _take_redis(self, buckets: Sequence[Bucket]) -> Optional[Tuple[float, int]]:
+        redis = self._redis()
+        if redis is None:
+            return None
+        args = []
+        for _, rate, capacity in buckets:
+            args.extend((rate / 1000, capacity))
+        try:
+            wait_ms, limiting = await self._script(redis, TOKEN_BUCKET_SCRIPT)(keys=[key for key, _, _ in buckets], args=args)
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_failed(e)
+            return None
+        # Lua indexes from 1
+        return int(wait_ms) / 1000, int(limiting) - 1
+
+    @asynccontextmanager
+    async def slot(self, user_id: int) -> AsyncIterator[None]:
+        """
+        Hold one of the user's in-flight correction slots, or raise RateLimited
+        """
+        release = await self.acquire_slot(user_id)
+        try:
+            yield
+        finally:
+            await release()
+
+    async def acquire_slot(self, user_id: int):
+        """
+        Take a slot and return the coroutine function that releases it, for
+        callers that cannot use slot(), e.g. streamed responses. Releasing more
+        than once is harmless.
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return _release_nothing
+        limit = settings.CORRECTION_USER_MAX_IN_FLIGHT
+        redis = self._redis()
+        if redis is not None:
+            key = f"{KEY_PREFIX}:{user_id}:{CONCURRENCY}"
+            slot_id = uuid.uuid4().hex
+            try:
+                acquired = await self._script(redis, ACQUIRE_SLOT_SCRIPT)(
+                    keys=[key], args=[limit, int(settings.CORRECTION_SLOT_LEASE_SECONDS * 1000), slot_id]
+                )
+            except Exception as e:
+                self.redis_errors += 1
+                mark_redis_failed(e)
+            else:
+                if not acquired:
+                    self._reject_slot()
+                return _once(lambda: self._release_redis(redis, key, slot_id))
+
+        if self._local_slots.get(user_id, 0) >= limit:
+            self._reject_slot()
+        self._local_slots[user_id] = self._local_slots.get(user_id, 0) + 1
+        return _once(lambda: self._release_local(user_id))
+
+    def _reject_slot(self) -> None:
+        self.limited[CONCURRENCY] += 1
+        raise RateLimited(CONCURRENCY, settings.CORRECTION_SLOT_RETRY_AFTER_SECONDS)
+
+    async def _release_redis(self, redis, key: str, slot_id: str) -> None:
+        try:
+            await redis.zrem(key, slot_id)
+        except Exception as e:
+            # The lease frees the slot later
+            self.redis_errors += 1
+            mark_redis_failed(e)
+
+    async def _release_local(self, user_id: int) -> None:
+        held = self._local_slots.get(user_id, 0) - 1
+        if held > 0:
+            self._local_slots[user_id] = held
+        else:
+            self._local_slots.pop(user_id, None)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "allowed": self.allowed,
+            "limited": dict(self.limited),
+            "local_slots_held": sum(self._local_slots.values()),
+            "redis_errors": self.redis_errors,
+        }
+
+
+async def _release_nothing() -> None:
+    return None
+
+
+def _once(release):
+    released = False
+
+    async def release_once() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            await release()
+
+    return release_once
+
+
+correction_limiter = CorrectionLimiter()
+
+CounterFunction("twinglish_rate_limit_allowed_total", "Correction requests admitted by the rate limiter", lambda: correction_limiter.allowed)
+CounterFunction(
+    "twinglish_rate_limited_total", "Correction requests rejected with 429 per limit",
+    lambda: {(scope,): count for scope, count in correction_limiter.limited.items()}, ("scope",),
+)
+CounterFunction(
+    "twinglish_rate_limit_redis_errors_total", "Redis errors in the rate limiter (local limits applied meanwhile)",
+    lambda: correction_limiter.redis_errors,
+)
@@ -0,0 +1,74 @@
+# app/services/routing.py
+from difflib import SequenceMatcher
+from typing import Any, Optional
+
+from app.core.config import settings
+
+# Model tiers
+FAST = "fast"      # OPENAI_FAST_MODEL, asked for a confidence with its answer
+STRONG = "strong"  # OPENAI_MODEL
+
+# Reasons to escalate a fast answer to the strong model
+LOW_CONFIDENCE = "low_confidence"
+LARGE_EDIT = "large_edit"
+INVALID_ANSWER = "invalid_answer"
+FAST_ERROR = "error"
+
+
+def routing_enabled() -> bool:
+    return bool(settings.OPENAI_FAST_MODEL) and settings.OPENAI_FAST_MODEL != settings.OPENAI_MODEL
+
+
+def model_for(tier: str) -> str:
+    return settings.OPENAI_FAST_MODEL if tier == FAST else settings.OPENAI_MODEL
+
+
+def choose_tier(text: str) -> str:
+    """
+    Tier that gets the first attempt: short tweets start on the fast model
+    """
+    if routing_enabled() and len(text) <= settings.OPENAI_ROUTING_FAST_MAX_CHARS:
+        return FAST
+    return STRONG
+
+
+def cache_namespace() -> str:
+    """
+    Model part of the correction cache key; answers from a routed setup are only
+    reused by the same pair of models
+    """
+    if routing_enabled():
+        return f"{settings.OPENAI_FAST_MODEL}>{settings.OPENAI_MODEL}"
+    return settings.OPENAI_MODEL
+
+
+def edit_ratio(original: str, corrected: str) -> float:
+    """
+    Share of the text the correction changed: 0.0 for identical, 1.0 for unrelated
+    """
+    if original == corrected:
+        return 0.0
+    return 1.0 - SequenceMatcher(None, original, corrected, autojunk=False).ratio()
+
+
+def parse_confidence(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    try:
+        confidence = float(value)
+    except (TypeError, ValueError):
+        return None
+    return confidence if 0.0 <= confidence <= 1.0 else None
+
+
+def escalation_reason(original: str, corrected: str, confidence: Optional[float]) -> Optional[str]:
+    """
+    Why a fast-tier answer should be redone by the strong model, or None to keep it
+
+    A missing or malformed confidence counts as low confidence.
+    """
+    if confidence is None or confidence < settings.OPENAI_ROUTING_MIN_CONFIDENCE:
+        return LOW_CONFIDENCE
+    if edit_ratio(original, corrected) > settings.OPENAI_ROUTING_MAX_EDIT_RATIO:
+        return LARGE_EDIT
+    return None
@@ -0,0 +1,139 @@
+# app/services/search.py
+import base64
+import heapq
+import html
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# Text search configuration of the tweet.search_vector column (see the migration)
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+SEARCH_VECTOR = literal_column("tweet.search_vector", TSVECTOR)
+
+# Searched fields, most important first; the weights mirror setweight() A, B, C
+SEARCH_FIELDS = ("original_text", "corrected_text", "explanation")
+FIELD_WEIGHTS = {"original_text": 1.0, "corrected_text": 0.4, "explanation": 0.2}
+
+# ts_headline marks matches with these, so the text can be escaped before the
+# markers become <mark> tags
+START_MARK = "\x02"
+STOP_MARK = "\x03"
+HEADLINE_OPTIONS = f"StartSel={START_MARK}, StopSel={STOP_MARK}, HighlightAll=true"
+
+SearchCursor = Tuple[float, int]
+
+_WORD = re.compile(r"[\w']+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased words of text, as indexed by the in-process search
+    """
+    return [word.strip("'") for word in _WORD.findall(text.lower()) if word.strip("'")]
+
+
+def encode_search_cursor(rank: float, tweet_id: int) -> str:
+    """
+    Opaque cursor for the position right after a result; the rank is kept exactly
+    """
+    raw = f"{rank!r}|{tweet_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> SearchCursor:
+    """
+    Decode a cursor made by encode_search_cursor, raising ValueError if it is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        rank, tweet_id = raw.rsplit("|", 1)
+        return float(rank), int(tweet_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def from_headline(headline: str) -> str:
+    """
+    HTML-escape ts_headline output and turn its markers into <mark> tags
+    """
+    return html.escape(headline).replace(START_MARK, "<mark>").replace(STOP_MARK, "</mark>")
+
+
+def highlight(text: str, terms: Iterable[str]) -> str:
+    """
+    HTML-escaped text with every word in terms wrapped in <mark>
+    """
+    terms = set(terms)
+    parts = []
+    position = 0
+    for match in _WORD.finditer(text):
+        if match.group().lower().strip("'") in terms:
+            parts.append(html.escape(text[position:match.start()]))
+            parts.append(f"<mark>{html.escape(match.group())}</mark>")
+            position = match.end()
+    parts.append(html.escape(text[position:]))
+    return "".join(parts)
+
+
+def before_cursor(rank: float, tweet_id: int, after: Optional[SearchCursor]) -> bool:
+    """
+    Whether a result sorts after the cursor in (rank, id) descending order
+    """
+    return after is None or (rank, tweet_id) < after
+
+
+class InvertedIndex:
+    """
+    In-process full-text index for the memory tweet store
+
+    Postings map (user_id, word) to the weighted number of occurrences of the word
+    in each tweet, so a query only visits tweets containing its rarest word. A
+    result must contain every query word; its rank is the sum of the weights.
+    Words are matched exactly (lowercased, no stemming), unlike Postgres.
+    """
+
+    def __init__(self):
+        self._postings: Dict[Tuple[int, str], Dict[int, float]] = {}
+
+    @staticmethod
+    def _weights(tweet: dict) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for field in SEARCH_FIELDS:
+            for word in tokenize(tweet.get(field) or ""):
+                weights[word] = weights.get(word, 0.0) + FIELD_WEIGHTS[field]
+        return weights
+
+    def add(self, tweet: dict) -> None:
+        for word, weight in self._weights(tweet).items():
+            self._postings.setdefault((tweet["user_id"], word), {})[tweet["id"]] = weight
+
+    def remove(self, tweet: dict) -> None:
+        for word in self._weights(tweet):
+            key = (tweet["user_id"], word)
+            postings = self._postings.get(key)
+            if postings is not None:
+                postings.pop(tweet["id"], None)
+                if not postings:
+                    del self._postings[key]
+
+    def search(self, user_id: int, words: List[str], limit: int, after: Optional[SearchCursor] = None) -> List[Tuple[float, int]]:
+        """
+        (rank, tweet_id) of the best matches after the cursor, best first
+        """
+        lists = [self._postings.get((user_id, word), {}) for word in set(words)]
+        if not lists:
+            return []
+        lists.sort(key=len)
+        candidates: Set[int] = set(lists[0])
+        for postings in lists[1:]:
+            candidates.intersection_update(postings)
+            if not candidates:
+                return []
+        ranked = []
+        for tweet_id in candidates:
+            rank = sum(postings[tweet_id] for postings in lists)
+            if before_cursor(rank, tweet_id, after):
+                ranked.append((rank, tweet_id))
+        return heapq.nlargest(limit, ranked)
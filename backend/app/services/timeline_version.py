@@ -0,0 +1,58 @@
+# app/services/timeline_version.py
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import CounterFunction, Gauge
+
+
+class TimelineVersions:
+    """
+    ETags of GET /tweets, /tweets/count and /tweets/search, and counts of how
+    conditional requests were answered
+
+    The version comes from the tweet store (store.timeline_version), which
+    changes it in the same transaction as every create, correction or delete of
+    a tweet, so no committed change can ever be answered with a stale 304.
+    """
+
+    def __init__(self):
+        self.outcomes: Dict[Tuple[str, str], int] = {}  # (endpoint, result) -> requests
+
+    async def etag(self, store: Any, user_id: int) -> Optional[str]:
+        if not settings.TWEET_ETAG_ENABLED:
+            return None
+        return f'W/"{user_id}-{await store.timeline_version(user_id)}"'
+
+    def record(self, endpoint: str, result: str) -> None:
+        """
+        Count a conditional request: result is "not_modified", "modified" or
+        "unversioned" (answered without an ETag)
+        """
+        key = (endpoint, result)
+        self.outcomes[key] = self.outcomes.get(key, 0) + 1
+
+    def not_modified_ratio(self) -> Dict[Tuple[str], float]:
+        totals: Dict[str, int] = {}
+        hits: Dict[str, int] = {}
+        for (endpoint, result), count in self.outcomes.items():
+            totals[endpoint] = totals.get(endpoint, 0) + count
+            if result == "not_modified":
+                hits[endpoint] = hits.get(endpoint, 0) + count
+        return {(endpoint,): hits.get(endpoint, 0) / total for endpoint, total in totals.items()}
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "outcomes": {f"{endpoint}:{result}": count for (endpoint, result), count in self.outcomes.items()},
+        }
+
+
+timeline_versions = TimelineVersions()
+
+CounterFunction(
+    "twinglish_timeline_conditional_gets_total", "Timeline and count requests by conditional outcome",
+    lambda: dict(timeline_versions.outcomes), ("endpoint", "result"),
+)
+Gauge(
+    "twinglish_timeline_not_modified_ratio", "Share of timeline and count requests answered with 304",
+    timeline_versions.not_modified_ratio, ("endpoint",),
+)
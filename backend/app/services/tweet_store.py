@@ -0,0 +1,625 @@
+# app/services/tweet_store.py
+import asyncio
+import base64
+import bisect
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import Depends
+from sqlalchemy import cast, func, insert, or_, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import REAL
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import async_session, get_db
+from app.models.tweet import Tweet, TWEET_STATUS_FAILED, TWEET_STATUS_PENDING
+from app.models.tweet_stats import TweetStats
+from app.models.user import User
+from app.services.search import (
+    HEADLINE_OPTIONS,
+    SEARCH_CONFIG,
+    SEARCH_FIELDS,
+    SEARCH_VECTOR,
+    InvertedIndex,
+    SearchCursor,
+    from_headline,
+    highlight,
+    tokenize,
+)
+
+TweetDict = Dict[str, Any]
+Cursor = Tuple[datetime, int]
+
+COUNTERS = ("total", "perfect", "corrections")
+
+
+def encode_cursor(tweet: TweetDict) -> str:
+    """
+    Opaque pagination cursor for the position right after the given tweet
+    """
+    raw = f"{tweet['created_at']}|{tweet['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decode a cursor made by encode_cursor, raising ValueError if it is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, tweet_id = raw.rsplit("|", 1)
+        created_at, tweet_id = datetime.fromisoformat(created_at), int(tweet_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at, tweet_id
+
+
+def _counter(original_text: str, corrected_text: str, status: str) -> Optional[str]:
+    """
+    Counter a tweet counts towards besides total; pending tweets count towards total only
+    """
+    if status == TWEET_STATUS_PENDING:
+        return None
+    return "perfect" if original_text == corrected_text else "corrections"
+
+
+def _counter_deltas(before: Optional[str], after: Optional[str]) -> Dict[str, int]:
+    deltas = {}
+    if before != after:
+        if before:
+            deltas[before] = -1
+        if after:
+            deltas[after] = 1
+    return deltas
+
+
+def _to_dict(tweet: Tweet) -> TweetDict:
+    return {
+        "id": tweet.id,
+        "original_text": tweet.original_text,
+        "corrected_text": tweet.corrected_text or "",
+        "explanation": tweet.explanation or "",
+        # ISO 8601 with the UTC offset, like the frontend expects
+        "created_at": tweet.created_at.isoformat(),
+        "user_id": tweet.user_id,
+        "status": tweet.status,
+    }
+
+
+def _bulk_deltas(tweets: List[TweetDict]) -> Dict[str, int]:
+    deltas = {"total": len(tweets)}
+    for tweet in tweets:
+        counter = _counter(tweet["original_text"], tweet["corrected_text"], tweet["status"])
+        if counter:
+            deltas[counter] = deltas.get(counter, 0) + 1
+    return deltas
+
+
+# Columns read for exports: plain rows instead of ORM objects
+_EXPORT_COLUMNS = (Tweet.id, Tweet.original_text, Tweet.corrected_text, Tweet.explanation, Tweet.created_at, Tweet.user_id, Tweet.status)
+
+
+def _search_result(tweet: TweetDict, rank: float, highlights: Dict[str, str]) -> TweetDict:
+    return {**tweet, "rank": rank, "highlights": highlights}
+
+
+def _highlighted(tweet: TweetDict, rank: float, words: List[str]) -> TweetDict:
+    return _search_result(tweet, rank, {field: highlight(tweet[field] or "", words) for field in SEARCH_FIELDS})
+
+
+class SqlTweetStore:
+    """
+    Tweets stored through SQLAlchemy
+
+    Timeline and count queries filter on user_id and order by (created_at, id)
+    descending, so both are served by ix_tweet_user_id_created_at_id. With a
+    cursor the timeline seeks straight to the position in that index, so a page
+    costs O(limit) however deep it is; skip still has to walk the skipped rows.
+
+    Counts are read from the tweet_stats row of the user, which is updated in the
+    same transaction as every tweet change. reconcile_counters() repairs drift.
+    The same statement increments the user's timeline version.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, user_id: int, original_text: str, corrected_text: str, explanation: str, status: str) -> TweetDict:
+        tweet = Tweet(
+            user_id=user_id,
+            original_text=original_text,
+            corrected_text=corrected_text,
+            explanation=explanation,
+            status=status,
+            # Set here rather than by the server default so no refresh is needed
+            created_at=datetime.now(timezone.utc),
+        )
+        self.session.add(tweet)
+        await self._add_to_counters(user_id, total=1, **_counter_deltas(None, _counter(original_text, corrected_text, status)))
+        await self.session.commit()
+        return _to_dict(tweet)
+
+    async def bulk_create(self, user_id: int, tweets: List[TweetDict]) -> List[int]:
+        """
+        Insert tweets of one user with multi-row INSERT statements, one counter
+        update and one commit. Each tweet needs original_text, corrected_text,
+        explanation, status and created_at (None for now). Returns the new ids in order.
+        """
+        if not tweets:
+            return []
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "user_id": user_id,
+                "original_text": tweet["original_text"],
+                "corrected_text": tweet["corrected_text"],
+                "explanation": tweet["explanation"],
+                "status": tweet["status"],
+                "created_at": tweet["created_at"] or now,
+            }
+            for tweet in tweets
+        ]
+        result = await self.session.execute(insert(Tweet).returning(Tweet.id, sort_by_parameter_order=True), rows)
+        ids = list(result.scalars())
+        await self._add_to_counters(user_id, **_bulk_deltas(tweets))
+        await self.session.commit()
+        return ids
+
+    async def get(self, tweet_id: int) -> Optional[TweetDict]:
+        tweet = await self.session.get(Tweet, tweet_id)
+        return _to_dict(tweet) if tweet is not None else None
+
+    async def update(self, tweet_id: int, **values: Any) -> None:
+        # Lock the row so concurrent updates cannot both move it between counters
+        tweet = await self.session.get(Tweet, tweet_id, with_for_update=True)
+        if tweet is None:
+            return
+        before = _counter(tweet.original_text, tweet.corrected_text, tweet.status)
+        for key, value in values.items():
+            setattr(tweet, key, value)
+        after = _counter(tweet.original_text, tweet.corrected_text, tweet.status)
+        # Also when no counter moves: the version must change with the content
+        await self._add_to_counters(tweet.user_id, **_counter_deltas(before, after))
+        await self.session.commit()
+
+    async def mark_failed(self, user_id: int, tweet_ids: List[int], explanation: str) -> None:
+        """
+        Mark pending tweets of one user as failed with one UPDATE, one counter
+        update and one commit. Tweets no longer pending are left alone.
+        """
+        if not tweet_ids:
+            return
+        result = await self.session.execute(
+            update(Tweet)
+            .where(Tweet.id.in_(tweet_ids), Tweet.user_id == user_id, Tweet.status == TWEET_STATUS_PENDING)
+            .values(explanation=explanation, status=TWEET_STATUS_FAILED)
+            .returning(Tweet.original_text, Tweet.corrected_text)
+        )
+        deltas: Dict[str, int] = {}
+        for original_text, corrected_text in result:
+            counter = _counter(original_text, corrected_text, TWEET_STATUS_FAILED)
+            deltas[counter] = deltas.get(counter, 0) + 1
+        await self._add_to_counters(user_id, **deltas)
+        await self.session.commit()
+
+    async def delete(self, tweet_id: int) -> None:
+        tweet = await self.session.get(Tweet, tweet_id, with_for_update=True)
+        if tweet is not None:
+            counter = _counter(tweet.original_text, tweet.corrected_text, tweet.status)
+            await self.session.delete(tweet)
+            await self._add_to_counters(tweet.user_id, total=-1, **_counter_deltas(counter, None))
+            await self.session.commit()
+
+    def _insert_counters(self, user_id: int, values: Dict[str, int]):
+        dialect = postgresql if self.session.bind.dialect.name == "postgresql" else sqlite
+        return dialect.insert(TweetStats).values(user_id=user_id, **values)
+
+    async def _add_to_counters(self, user_id: int, **deltas: int) -> None:
+        """
+        Atomically add to the user's counters and increment the timeline version,
+        creating the row on first use
+        """
+        statement = self._insert_counters(user_id, {**deltas, "version": 1})
+        await self.session.execute(statement.on_conflict_do_update(
+            index_elements=[TweetStats.user_id],
+            set_={
+                **{name: getattr(TweetStats, name) + delta for name, delta in deltas.items()},
+                "version": TweetStats.version + 1,
+                "updated_at": func.now(),
+            },
+        ))
+
+    async def timeline_version(self, user_id: int) -> str:
+        """
+        Version of the user's timeline. The row id is part of it, so a recreated
+        row (e.g. after the seeder's --reset) never repeats an old version.
+        """
+        result = await self.session.execute(
+            select(TweetStats.id, TweetStats.version).where(TweetStats.user_id == user_id)
+        )
+        row = result.first()
+        return f"{row.id}.{row.version}" if row is not None else "0"
+
+    async def reconcile_counters(self) -> int:
+        """
+        Recompute every user's counters from the tweet table and fix the rows that
+        drifted. Returns the number of users repaired.
+
+        The scan below runs without locks, so it only picks candidates; each one
+        is re-counted and fixed under the lock of its counters row.
+        """
+        result = await self.session.execute(
+            self._count_tweets().where(Tweet.user_id.isnot(None)).group_by(Tweet.user_id)
+        )
+        actual = {user_id: counts for user_id, *counts in result}
+        result = await self.session.execute(select(TweetStats.user_id, *(getattr(TweetStats, name) for name in COUNTERS)))
+        stored = {user_id: counts for user_id, *counts in result}
+        await self.session.commit()
+
+        repaired = 0
+        for user_id in actual.keys() | stored.keys():
+            if stored.get(user_id) != actual.get(user_id, [0, 0, 0]) and await self._repair_counters(user_id):
+                repaired += 1
+        return repaired
+
+    def _count_tweets(self):
+        settled = Tweet.status != TWEET_STATUS_PENDING
+        return select(
+            Tweet.user_id,
+            func.count(),
+            func.count().filter(settled & (Tweet.original_text == Tweet.corrected_text)),
+            func.count().filter(settled & (Tweet.original_text != Tweet.corrected_text)),
+        )
+
+    async def _repair_counters(self, user_id: int) -> bool:
+        """
+        Set one user's counters to the actual counts in a single transaction
+        """
+        # Every tweet change updates this row in its own transaction, so once the
+        # row is locked (created if missing) no change of the user can commit until
+        # we do, and the count below sees all the ones that did
+        await self._add_to_counters(user_id)
+        result = await self.session.execute(
+            select(*(getattr(TweetStats, name) for name in COUNTERS)).where(TweetStats.user_id == user_id)
+        )
+        stored = list(result.one())
+        result = await self.session.execute(self._count_tweets().where(Tweet.user_id == user_id).group_by(Tweet.user_id))
+        row = result.first()
+        counts = list(row[1:]) if row is not None else [0, 0, 0]
+        if counts != stored:
+            await self.session.execute(
+                update(TweetStats).where(TweetStats.user_id == user_id).values(**dict(zip(COUNTERS, counts)))
+            )
+        await self.session.commit()
+        return counts != stored
+
+    async def claim_stale_pending(self, cutoff: datetime, limit: int) -> List[int]:
+        """
+        Ids of up to limit tweets still pending and untouched since cutoff. Their
+        updated_at is set to now in the same statement, so concurrent callers
+        never claim the same tweet and a tweet is claimed again only after
+        another full timeout.
+        """
+        stale = (
+            select(Tweet.id)
+            .where(Tweet.status == TWEET_STATUS_PENDING, Tweet.updated_at < cutoff)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            update(Tweet).where(Tweet.id.in_(stale)).values(updated_at=func.now()).returning(Tweet.id)
+        )
+        ids = list(result.scalars())
+        await self.session.commit()
+        return ids
+
+    async def list_for_user(self, user_id: int, skip: int, limit: int, after: Optional[Cursor] = None) -> List[TweetDict]:
+        query = select(Tweet).where(Tweet.user_id == user_id)
+        if after is not None:
+            # Row comparison, so the index range scan starts right after the cursor
+            query = query.where(tuple_(Tweet.created_at, Tweet.id) < tuple_(*after))
+        result = await self.session.execute(
+            query
+            .order_by(Tweet.created_at.desc(), Tweet.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return [_to_dict(tweet) for tweet in result.scalars()]
+
+    async def iter_for_user(self, user_id: int, batch_size: int) -> AsyncIterator[TweetDict]:
+        """
+        Every tweet of the user, oldest first, read through a server-side cursor
+        batch_size rows at a time, so memory stays flat however long the history
+        """
+        result = await self.session.stream(
+            select(*_EXPORT_COLUMNS)
+            .where(Tweet.user_id == user_id)
+            .order_by(Tweet.created_at, Tweet.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for row in result:
+            yield _to_dict(row)
+
+    async def search(self, user_id: int, query: str, limit: int, after: Optional[SearchCursor] = None) -> List[TweetDict]:
+        """
+        The user's tweets matching query, best first, with highlighted fields
+
+        On Postgres the query uses web search syntax ("quoted phrases", or, -word)
+        and is served by ix_tweet_user_id_search_vector; ts_headline only runs on
+        the rows of the page. Other databases fall back to a substring scan.
+        """
+        if self.session.bind.dialect.name != "postgresql":
+            return await self._search_substrings(user_id, query, limit, after)
+
+        tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank(SEARCH_VECTOR, tsquery)
+        page = select(Tweet.id, rank.label("rank")).where(Tweet.user_id == user_id, SEARCH_VECTOR.op("@@")(tsquery))
+        if after is not None:
+            page = page.where(tuple_(rank, Tweet.id) < tuple_(cast(after[0], REAL), after[1]))
+        page = page.order_by(rank.desc(), Tweet.id.desc()).limit(limit).subquery()
+
+        headlines = [
+            func.ts_headline(SEARCH_CONFIG, func.coalesce(getattr(Tweet, field), ""), tsquery, HEADLINE_OPTIONS)
+            for field in SEARCH_FIELDS
+        ]
+        result = await self.session.execute(
+            select(Tweet, page.c.rank, *headlines)
+            .join(page, Tweet.id == page.c.id)
+            .order_by(page.c.rank.desc(), Tweet.id.desc())
+        )
+        return [
+            _search_result(_to_dict(tweet), rank, {field: from_headline(text) for field, text in zip(SEARCH_FIELDS, texts)})
+            for tweet, rank, *texts in result
+        ]
+
+    async def _search_substrings(self, user_id: int, query: str, limit: int, after: Optional[SearchCursor]) -> List[TweetDict]:
+        # Development databases (SQLite): every word must occur in one of the fields, no ranking
+        words = tokenize(query)
+        if not words:
+            return []
+        statement = select(Tweet).where(Tweet.user_id == user_id)
+        for word in words:
+            statement = statement.where(or_(*(
+                func.lower(getattr(Tweet, field)).contains(word, autoescape=True) for field in SEARCH_FIELDS
+            )))
+        if after is not None:
+            statement = statement.where(Tweet.id < after[1])
+        result = await self.session.execute(statement.order_by(Tweet.id.desc()).limit(limit))
+        return [_highlighted(_to_dict(tweet), 0.0, words) for tweet in result.scalars()]
+
+    async def count_for_user(self, user_id: int) -> Dict[str, int]:
+        result = await self.session.execute(
+            select(*(getattr(TweetStats, name) for name in COUNTERS)).where(TweetStats.user_id == user_id)
+        )
+        counts = result.one_or_none() or (0, 0, 0)
+        return dict(zip(COUNTERS, counts))
+
+
+def _version_seed() -> int:
+    # Versions start at the current time, so a restarted process never repeats a
+    # version a client may still hold in an ETag
+    return time.time_ns() // 1000
+
+
+class MemoryTweetStore:
+    """
+    Process-local store with the same interface, for benchmarks and running without
+    a database. Each user's tweets are kept sorted by (created_at, id), and the
+    counters and a full-text index are kept alongside them.
+    """
+
+    def __init__(self):
+        self._tweets: Dict[int, TweetDict] = {}
+        self._timelines: Dict[int, List[tuple]] = {}
+        self._counts: Dict[int, Dict[str, int]] = {}
+        self._index = InvertedIndex()
+        self._claimed: Dict[int, datetime] = {}  # Pending tweet id -> last claim_stale_pending
+        self._versions: Dict[int, int] = {}
+        self._next_id = 1
+
+    def _add_to_counters(self, user_id: int, **deltas: int) -> None:
+        counts = self._counts.setdefault(user_id, dict.fromkeys(COUNTERS, 0))
+        for name, delta in deltas.items():
+            counts[name] += delta
+
+    def _bump(self, user_id: int) -> None:
+        self._versions[user_id] = self._versions.get(user_id, _version_seed()) + 1
+
+    async def timeline_version(self, user_id: int) -> str:
+        return str(self._versions.setdefault(user_id, _version_seed()))
+
+    async def create(
+        self,
+        user_id: int,
+        original_text: str,
+        corrected_text: str,
+        explanation: str,
+        status: str,
+        created_at: Optional[datetime] = None,
+    ) -> TweetDict:
+        created_at = created_at or datetime.now(timezone.utc)
+        tweet = {
+            "id": self._next_id,
+            "original_text": original_text,
+            "corrected_text": corrected_text,
+            "explanation": explanation,
+            "created_at": created_at.isoformat(),
+            "user_id": user_id,
+            "status": status,
+        }
+        self._next_id += 1
+        self._tweets[tweet["id"]] = tweet
+        bisect.insort(self._timelines.setdefault(user_id, []), (created_at, tweet["id"]))
+        self._index.add(tweet)
+        self._add_to_counters(user_id, total=1, **_counter_deltas(None, _counter(original_text, corrected_text, status)))
+        self._bump(user_id)
+        return dict(tweet)
+
+    async def bulk_create(self, user_id: int, tweets: List[TweetDict]) -> List[int]:
+        return [
+            (await self.create(
+                user_id, tweet["original_text"], tweet["corrected_text"], tweet["explanation"], tweet["status"], tweet["created_at"]
+            ))["id"]
+            for tweet in tweets
+        ]
+
+    async def get(self, tweet_id: int) -> Optional[TweetDict]:
+        tweet = self._tweets.get(tweet_id)
+        return dict(tweet) if tweet is not None else None
+
+    async def update(self, tweet_id: int, **values: Any) -> None:
+        tweet = self._tweets.get(tweet_id)
+        if tweet is None:
+            return
+        before = _counter(tweet["original_text"], tweet["corrected_text"], tweet["status"])
+        self._index.remove(tweet)
+        tweet.update(values)
+        self._index.add(tweet)
+        after = _counter(tweet["original_text"], tweet["corrected_text"], tweet["status"])
+        self._add_to_counters(tweet["user_id"], **_counter_deltas(before, after))
+        self._bump(tweet["user_id"])
+
+    async def mark_failed(self, user_id: int, tweet_ids: List[int], explanation: str) -> None:
+        for tweet_id in tweet_ids:
+            tweet = self._tweets.get(tweet_id)
+            if tweet is None or tweet["user_id"] != user_id or tweet["status"] != TWEET_STATUS_PENDING:
+                continue
+            self._index.remove(tweet)
+            tweet.update(explanation=explanation, status=TWEET_STATUS_FAILED)
+            self._index.add(tweet)
+            self._add_to_counters(user_id, **_counter_deltas(None, _counter(tweet["original_text"], tweet["corrected_text"], TWEET_STATUS_FAILED)))
+        self._bump(user_id)
+
+    async def delete(self, tweet_id: int) -> None:
+        tweet = self._tweets.pop(tweet_id, None)
+        self._claimed.pop(tweet_id, None)
+        if tweet is not None:
+            self._timelines[tweet["user_id"]].remove((datetime.fromisoformat(tweet["created_at"]), tweet_id))
+            self._index.remove(tweet)
+            counter = _counter(tweet["original_text"], tweet["corrected_text"], tweet["status"])
+            self._add_to_counters(tweet["user_id"], total=-1, **_counter_deltas(counter, None))
+            self._bump(tweet["user_id"])
+
+    async def claim_stale_pending(self, cutoff: datetime, limit: int) -> List[int]:
+        ids = []
+        for tweet_id, tweet in self._tweets.items():
+            if len(ids) >= limit:
+                break
+            if tweet["status"] != TWEET_STATUS_PENDING:
+                self._claimed.pop(tweet_id, None)
+            elif self._claimed.get(tweet_id, datetime.fromisoformat(tweet["created_at"])) < cutoff:
+                ids.append(tweet_id)
+        now = datetime.now(timezone.utc)
+        for tweet_id in ids:
+            self._claimed[tweet_id] = now
+        return ids
+
+    async def list_for_user(self, user_id: int, skip: int, limit: int, after: Optional[Cursor] = None) -> List[TweetDict]:
+        timeline = self._timelines.get(user_id, [])
+        end = len(timeline) if after is None else bisect.bisect_left(timeline, after)
+        end = max(end - skip, 0)
+        keys = timeline[max(end - limit, 0):end]
+        return [dict(self._tweets[tweet_id]) for _, tweet_id in reversed(keys)]
+
+    async def iter_for_user(self, user_id: int, batch_size: int) -> AsyncIterator[TweetDict]:
+        for _, tweet_id in list(self._timelines.get(user_id, [])):
+            tweet = self._tweets.get(tweet_id)
+            if tweet is not None:
+                yield dict(tweet)
+
+    async def search(self, user_id: int, query: str, limit: int, after: Optional[SearchCursor] = None) -> List[TweetDict]:
+        words = tokenize(query)
+        return [
+            _highlighted(dict(self._tweets[tweet_id]), rank, words)
+            for rank, tweet_id in self._index.search(user_id, words, limit, after)
+        ]
+
+    async def count_for_user(self, user_id: int) -> Dict[str, int]:
+        return dict(self._counts.get(user_id) or dict.fromkeys(COUNTERS, 0))
+
+    async def reconcile_counters(self) -> int:
+        actual: Dict[int, Dict[str, int]] = {}
+        for tweet in self._tweets.values():
+            counts = actual.setdefault(tweet["user_id"], dict.fromkeys(COUNTERS, 0))
+            counts["total"] += 1
+            counter = _counter(tweet["original_text"], tweet["corrected_text"], tweet["status"])
+            if counter:
+                counts[counter] += 1
+        repaired = [u for u in actual.keys() | self._counts.keys() if actual.get(u) != self._counts.get(u)]
+        self._counts = actual
+        for user_id in repaired:
+            self._bump(user_id)
+        return len(repaired)
+
+
+memory_store = MemoryTweetStore()
+
+
+async def get_tweet_store(db: AsyncSession = Depends(get_db)):
+    """
+    Dependency for the tweet store of the current request
+    """
+    if settings.TWEET_STORE == "memory":
+        return memory_store
+    return SqlTweetStore(db)
+
+
+@asynccontextmanager
+async def tweet_store_session() -> AsyncIterator[Any]:
+    """
+    Tweet store for code running outside a request (workers, streamed responses).
+    Keep it open only around the queries, never across an LLM call, so slow
+    corrections do not hold on to pooled connections.
+    """
+    if settings.TWEET_STORE == "memory":
+        yield memory_store
+        return
+    async with async_session() as session:
+        yield SqlTweetStore(session)
+
+
+async def reconcile_counters_periodically() -> None:
+    """
+    Background task: repair counter drift every TWEET_COUNTERS_RECONCILE_SECONDS
+    """
+    while True:
+        await asyncio.sleep(settings.TWEET_COUNTERS_RECONCILE_SECONDS)
+        try:
+            async with tweet_store_session() as store:
+                repaired = await store.reconcile_counters()
+            if repaired:
+                print(f"Repaired tweet counters for {repaired} users")
+        except Exception as e:
+            print(f"Error reconciling tweet counters: {str(e)}")
+
+
+async def ensure_user(user: Dict[str, Any]) -> None:
+    """
+    Make sure a user row exists for the given account, so tweets of the built-in
+    test user satisfy the tweet.user_id foreign key
+    """
+    if settings.TWEET_STORE == "memory":
+        return
+    async with async_session() as session:
+        if await session.get(User, user["id"]) is None:
+            session.add(User(
+                id=user["id"],
+                username=user["username"],
+                email=user["email"],
+                hashed_password=user["hashed_password"],
+                is_active=user["is_active"],
+                is_superuser=user["is_superuser"],
+            ))
+            await session.flush()
+            if session.bind.dialect.name == "postgresql":
+                # An explicit id does not advance the sequence; without this the next
+                # registered user would get the same id
+                await session.execute(text(
+                    """SELECT setval(pg_get_serial_sequence('"user"', 'id'), (SELECT max(id) FROM "user"))"""
+                ))
+            await session.commit()
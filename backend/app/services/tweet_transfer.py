@@ -0,0 +1,206 @@
+# app/services/tweet_transfer.py
+import csv
+import io
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError
+
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.core.responses import json_bytes
+from app.models.tweet import MAX_TWEET_LENGTH, TWEET_STATUS_DONE, TWEET_STATUS_FAILED, TWEET_STATUS_PENDING
+from app.services.correction_queue import QueueFullError
+from app.services.rate_limit import RateLimited, correction_limiter
+from app.services.tweet_store import tweet_store_session
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+EXPORT_FIELDS = ("id", "original_text", "corrected_text", "explanation", "created_at", "status")
+
+# Errors reported back per import; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+QUEUE_FULL_EXPLANATION = "Could not queue correction: too many corrections in progress"
+RATE_LIMITED_EXPLANATION = "Could not queue correction: too many corrections requested, please try again later"
+
+TWEETS_TRANSFERRED = Counter("twinglish_tweets_transferred_total", "Tweets exported or imported", ("direction",))
+IMPORT_REJECTED = Counter("twinglish_tweet_import_rejected_total", "Import lines skipped as invalid")
+
+
+class ImportLineTooLong(ValueError):
+    """Raised when an import line exceeds TWEET_IMPORT_MAX_LINE_BYTES"""
+
+
+class TweetImport(BaseModel):
+    """
+    One NDJSON line of an import; the fields of an export line are accepted as is
+    """
+    original_text: str = Field(min_length=1, max_length=MAX_TWEET_LENGTH)
+    corrected_text: Optional[str] = Field(None, max_length=MAX_TWEET_LENGTH)
+    explanation: str = ""
+    created_at: Optional[datetime] = None
+    status: Optional[str] = None
+
+
+def _csv_safe(value: Any) -> Any:
+    # Spreadsheets run cells starting with these as formulas
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+
+async def export_chunks(user_id: int, export_format: str) -> AsyncIterator[bytes]:
+    """
+    The user's tweets, oldest first, as NDJSON or CSV in chunks of about
+    TWEET_EXPORT_BATCH_SIZE rows
+
+    The store is opened here rather than by the request, since a streamed body
+    outlives the request's dependencies. CSV cells that a spreadsheet would read
+    as formulas are prefixed with a quote; use NDJSON to move data between
+    environments.
+    """
+    batch_size = settings.TWEET_EXPORT_BATCH_SIZE
+    rows = 0
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+    else:
+        lines: List[bytes] = []
+
+    async with tweet_store_session() as store:
+        async for tweet in store.iter_for_user(user_id, batch_size):
+            rows += 1
+            if export_format == "csv":
+                writer.writerow([_csv_safe(tweet[field]) for field in EXPORT_FIELDS])
+            else:
+                lines.append(json_bytes({field: tweet[field] for field in EXPORT_FIELDS}))
+            if rows % batch_size == 0:
+                TWEETS_TRANSFERRED.labels("export").inc(batch_size)
+                if export_format == "csv":
+                    yield buffer.getvalue().encode("utf-8")
+                    buffer.seek(0)
+                    buffer.truncate()
+                else:
+                    yield b"\n".join(lines) + b"\n"
+                    lines = []
+
+    TWEETS_TRANSFERRED.labels("export").inc(rows % batch_size)
+    if export_format == "csv":
+        yield buffer.getvalue().encode("utf-8")
+    elif lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    (line number, line) of a byte stream split on newlines; blank lines are skipped
+    """
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+        if len(buffer) > max_line_bytes:
+            raise ImportLineTooLong(f"Line {number + 1} is longer than {max_line_bytes} bytes")
+    if buffer.strip():
+        yield number + 1, buffer
+
+
+def _to_row(tweet: TweetImport, correct: bool) -> Dict[str, Any]:
+    created_at = tweet.created_at
+    if created_at is not None and created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    if tweet.corrected_text is None:
+        # Nothing to keep: corrected later, or stored as is
+        status = TWEET_STATUS_PENDING if correct else TWEET_STATUS_DONE
+        corrected_text = tweet.original_text
+    else:
+        status = tweet.status if tweet.status in (TWEET_STATUS_DONE, TWEET_STATUS_FAILED) else TWEET_STATUS_DONE
+        corrected_text = tweet.corrected_text
+    return {
+        "original_text": tweet.original_text,
+        "corrected_text": corrected_text,
+        "explanation": tweet.explanation,
+        "status": status,
+        "created_at": created_at,
+    }
+
+
+async def import_tweets(
+    user_id: int,
+    chunks: AsyncIterator[bytes],
+    correct: bool,
+    enqueue: Callable[[Dict[str, Any]], Awaitable[None]],
+) -> Dict[str, Any]:
+    """
+    Import an NDJSON stream of tweets for a user
+
+    Valid lines are inserted TWEET_IMPORT_BATCH_SIZE at a time, each batch with its
+    own short-lived store session so a slow upload holds no pooled connection.
+    Invalid lines are skipped and reported. With correct, lines without a
+    corrected_text are stored as pending and queued for the correction workers.
+    Each queued correction takes a token from the user's and the global rate
+    limit like POST /tweets; once the limit or the queue is full the remaining
+    ones are marked failed instead.
+
+    Reading stops after TWEET_IMPORT_MAX_ROWS tweets ("truncated" in the result).
+    Raises ImportLineTooLong; batches inserted before it are kept.
+    """
+    imported = queued = rejected = 0
+    truncated = False
+    errors: List[Dict[str, Any]] = []
+    batch: List[Dict[str, Any]] = []
+    not_queued: Optional[str] = None  # Explanation once corrections can no longer be queued
+
+    async def flush() -> None:
+        nonlocal imported, queued, not_queued
+        async with tweet_store_session() as store:
+            ids = await store.bulk_create(user_id, batch)
+            imported += len(ids)
+            TWEETS_TRANSFERRED.labels("import").inc(len(ids))
+            failed: List[int] = []
+            for tweet_id, row in zip(ids, batch):
+                if row["status"] != TWEET_STATUS_PENDING:
+                    continue
+                if not_queued is None:
+                    try:
+                        await correction_limiter.check(user_id)
+                        await enqueue({"tweet_id": tweet_id})
+                        queued += 1
+                        continue
+                    except RateLimited:
+                        not_queued = RATE_LIMITED_EXPLANATION
+                    except QueueFullError:
+                        not_queued = QUEUE_FULL_EXPLANATION
+                failed.append(tweet_id)
+            if failed:
+                await store.mark_failed(user_id, failed, not_queued)
+        batch.clear()
+
+    async for number, line in iter_lines(chunks, settings.TWEET_IMPORT_MAX_LINE_BYTES):
+        try:
+            tweet = TweetImport.model_validate_json(line)
+        except ValidationError as e:
+            rejected += 1
+            IMPORT_REJECTED.inc()
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": number, "detail": e.errors(include_url=False, include_input=False)})
+            continue
+        if imported + len(batch) >= settings.TWEET_IMPORT_MAX_ROWS:
+            truncated = True
+            break
+        batch.append(_to_row(tweet, correct))
+        if len(batch) >= settings.TWEET_IMPORT_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    return {"imported": imported, "queued": queued, "rejected": rejected, "truncated": truncated, "errors": errors}
@@ -0,0 +1,189 @@
+# app/services/user_cache.py
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.metrics import CounterFunction, Gauge
+from app.db.redis import get_redis, mark_redis_failed
+from app.models.user import User
+from app.services.correction_cache import LRUCache
+
+KEY_PREFIX = "twinglish:user"
+
+# Columns needed to authorize a request; hashed_password is never cached
+CACHED_FIELDS = ("id", "username", "email", "is_active", "is_superuser")
+
+UserDict = Dict[str, Any]
+
+
+def make_key(user_id: int) -> str:
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def snapshot(user: Any) -> UserDict:
+    """
+    Cacheable copy of a User row
+    """
+    return {field: getattr(user, field) for field in CACHED_FIELDS}
+
+
+class UserCache:
+    """
+    TTL-bounded cache of authenticated users, keyed by user id
+
+    Lookups hit the in-process LRU first, then Redis when USER_CACHE_REDIS_ENABLED
+    is set. Entries expire after USER_CACHE_TTL_SECONDS. ORM updates and deletes of
+    a User invalidate its entry automatically once committed; call invalidate() after changing
+    users any other way (bulk UPDATE, raw SQL) so the change applies at once.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+        self.invalidations = 0
+        self._pending = set()
+
+    def _redis(self):
+        if not settings.USER_CACHE_REDIS_ENABLED:
+            return None
+        return get_redis()
+
+    async def get(self, user_id: int) -> Optional[UserDict]:
+        if not settings.USER_CACHE_ENABLED:
+            return None
+
+        key = make_key(user_id)
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        redis = self._redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(key)
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_failed(e)
+            return None
+        if raw is None:
+            self.redis_misses += 1
+            return None
+
+        self.redis_hits += 1
+        value = json.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, user: UserDict) -> None:
+        if not settings.USER_CACHE_ENABLED:
+            return
+
+        key = make_key(user["id"])
+        self.local.set(key, user)
+
+        redis = self._redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(key, json.dumps(user), ex=settings.USER_CACHE_TTL_SECONDS)
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_failed(e)
+
+    async def invalidate(self, user_id: int) -> None:
+        """
+        Drop a user from both tiers, e.g. after an update or deactivation
+
+        Other processes only see the change through Redis, so without the Redis tier
+        their copies live until the TTL expires.
+        """
+        self.invalidations += 1
+        self.local.delete(make_key(user_id))
+        if self._redis() is not None:
+            await self._delete_redis(user_id)
+
+    def invalidate_soon(self, user_id: int) -> None:
+        """
+        invalidate() for synchronous callers such as ORM events: the local entry is
+        dropped at once, the Redis delete runs as a task on the running loop
+        """
+        self.invalidations += 1
+        self.local.delete(make_key(user_id))
+        if self._redis() is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._delete_redis(user_id))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _delete_redis(self, user_id: int) -> None:
+        redis = self._redis()
+        if redis is None:
+            return
+        try:
+            await redis.delete(make_key(user_id))
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_failed(e)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.local.hits + self.redis_hits
+        lookups = self.local.hits + self.local.misses
+        return {
+            "local_size": len(self.local),
+            "local_hits": self.local.hits,
+            "local_misses": self.local.misses,
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "redis_errors": self.redis_errors,
+            "invalidations": self.invalidations,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+user_cache = UserCache()
+
+CounterFunction(
+    "twinglish_user_cache_hits_total", "Authenticated-user cache hits per tier",
+    lambda: {("local",): user_cache.local.hits, ("redis",): user_cache.redis_hits}, ("tier",),
+)
+CounterFunction(
+    "twinglish_user_cache_misses_total", "Authenticated-user cache misses per tier",
+    lambda: {("local",): user_cache.local.misses, ("redis",): user_cache.redis_misses}, ("tier",),
+)
+Gauge("twinglish_user_cache_hit_ratio", "Share of user lookups answered by either tier", lambda: user_cache.stats()["hit_rate"])
+
+
+# ORM updates and deletes of users (e.g. is_active = False), wherever they happen.
+# Flush events only collect the ids: invalidating before the commit would let a
+# concurrent read cache the old row again until the TTL expires.
+_PENDING_KEY = "user_cache_invalidations"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_changed_user(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        user_cache.invalidate_soon(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
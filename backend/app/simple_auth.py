@@ -1,31 +1,35 @@
 # app/simple_auth.py
 # Temporary for testing only
+import asyncio
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
 from jose import jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 from app.core.config import settings
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.security import AUTH_FAILURES, AUTH_SECONDS, get_password_hash_async, pwd_context, verify_password_async
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-# Dummy user for testing
+TEST_USER_PASSWORD = "Password123"
+
+# Dummy user for testing. The password hash is filled in by load_test_user, so
+# importing the app does not pay for a bcrypt hash.
 test_user = {
     "id": 1,
     "username": "testuser",
     "email": "test@example.com",
-    "hashed_password": pwd_context.hash("Password123"),
+    "hashed_password": None,
     "is_active": True,
     "is_superuser": False
 }
 
+_test_user_lock = asyncio.Lock()
+
 # User dictionary for simple testing
 users = {
     "testuser": test_user
@@ -39,11 +43,27 @@ def get_password_hash(password: str) -> str:
     """Hash a password for storing."""
     return pwd_context.hash(password)
 
-def authenticate_user(username: str, password: str) -> Optional[Dict[str, Any]]:
-    """Authenticate a user by username and password."""
-    if username == test_user["username"] and verify_password(password, test_user["hashed_password"]):
-        return test_user
-    return None
+async def load_test_user() -> Dict[str, Any]:
+    """Hash the test user's password once per process, on the password hashing pool."""
+    async with _test_user_lock:
+        if test_user["hashed_password"] is None:
+            test_user["hashed_password"] = await get_password_hash_async(TEST_USER_PASSWORD)
+    return test_user
+
+async def authenticate_user(username: str, password: str) -> Optional[Dict[str, Any]]:
+    """Authenticate a user by username and password, off the event loop."""
+    if username != test_user["username"]:
+        AUTH_FAILURES.labels("unknown_user").inc()
+        return None
+    await load_test_user()
+    valid, new_hash = await verify_password_async(password, test_user["hashed_password"])
+    if not valid:
+        AUTH_FAILURES.labels("bad_password").inc()
+        return None
+    if new_hash:
+        # Transparent upgrade after a cost factor change
+        test_user["hashed_password"] = new_hash
+    return test_user
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
@@ -60,25 +80,23 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
 
 def validate_token(token: str) -> Optional[Dict[str, Any]]:
     """Validate the token and return the user if valid."""
-    print(f"Validating token: {token}")
-    
     try:
         parts = token.split(':')
         if len(parts) != 3:
-            print(f"Invalid token format: {token}")
+            AUTH_FAILURES.labels("malformed_token").inc()
             return None
             
         user_id = int(parts[1])
         
         # In our simple implementation, we only have one test user
         if user_id != test_user["id"]:
-            print(f"User ID mismatch: {user_id}")
+            AUTH_FAILURES.labels("unknown_user").inc()
             return None
             
         # For simplicity, we're not checking token expiration
         return test_user
-    except Exception as e:
-        print(f"Token validation error: {e}")
+    except Exception:
+        AUTH_FAILURES.labels("malformed_token").inc()
         return None
 
 def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
@@ -89,7 +107,9 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    start = time.perf_counter()
     user = validate_token(token)
+    AUTH_SECONDS.labels("token").observe(time.perf_counter() - start)
     if not user:
         raise credentials_exception
     
@@ -0,0 +1,68 @@
+# benchmarks/bench_batching.py
+"""
+Compare one-completion-per-tweet with micro-batched corrections against the local
+stub: upstream calls, prompt tokens and wall time for a burst of concurrent tweets.
+Run with: python -m benchmarks.bench_batching --requests 64 --latency 0.3
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import setup_environment, summarize
+from benchmarks.stub_openai import run_stub
+
+
+async def burst(correct_tweet, requests: int, tag: str) -> dict:
+    latencies = []
+
+    async def one(i: int):
+        start = time.perf_counter()
+        await correct_tweet(f"{tag} tweet number {i}, I am agree with this")
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return {"wall_s": round(time.perf_counter() - start, 3), "latency": summarize(latencies)}
+
+
+async def run(requests: int, latency: float, malformed_rate: float, port: int) -> dict:
+    async with run_stub(port=port, latency=latency, malformed_rate=malformed_rate) as base_url:
+        setup_environment(base_url)
+        from app.core.config import settings
+        from app.services.openai_service import close_client, correct_tweet, get_batcher
+
+        stub_root = base_url[: -len("/v1")]
+        results = {}
+        async with httpx.AsyncClient(base_url=stub_root) as stub:
+            for enabled in (False, True):
+                settings.OPENAI_BATCH_ENABLED = enabled
+                await stub.post("/stub/reset")
+                mode = "batched" if enabled else "unbatched"
+                results[mode] = await burst(correct_tweet, requests, mode)
+                results[mode]["upstream"] = (await stub.get("/stub/stats")).json()
+            results["batched"]["batcher"] = get_batcher().stats()
+
+        await close_client()
+
+    unbatched = results["unbatched"]["upstream"]["prompt_tokens"]
+    batched = results["batched"]["upstream"]["prompt_tokens"]
+    results["prompt_token_reduction"] = round(1 - batched / unbatched, 3) if unbatched else 0.0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--malformed-rate", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.requests, args.latency, args.malformed_rate, args.port)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_concurrent_corrections.py
+"""
+Fire N concurrent POST /tweets against a local OpenAI stub and compare the wall
+time with a single call's latency. While the burst is in flight a GET /tweets probe
+runs in a loop to show that the event loop is not blocked.
+Run with: python -m benchmarks.bench_concurrent_corrections --requests 16 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import auth_headers, setup_environment, summarize
+from benchmarks.stub_openai import run_stub
+
+
+async def run(requests: int, latency: float, port: int) -> dict:
+    async with run_stub(port=port, latency=latency) as base_url:
+        setup_environment(base_url)
+        from app.main import app
+        from app.services.openai_service import close_client
+
+        headers = auth_headers()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+
+            async def post(i: int) -> float:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/tweets/", json={"original_text": f"I am agree with you number {i}"}, headers=headers
+                )
+                response.raise_for_status()
+                return time.perf_counter() - start
+
+            # Warm-up call also measures the latency of a single correction
+            single = await post(-1)
+
+            probe_samples = []
+            burst_done = asyncio.Event()
+
+            async def probe():
+                while not burst_done.is_set():
+                    start = time.perf_counter()
+                    await client.get("/api/v1/tweets/", headers=headers)
+                    probe_samples.append(time.perf_counter() - start)
+                    await asyncio.sleep(0.01)
+
+            probe_task = asyncio.create_task(probe())
+            start = time.perf_counter()
+            latencies = await asyncio.gather(*(post(i) for i in range(requests)))
+            wall = time.perf_counter() - start
+            burst_done.set()
+            await probe_task
+
+        await close_client()
+
+    return {
+        "requests": requests,
+        "stub_latency_s": latency,
+        "single_call_s": round(single, 3),
+        "burst_wall_s": round(wall, 3),
+        "wall_over_single": round(wall / single, 2),
+        "post_latency": summarize(latencies),
+        "get_probe_latency": summarize(probe_samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.requests, args.latency, args.port)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_conditional_get.py
+"""
+Revalidation of an unchanged timeline, as the frontend does on every focus and
+after each tweet: GET /tweets (page of --limit) and GET /tweets/count, fetched in
+full vs. sent with the If-None-Match of the previous response (304).
+Latency and bytes on the wire per request, through a real uvicorn server.
+Run with: python -m benchmarks.bench_conditional_get --tweets 200 --limit 50 --requests 300
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import auth_headers, setup_environment, summarize
+from benchmarks.stub_openai import serve
+
+
+async def revalidate(client: httpx.AsyncClient, path: str, params: dict, headers: dict, requests: int, conditional: bool) -> dict:
+    latencies = []
+    wire_bytes = 0
+    statuses = set()
+    etag = None
+    for _ in range(requests):
+        request_headers = dict(headers)
+        if conditional and etag:
+            request_headers["If-None-Match"] = etag
+        start = time.perf_counter()
+        async with client.stream("GET", path, params=params, headers=request_headers) as response:
+            async for chunk in response.aiter_raw():
+                wire_bytes += len(chunk)
+        latencies.append(time.perf_counter() - start)
+        statuses.add(response.status_code)
+        etag = response.headers.get("etag", etag)
+    return {
+        "latency": summarize(latencies),
+        "body_bytes_per_request": round(wire_bytes / requests),
+        "status_codes": sorted(statuses),
+    }
+
+
+async def run(tweets: int, limit: int, requests: int, port: int) -> dict:
+    setup_environment()
+    from app.main import app
+    from app.services.timeline_version import timeline_versions
+
+    headers = {**auth_headers(), "Accept-Encoding": "gzip"}
+    results = {}
+    async with serve(app, "127.0.0.1", port) as app_url:
+        async with httpx.AsyncClient(base_url=app_url, timeout=60) as client:
+            for i in range(tweets):
+                await client.post("/api/v1/tweets/", json={"original_text": f"Seed tweet number {i} for the revalidation benchmark"}, headers=headers)
+
+            for name, path, params in (("list", "/api/v1/tweets/", {"limit": limit}), ("count", "/api/v1/tweets/count", {})):
+                for conditional in (False, True):
+                    mode = "if_none_match" if conditional else "full"
+                    results[f"{name}_{mode}"] = await revalidate(client, path, params, headers, requests, conditional)
+    results["conditional_gets"] = timeline_versions.stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tweets", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--port", type=int, default=9101)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.tweets, args.limit, args.requests, args.port)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
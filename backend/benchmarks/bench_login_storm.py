@@ -0,0 +1,90 @@
+# benchmarks/bench_login_storm.py
+"""
+Feed latency (GET /tweets) while a burst of logins runs bcrypt, with password work
+on the hashing pool versus inline on the event loop (the old behaviour).
+Run with: python -m benchmarks.bench_login_storm --logins 64 --probes 50
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.common import auth_headers, setup_environment, summarize
+from benchmarks.stub_openai import serve
+
+LOGIN_FORM = {"username": "testuser", "password": "Password123"}
+
+
+async def probe_feed(client: httpx.AsyncClient, headers: dict, stop: asyncio.Event, probes: int) -> list:
+    """
+    Fetch the first feed page back to back until stopped (or probes done when idle)
+    """
+    latencies = []
+    while not stop.is_set() and len(latencies) < probes:
+        start = time.perf_counter()
+        response = await client.get("/api/v1/tweets/", params={"limit": 10}, headers=headers)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def storm(app_url: str, logins: int) -> dict:
+    # No keep-alive: a blocked loop lets uvicorn time out idle connections mid-storm
+    limits = httpx.Limits(max_keepalive_connections=0)
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=app_url, timeout=120, limits=limits) as client:
+        responses = await asyncio.gather(*(client.post("/api/v1/auth/login", data=LOGIN_FORM) for _ in range(logins)))
+    return {
+        "wall_s": round(time.perf_counter() - start, 3),
+        "status_codes": dict(Counter(response.status_code for response in responses)),
+    }
+
+
+async def run(logins: int, probes: int, port: int) -> dict:
+    setup_environment()
+    from app.main import app
+    from app.core import security
+
+    pooled = security._run_password_work
+
+    async def inline(func, *args):
+        return func(*args)
+
+    headers = auth_headers()
+    results = {}
+    async with serve(app, "127.0.0.1", port) as app_url:
+        async with httpx.AsyncClient(base_url=app_url, timeout=120) as client:
+            for i in range(20):
+                await client.post("/api/v1/tweets/", json={"original_text": f"Seed tweet {i}"}, headers=headers)
+
+            idle = await probe_feed(client, headers, asyncio.Event(), probes)
+            results["feed_idle"] = summarize(idle)
+
+            for mode, runner in (("inline", inline), ("pool", pooled)):
+                security._run_password_work = runner
+                stop = asyncio.Event()
+                prober = asyncio.create_task(probe_feed(client, headers, stop, 10 ** 9))
+                results[f"logins_{mode}"] = await storm(app_url, logins)
+                stop.set()
+                results[f"feed_during_storm_{mode}"] = summarize(await prober)
+
+    security._run_password_work = pooled
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--probes", type=int, default=50)
+    parser.add_argument("--port", type=int, default=9110)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.logins, args.probes, args.port)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
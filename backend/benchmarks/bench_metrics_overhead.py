@@ -0,0 +1,74 @@
+# benchmarks/bench_metrics_overhead.py
+"""
+Cost of the metrics recorded on the hot path: what MetricsMiddleware adds per
+request, a counter increment, a histogram observation, and rendering /metrics.
+Run with: python -m benchmarks.bench_metrics_overhead --iterations 200000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import setup_environment
+
+
+def per_call_us(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return round((time.perf_counter() - start) / iterations * 1e6, 3)
+
+
+async def middleware_overhead_us(iterations: int) -> float:
+    """
+    Time per request through MetricsMiddleware minus the bare app
+    """
+    from app.core.metrics import MetricsMiddleware
+
+    class Route:
+        path = "/api/v1/tweets/"
+
+    async def app(scope, receive, send):
+        scope["route"] = Route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    async def drive(asgi_app) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await asgi_app({"type": "http", "method": "GET"}, None, send)
+        return time.perf_counter() - start
+
+    bare = await drive(app)
+    wrapped = await drive(MetricsMiddleware(app))
+    return round((wrapped - bare) / iterations * 1e6, 3)
+
+
+def run(iterations: int) -> dict:
+    from app.core.metrics import Counter, Histogram, render
+    import app.main  # noqa: F401  registers every metric of the app
+
+    counter = Counter("bench_counter_total", "Benchmark counter", ("route",))
+    histogram = Histogram("bench_latency_seconds", "Benchmark histogram", ("route",))
+    return {
+        "middleware_per_request_us": asyncio.run(middleware_overhead_us(iterations)),
+        "counter_inc_us": per_call_us(lambda: counter.labels("/").inc(), iterations),
+        "histogram_observe_us": per_call_us(lambda: histogram.labels("/").observe(0.012), iterations),
+        "render_ms": round(per_call_us(render, 200) / 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    setup_environment()
+    print(json.dumps(run(args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_pagination.py
+"""
+Latency of the first and a deep page of one user's timeline, with skip (offset)
+and with the after= cursor. Uses the SQL store, so point --database-url at a
+migrated Postgres for production-like numbers (default: a temporary SQLite file).
+Run with: python -m benchmarks.bench_pagination --tweets 20000 --page 1000 --limit 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import setup_environment, summarize
+
+BENCH_USERNAME = "pagination-benchmark"
+
+
+async def seed(tweets: int) -> int:
+    from sqlalchemy import delete, insert, select
+
+    from app.db.base import Base
+    from app.db.session import async_session, engine
+    from app.models.tweet import Tweet
+    from app.models.user import User
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session() as session:
+        user_id = await session.scalar(select(User.id).where(User.username == BENCH_USERNAME))
+        if user_id is None:
+            user = User(username=BENCH_USERNAME, email=f"{BENCH_USERNAME}@example.com", hashed_password="")
+            session.add(user)
+            await session.commit()
+            user_id = user.id
+        await session.execute(delete(Tweet).where(Tweet.user_id == user_id))
+
+        start = datetime.now(timezone.utc) - timedelta(seconds=tweets)
+        rows = [
+            {
+                "user_id": user_id,
+                "original_text": f"Benchmark tweet {i}",
+                "corrected_text": f"Benchmark tweet {i}",
+                "explanation": "",
+                "status": "done",
+                "created_at": start + timedelta(seconds=i),
+            }
+            for i in range(tweets)
+        ]
+        for offset in range(0, len(rows), 5000):
+            await session.execute(insert(Tweet), rows[offset:offset + 5000])
+        await session.commit()
+    return user_id
+
+
+async def timed(call, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def run(tweets: int, page: int, limit: int, repeat: int) -> dict:
+    from app.services.tweet_store import SqlTweetStore, decode_cursor, encode_cursor
+    from app.db.session import async_session, engine
+
+    user_id = await seed(tweets)
+    deep_skip = (page - 1) * limit
+
+    async with async_session() as session:
+        store = SqlTweetStore(session)
+        # Cursor a client would hold after walking to the page before the deep one
+        previous = await store.list_for_user(user_id, deep_skip - 1, 1)
+        deep_cursor = decode_cursor(encode_cursor(previous[0]))
+
+        by_skip = await store.list_for_user(user_id, deep_skip, limit)
+        by_cursor = await store.list_for_user(user_id, 0, limit, after=deep_cursor)
+        assert [t["id"] for t in by_skip] == [t["id"] for t in by_cursor], "skip and cursor pages differ"
+
+        results = {
+            "page_1": await timed(lambda: store.list_for_user(user_id, 0, limit), repeat),
+            f"page_{page}_skip": await timed(lambda: store.list_for_user(user_id, deep_skip, limit), repeat),
+            f"page_{page}_cursor": await timed(lambda: store.list_for_user(user_id, 0, limit, after=deep_cursor), repeat),
+        }
+
+    await engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tweets", type=int, default=20000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--database-url", default=None, help="A temporary SQLite file is used when omitted")
+    args = parser.parse_args()
+
+    if args.page * args.limit > args.tweets:
+        parser.error("--tweets must cover --page * --limit")
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{os.path.join(directory, 'bench_pagination.db')}"
+        os.environ["TWEET_STORE"] = "database"
+        setup_environment()
+
+        print(json.dumps(asyncio.run(run(args.tweets, args.page, args.limit, args.repeat)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
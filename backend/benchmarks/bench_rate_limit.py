@@ -0,0 +1,157 @@
+# benchmarks/bench_rate_limit.py
+"""
+Cost and effect of the correction rate limiter.
+
+Overhead: latency of check() and of taking plus releasing an in-flight slot, with
+the in-process buckets and with Redis (Lua scripts, one round trip each) when
+REDIS_URL is reachable; spread over --users so that nothing is rejected.
+Isolation: an abusive user calling check() --abusive times while a polite user
+calls it every so often; the polite user must never be limited.
+Burst: --burst concurrent POST /tweets from one user against the stub; statuses,
+Retry-After values and the upstream calls that actually reached the stub.
+Run with: python -m benchmarks.bench_rate_limit --calls 20000 --users 1000 --burst 50 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.common import auth_headers, setup_environment, summarize
+from benchmarks.stub_openai import run_stub
+
+
+async def overhead(limiter, calls: int, users: int) -> dict:
+    check_samples = []
+    slot_samples = []
+    for i in range(calls):
+        user_id = 1_000_000 + i % users
+        start = time.perf_counter()
+        await limiter.check(user_id)
+        check_samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        release = await limiter.acquire_slot(user_id)
+        await release()
+        slot_samples.append(time.perf_counter() - start)
+    return {"check": summarize(check_samples), "slot_acquire_release": summarize(slot_samples)}
+
+
+async def isolation(limiter, abusive: int) -> dict:
+    from app.services.rate_limit import RateLimited
+
+    outcomes = {"abusive": Counter(), "polite": Counter()}
+    abusive_user, polite_user = 2_000_001, 2_000_002
+    for i in range(abusive):
+        for name, user_id in (("abusive", abusive_user), ("polite", polite_user)):
+            if name == "polite" and i % (abusive // 5 or 1):
+                continue
+            try:
+                await limiter.check(user_id)
+                outcomes[name]["allowed"] += 1
+            except RateLimited as e:
+                outcomes[name][f"limited_{e.scope}"] += 1
+    return {name: dict(counts) for name, counts in outcomes.items()}
+
+
+async def burst(requests: int, port: int, latency: float) -> dict:
+    from app.main import app
+    from app.services.openai_service import close_client
+
+    headers = auth_headers()
+    statuses = Counter()
+    retry_after = Counter()
+    transport = httpx.ASGITransport(app=app)
+    async with run_stub(port=port, latency=latency) as base_url:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+
+            async def post(i: int) -> None:
+                response = await client.post(
+                    "/api/v1/tweets/", json={"original_text": f"I am agree with you number {i}"}, headers=headers
+                )
+                statuses[response.status_code] += 1
+                if "retry-after" in response.headers:
+                    retry_after[response.headers["retry-after"]] += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(post(i) for i in range(requests)))
+            wall = time.perf_counter() - start
+        async with httpx.AsyncClient(base_url=base_url.rsplit("/v1", 1)[0]) as stub:
+            upstream_calls = (await stub.get("/stub/stats")).json()["calls"]
+    await close_client()
+    return {
+        "requests": requests,
+        "wall_s": round(wall, 3),
+        "status_codes": dict(statuses),
+        "retry_after": dict(retry_after),
+        "upstream_calls": upstream_calls,
+    }
+
+
+async def run(calls: int, users: int, abusive: int, requests: int, port: int, latency: float) -> dict:
+    # The stub's URL is fixed by the port, so settings can be read before it starts
+    setup_environment(f"http://127.0.0.1:{port}/v1")
+    os.environ["RATE_LIMIT_ENABLED"] = "true"
+    from app.core.config import settings
+    from app.db.redis import get_redis
+    from app.services.rate_limit import CorrectionLimiter, correction_limiter
+
+    # Every request must reach the stub
+    settings.CORRECTION_CACHE_ENABLED = False
+
+    results = {}
+    # Limits high enough that the overhead runs measure admitted requests only
+    user_rate, user_burst = settings.RATE_LIMIT_USER_PER_MINUTE, settings.RATE_LIMIT_USER_BURST
+    global_rate, global_burst = settings.RATE_LIMIT_GLOBAL_PER_MINUTE, settings.RATE_LIMIT_GLOBAL_BURST
+    settings.RATE_LIMIT_USER_BURST = settings.RATE_LIMIT_GLOBAL_BURST = calls
+    settings.RATE_LIMIT_USER_PER_MINUTE = settings.RATE_LIMIT_GLOBAL_PER_MINUTE = 60.0 * calls
+
+    redis = get_redis()
+    redis_reachable = False
+    if redis is not None:
+        try:
+            await redis.ping()
+            redis_reachable = True
+        except Exception as e:
+            print(f"Redis not reachable ({e}), measuring the in-process limiter only")
+    backends = [("local", False)] + ([("redis", True)] if redis_reachable else [])
+
+    for name, use_redis in backends:
+        settings.RATE_LIMIT_REDIS_ENABLED = use_redis
+        results[f"overhead_{name}"] = await overhead(CorrectionLimiter(), calls, users)
+
+    settings.RATE_LIMIT_USER_PER_MINUTE, settings.RATE_LIMIT_USER_BURST = user_rate, user_burst
+    settings.RATE_LIMIT_GLOBAL_PER_MINUTE, settings.RATE_LIMIT_GLOBAL_BURST = global_rate, global_burst
+    for name, use_redis in backends:
+        settings.RATE_LIMIT_REDIS_ENABLED = use_redis
+        results[f"isolation_{name}"] = await isolation(CorrectionLimiter(), abusive)
+
+    settings.RATE_LIMIT_REDIS_ENABLED = redis_reachable
+    if redis_reachable:
+        # Start the burst from full buckets
+        keys = [key async for key in redis.scan_iter("twinglish:ratelimit:*")]
+        if keys:
+            await redis.delete(*keys)
+    results["burst"] = await burst(requests, port, latency)
+    results["limiter"] = correction_limiter.stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000, help="Limiter calls per overhead run")
+    parser.add_argument("--users", type=int, default=1000, help="Distinct users in the overhead runs")
+    parser.add_argument("--abusive", type=int, default=1000, help="check() calls by the abusive user")
+    parser.add_argument("--burst", type=int, default=50, help="Concurrent POST /tweets from one user")
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.calls, args.users, args.abusive, args.burst, args.port, args.latency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# benchmarks/bench_resilience.py
+"""
+Tail latency and outages against the fault-injecting stub.
+
+Hedging: corrections against an upstream where a small share of the calls is very
+slow, with and without hedged requests (latency percentiles, extra upstream calls).
+
+Circuit breaker: steady traffic through an outage (every call fails) and the
+recovery after it, with and without the breaker: fallback latency and upstream
+calls during the outage, and how quickly answers come back afterwards.
+Run with: python -m benchmarks.bench_resilience --requests 300 --slow-rate 0.03 --outage 6 --recovery 6
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import setup_environment, summarize
+from benchmarks.stub_openai import run_stub
+
+
+async def closed_loop(call, requests: int, concurrency: int) -> list:
+    latencies = []
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            await call(i)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def hedging(stub: httpx.AsyncClient, requests: int, concurrency: int, slow_rate: float, slow_latency: float) -> dict:
+    from app.core.config import settings
+    from app.services.openai_service import hedger, request_correction
+
+    await stub.post("/stub/faults", json={"error_rate": 0.0, "slow_rate": slow_rate, "slow_latency": slow_latency})
+    results = {}
+    for enabled in (False, True):
+        settings.OPENAI_HEDGE_ENABLED = enabled
+        hedges_before = hedger.stats()
+        await stub.post("/stub/reset")
+        mode = "hedged" if enabled else "unhedged"
+        latencies = await closed_loop(lambda i: request_correction(f"I am agree with {mode} number {i}"), requests, concurrency)
+        results[mode] = {
+            "latency": summarize(latencies),
+            "upstream_calls": (await stub.get("/stub/stats")).json()["calls"],
+        }
+        if enabled:
+            after = hedger.stats()
+            results[mode]["hedges_sent"] = after["hedges"] - hedges_before["hedges"]
+            results[mode]["hedges_won"] = after["hedge_wins"] - hedges_before["hedge_wins"]
+    settings.OPENAI_HEDGE_ENABLED = False
+    return results
+
+
+async def outage(stub: httpx.AsyncClient, rate: float, outage_s: float, recovery_s: float, breaker_enabled: bool) -> dict:
+    from app.core.config import settings
+    from app.services.openai_service import circuit_breaker, correct_tweet
+
+    settings.OPENAI_CIRCUIT_ENABLED = breaker_enabled
+    await stub.post("/stub/faults", json={"error_rate": 1.0, "slow_rate": 0.0})
+    await stub.post("/stub/reset")
+    phases = {"outage": [], "recovery": []}
+    first_success = None
+    start = time.perf_counter()
+    recovered_at = start + outage_s
+    tasks = []
+
+    async def one(i: int, phase: str):
+        nonlocal first_success
+        began = time.perf_counter()
+        _, explanation = await correct_tweet(f"Outage test {breaker_enabled} {i}")
+        phases[phase].append(time.perf_counter() - began)
+        if phase == "recovery" and first_success is None and not explanation.startswith("Could not process"):
+            first_success = time.perf_counter() - recovered_at
+
+    i = 0
+    outage_calls = None
+    while time.perf_counter() - start < outage_s + recovery_s:
+        phase = "outage" if time.perf_counter() < recovered_at else "recovery"
+        if phase == "recovery" and outage_calls is None:
+            outage_calls = (await stub.get("/stub/stats")).json()["calls"]
+            await stub.post("/stub/faults", json={"error_rate": 0.0})
+        tasks.append(asyncio.create_task(one(i, phase)))
+        i += 1
+        await asyncio.sleep(1 / rate)
+    await asyncio.gather(*tasks)
+
+    return {
+        "outage_fallback_latency": summarize(phases["outage"]),
+        "outage_upstream_calls": outage_calls,
+        "recovery_latency": summarize(phases["recovery"]),
+        "seconds_to_first_answer_after_recovery": round(first_success, 2) if first_success is not None else None,
+        "breaker": circuit_breaker.stats() if breaker_enabled else None,
+    }
+
+
+async def run(args) -> dict:
+    stub_options = dict(latency=args.latency, jitter=args.jitter)
+    async with run_stub(port=args.port, **stub_options) as base_url:
+        setup_environment(base_url)
+        from app.core.config import settings
+        from app.services.openai_service import circuit_breaker, close_client
+
+        settings.OPENAI_LOG_TOKEN_SAVINGS = False
+        settings.OPENAI_CIRCUIT_ENABLED = False
+        circuit_breaker.open_seconds = args.open_seconds
+        circuit_breaker.min_calls = 10
+        results = {}
+        async with httpx.AsyncClient(base_url=base_url[: -len("/v1")]) as stub:
+            results["hedging"] = await hedging(stub, args.requests, args.concurrency, args.slow_rate, args.slow_latency)
+            results["outage_without_breaker"] = await outage(stub, args.rate, args.outage, args.recovery, False)
+            results["outage_with_breaker"] = await outage(stub, args.rate, args.outage, args.recovery, True)
+        await close_client()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300, help="Corrections per hedging run")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--slow-latency", type=float, default=3.0)
+    parser.add_argument("--rate", type=float, default=20, help="Corrections per second during the outage test")
+    parser.add_argument("--outage", type=float, default=6, help="Seconds of failing upstream")
+    parser.add_argument("--recovery", type=float, default=6, help="Seconds of healthy upstream afterwards")
+    parser.add_argument("--open-seconds", type=float, default=2, help="Breaker open time for the benchmark")
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
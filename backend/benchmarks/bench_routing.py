@@ -0,0 +1,85 @@
+# benchmarks/bench_routing.py
+"""
+Single-model corrections versus fast-model-first routing against the local stub:
+latency, upstream calls per model and the escalation rate, for a mix of short
+and long tweets and a given share of low-confidence fast answers.
+Run with: python -m benchmarks.bench_routing --requests 64 --latency 1.0 --fast-latency 0.3 --low-confidence-rate 0.2
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import setup_environment, summarize
+from benchmarks.stub_openai import run_stub
+
+FAST_MODEL = "stub-fast"
+STRONG_MODEL = "stub-strong"
+
+SHORT_TWEET = "I am agree with you about this {i}"
+LONG_TWEET = (
+    "Yesterday I goes to the market with my friends and we buyed many vegetables, but when we "
+    "come back home the rain was starting and everything get wet, number {i}"
+)
+
+
+async def burst(request_correction, requests: int, long_share: float) -> dict:
+    latencies = []
+    long_every = round(1 / long_share) if long_share > 0 else 0
+
+    async def one(i: int):
+        template = LONG_TWEET if long_every and i % long_every == 0 else SHORT_TWEET
+        start = time.perf_counter()
+        await request_correction(template.format(i=i))
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return summarize(latencies)
+
+
+async def run(requests: int, latency: float, fast_latency: float, low_confidence_rate: float, long_share: float, port: int) -> dict:
+    options = dict(latency=latency, fast_model=FAST_MODEL, fast_latency=fast_latency, low_confidence_rate=low_confidence_rate)
+    async with run_stub(port=port, **options) as base_url:
+        setup_environment(base_url)
+        from app.core.config import settings
+        from app.services.openai_service import ROUTING_ESCALATIONS, close_client, request_correction
+
+        settings.OPENAI_MODEL = STRONG_MODEL
+        settings.OPENAI_LOG_TOKEN_SAVINGS = False
+        stub_root = base_url[: -len("/v1")]
+        results = {}
+        async with httpx.AsyncClient(base_url=stub_root) as stub:
+            for mode, fast_model in (("single_model", None), ("routed", FAST_MODEL)):
+                settings.OPENAI_FAST_MODEL = fast_model
+                await stub.post("/stub/reset")
+                results[mode] = {"latency": await burst(request_correction, requests, long_share)}
+                results[mode]["upstream_calls"] = (await stub.get("/stub/stats")).json()["calls_by_model"]
+
+        escalations = {values[0]: child.value for values, child in ROUTING_ESCALATIONS._children.items()}
+        fast_calls = results["routed"]["upstream_calls"].get(FAST_MODEL, 0)
+        results["routed"]["escalations"] = escalations
+        results["routed"]["escalation_rate"] = round(sum(escalations.values()) / fast_calls, 3) if fast_calls else 0.0
+        await close_client()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per strong-model completion")
+    parser.add_argument("--fast-latency", type=float, default=0.3, help="Seconds per fast-model completion")
+    parser.add_argument("--low-confidence-rate", type=float, default=0.2)
+    parser.add_argument("--long-share", type=float, default=0.25, help="Share of tweets too long for the fast tier")
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        run(args.requests, args.latency, args.fast_latency, args.low_confidence_rate, args.long_share, args.port)
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_serialization.py
+"""
+Encoding a page of GET /tweets for 10, 50 and 100 items: time of the previous
+path (response_model validation + stdlib json) vs. FastJSONResponse on the
+store's dicts, and bytes on the wire with identity, gzip and brotli (when
+installed) at the configured levels, including the time spent compressing.
+Run with: python -m benchmarks.bench_serialization --sizes 10 50 100 --repeat 200
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import setup_environment, summarize
+
+EXPLANATION = (
+    "Use 'agree' without 'am': it is a verb, not an adjective. "
+    "The past tense of 'go' is 'went', and 'yesterday' needs the past tense. "
+    "Add the article 'the' before 'park' because both of you know which park it is."
+)
+
+
+def page(size: int) -> list:
+    start = datetime.now(timezone.utc)
+    return [
+        {
+            "id": 100000 - i,
+            "original_text": f"I am agree that yesterday we go to park number {i} with my friends.",
+            "corrected_text": f"I agree that yesterday we went to the park number {i} with my friends.",
+            "explanation": EXPLANATION,
+            "created_at": (start - timedelta(seconds=i)).isoformat(),
+            "user_id": 1,
+            "status": "done",
+        }
+        for i in range(size)
+    ]
+
+
+def timed(call, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples), result
+
+
+def run(sizes, repeat: int) -> dict:
+    setup_environment()
+    from typing import List
+
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    from app.core import compression, responses
+    from app.core.config import settings
+    from app.routers.tweets import Tweet
+
+    adapter = TypeAdapter(List[Tweet])
+    plain, fast = JSONResponse([]), responses.FastJSONResponse([])
+
+    def validated(tweets):
+        # What FastAPI does with response_model before rendering
+        return plain.render(adapter.dump_python(adapter.validate_python(tweets), mode="json"))
+
+    results = {"orjson": responses.orjson is not None, "brotli": compression.brotli is not None}
+    for size in sizes:
+        tweets = page(size)
+        before, body = timed(lambda: validated(tweets), repeat)
+        after, fast_body = timed(lambda: fast.render(tweets), repeat)
+        assert json.loads(body) == json.loads(fast_body)
+
+        wire = {"identity": {"bytes": len(fast_body)}}
+        gzip_time, gzipped = timed(lambda: gzip.compress(fast_body, compresslevel=settings.RESPONSE_GZIP_LEVEL), repeat)
+        wire["gzip"] = {"bytes": len(gzipped), "compress_p50_ms": gzip_time["p50_ms"]}
+        if compression.brotli is not None:
+            br_time, brotlied = timed(lambda: compression.brotli.compress(fast_body, quality=settings.RESPONSE_BROTLI_QUALITY), repeat)
+            wire["br"] = {"bytes": len(brotlied), "compress_p50_ms": br_time["p50_ms"]}
+
+        results[f"{size}_items"] = {
+            "validated_stdlib_json": before,
+            "fast_json_response": after,
+            "previous_bytes": len(body),
+            "wire": wire,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.sizes, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
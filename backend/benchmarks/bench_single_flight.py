@@ -0,0 +1,69 @@
+# benchmarks/bench_single_flight.py
+"""
+A class submitting the same sentence at once: upstream calls and latency for N
+concurrent identical corrections with and without single-flight coalescing.
+The correction cache is cleared between runs, so every run starts cold.
+Run with: python -m benchmarks.bench_single_flight --requests 30 --distinct 3 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import setup_environment, summarize
+from benchmarks.stub_openai import run_stub
+
+
+async def classroom(correct_tweet, requests: int, distinct: int) -> dict:
+    latencies = []
+
+    async def one(i: int):
+        start = time.perf_counter()
+        # Spacing differs per student but normalizes to the same key
+        text = f"I am agree with  exercise {i % distinct} " if i % 2 else f"I am agree with exercise {i % distinct}"
+        await correct_tweet(text)
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return summarize(latencies)
+
+
+async def run(requests: int, distinct: int, latency: float, port: int) -> dict:
+    async with run_stub(port=port, latency=latency) as base_url:
+        setup_environment(base_url)
+        from app.core.config import settings
+        from app.services.correction_cache import correction_cache
+        from app.services.openai_service import close_client, correct_tweet, correction_flights
+
+        settings.OPENAI_LOG_TOKEN_SAVINGS = False
+        stub_root = base_url[: -len("/v1")]
+        results = {}
+        async with httpx.AsyncClient(base_url=stub_root) as stub:
+            for enabled in (False, True):
+                settings.OPENAI_SINGLE_FLIGHT_ENABLED = enabled
+                await correction_cache.invalidate()
+                await stub.post("/stub/reset")
+                mode = "single_flight" if enabled else "independent"
+                results[mode] = {"latency": await classroom(correct_tweet, requests, distinct)}
+                results[mode]["upstream_calls"] = (await stub.get("/stub/stats")).json()["calls"]
+            results["single_flight"]["coalescing"] = correction_flights.stats()
+
+        await close_client()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--distinct", type=int, default=3, help="Number of different sentences in the burst")
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.requests, args.distinct, args.latency, args.port)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
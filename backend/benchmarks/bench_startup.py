@@ -0,0 +1,98 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start cost of a worker: import time of app.main (python -X importtime) with
+the slowest modules, and the time the lifespan warm-up takes, each measured in a
+fresh interpreter. With --budget-ms the script exits non-zero when the median
+import time exceeds the budget, so it can guard against regressions in CI.
+Run with: python -m benchmarks.bench_startup --runs 5 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from benchmarks.common import setup_environment
+
+STARTUP_SNIPPET = """
+import asyncio, json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def enter_lifespan():
+    async with app.main.lifespan(app.main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(enter_lifespan())
+print(json.dumps({"import_s": imported - start, "lifespan_s": ready - imported}))
+"""
+
+
+def parse_importtime(stderr: str) -> Tuple[int, Dict[str, int]]:
+    """
+    Cumulative microseconds for app.main and self time per imported module
+    """
+    total = 0
+    self_times: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        self_times[name] = int(self_us)
+        if name == "app.main":
+            total = int(cumulative_us)
+    return total, self_times
+
+
+def run_python(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=os.environ.copy(), check=True)
+
+
+def run(runs: int, top: int) -> dict:
+    totals, lifespans, imports = [], [], []
+    self_times: Dict[str, List[int]] = defaultdict(list)
+
+    for _ in range(runs):
+        result = run_python(["-X", "importtime", "-c", "import app.main"])
+        total, modules = parse_importtime(result.stderr)
+        totals.append(total / 1000)
+        for name, self_us in modules.items():
+            self_times[name].append(self_us)
+
+        result = run_python(["-c", STARTUP_SNIPPET])
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        imports.append(timings["import_s"] * 1000)
+        lifespans.append(timings["lifespan_s"] * 1000)
+
+    slowest = sorted(self_times.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:top]
+    return {
+        "runs": runs,
+        "importtime_app_main_ms": round(statistics.median(totals), 1),
+        "import_wall_ms": round(statistics.median(imports), 1),
+        "lifespan_startup_ms": round(statistics.median(lifespans), 1),
+        "slowest_modules_self_ms": {name: round(statistics.median(samples) / 1000, 1) for name, samples in slowest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail when the median import of app.main is slower")
+    args = parser.parse_args()
+
+    setup_environment()
+    results = run(args.runs, args.top)
+    print(json.dumps(results, indent=2))
+
+    if args.budget_ms is not None and results["importtime_app_main_ms"] > args.budget_ms:
+        print(f"Import of app.main took {results['importtime_app_main_ms']} ms, over the {args.budget_ms} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
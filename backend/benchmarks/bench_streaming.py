@@ -0,0 +1,82 @@
+# benchmarks/bench_streaming.py
+"""
+Time to the corrected sentence with POST /tweets/stream (server-sent events) versus
+the full response time of the regular POST /tweets, against the local stub.
+Run with: python -m benchmarks.bench_streaming --requests 10 --latency 2.0
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import auth_headers, setup_environment, summarize
+from benchmarks.stub_openai import run_stub, serve
+
+
+async def run(requests: int, latency: float, port: int) -> dict:
+    async with run_stub(port=port, latency=latency) as base_url:
+        setup_environment(base_url)
+        from app.core.config import settings
+        from app.main import app
+
+        # Every request must reach the stub
+        settings.CORRECTION_CACHE_ENABLED = False
+        headers = auth_headers()
+        first_event, corrected, done, blocking = [], [], [], []
+
+        # A real server is needed here: httpx's ASGI transport buffers whole responses
+        async with serve(app, "127.0.0.1", port + 1) as app_url:
+            async with httpx.AsyncClient(base_url=app_url, timeout=60) as client:
+                for i in range(requests):
+                    body = {"original_text": f"I am agree with you number {i}"}
+
+                    start = time.perf_counter()
+                    response = await client.post("/api/v1/tweets/", json=body, headers=headers)
+                    response.raise_for_status()
+                    blocking.append(time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    first_event_seen = False
+                    failed = False
+                    async with client.stream("POST", "/api/v1/tweets/stream", json=body, headers=headers) as stream:
+                        async for line in stream.aiter_lines():
+                            if failed and line.startswith("data: "):
+                                # The fallback is fast too; timing it would hide a broken stream
+                                raise SystemExit(f"Stream {i} failed: {line[len('data: '):]}")
+                            if not line.startswith("event: "):
+                                continue
+                            elapsed = time.perf_counter() - start
+                            if not first_event_seen:
+                                first_event_seen = True
+                                first_event.append(elapsed)
+                            if line == "event: error":
+                                failed = True
+                            if line == "event: corrected":
+                                corrected.append(elapsed)
+                            elif line == "event: done":
+                                done.append(elapsed)
+
+    return {
+        "requests": requests,
+        "stub_latency_s": latency,
+        "blocking_post": summarize(blocking),
+        "stream_first_event": summarize(first_event),
+        "stream_corrected_event": summarize(corrected),
+        "stream_done_event": summarize(done),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.requests, args.latency, args.port)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
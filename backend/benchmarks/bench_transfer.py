@@ -0,0 +1,111 @@
+# benchmarks/bench_transfer.py
+"""
+Throughput of POST /tweets/import (NDJSON streamed in 64 KiB chunks) for several
+TWEET_IMPORT_BATCH_SIZE values, and of GET /tweets/export (NDJSON and CSV) with
+its time to first byte, in rows per second through a real uvicorn server.
+Uses the memory store unless --database-url points at a migrated database
+(SQLite files are created on the fly).
+Run with: python -m benchmarks.bench_transfer --rows 20000 --batch-sizes 1 100 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+from benchmarks.common import auth_headers, setup_environment
+from benchmarks.stub_openai import serve
+
+CHUNK_BYTES = 64 * 1024
+
+
+def ndjson(rows: int) -> bytes:
+    lines = [
+        json.dumps({
+            "original_text": f"Yesterday I go to the park number {i} with my friends.",
+            "corrected_text": f"Yesterday I went to the park number {i} with my friends.",
+            "explanation": "Use the past tense 'went' for a finished action in the past.",
+        })
+        for i in range(rows)
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def chunked(body: bytes):
+    for offset in range(0, len(body), CHUNK_BYTES):
+        yield body[offset:offset + CHUNK_BYTES]
+
+
+async def prepare_database() -> None:
+    from app.core.config import settings
+    from app.db.base import Base
+    from app.db.session import engine
+
+    if settings.DATABASE_URL.startswith("sqlite"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+
+async def run(rows: int, batch_sizes: list, port: int) -> dict:
+    setup_environment()
+    from app.core.config import settings
+    from app.main import app
+
+    await prepare_database()
+    headers = auth_headers()
+    body = ndjson(rows)
+    results = {"rows": rows, "body_bytes": len(body)}
+    async with serve(app, "127.0.0.1", port) as app_url:
+        async with httpx.AsyncClient(base_url=app_url, timeout=600) as client:
+            for batch_size in batch_sizes:
+                settings.TWEET_IMPORT_BATCH_SIZE = batch_size
+                start = time.perf_counter()
+                response = await client.post("/api/v1/tweets/import", content=chunked(body), headers=headers)
+                elapsed = time.perf_counter() - start
+                response.raise_for_status()
+                imported = response.json()["imported"]
+                results[f"import_batch_{batch_size}"] = {
+                    "imported": imported,
+                    "seconds": round(elapsed, 3),
+                    "rows_per_second": round(imported / elapsed),
+                }
+
+            exported = (await client.get("/api/v1/tweets/count", headers=headers)).json()["total"]
+            for export_format in ("ndjson", "csv"):
+                start = time.perf_counter()
+                first_byte = None
+                size = 0
+                async with client.stream("GET", "/api/v1/tweets/export", params={"format": export_format}, headers=headers) as response:
+                    async for chunk in response.aiter_raw():
+                        if first_byte is None:
+                            first_byte = time.perf_counter() - start
+                        size += len(chunk)
+                elapsed = time.perf_counter() - start
+                results[f"export_{export_format}"] = {
+                    "rows": exported,
+                    "bytes": size,
+                    "first_byte_ms": round(first_byte * 1000, 2),
+                    "seconds": round(elapsed, 3),
+                    "rows_per_second": round(exported / elapsed),
+                }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000, help="Tweets per import run")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--port", type=int, default=9102)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+        os.environ["TWEET_STORE"] = "database"
+    print(json.dumps(asyncio.run(run(args.rows, args.batch_sizes, args.port)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# benchmarks/load_test.py
+"""
+End-to-end load test: starts the API under uvicorn in a separate process, pointed
+at the local OpenAI stub, and drives a mix of POST /tweets, GET /tweets,
+GET /tweets/count and POST /auth/login at a target rate (open loop, Poisson
+arrivals). Reports p50/p95/p99 latency, status codes and throughput per endpoint
+and writes everything to a JSON file named after the current commit, so runs can
+be compared across commits.
+Run with: python -m benchmarks.load_test --rps 50 --duration 30 --latency 0.5 --jitter 0.2 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import auth_headers, setup_environment, summarize
+from benchmarks.stub_openai import run_stub
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_MIX = "create=0.2,list=0.5,count=0.25,login=0.05"
+LOGIN_FORM = {"username": "testuser", "password": "Password123"}
+TWEETS = [
+    "I am agree with you about this",
+    "She don't like coffee in the morning",
+    "Yesterday I goes to the park with my friends",
+    "This is a sentence that is already correct.",
+    "He have three brother and one sister",
+    "We was very happy to see you last week",
+]
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("create", "list", "count", "login"):
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r}")
+        mix[name] = float(weight)
+    return mix
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+async def start_api(port: int) -> subprocess.Popen:
+    """
+    Run the app under uvicorn in its own process so the load generator does not
+    share its event loop
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+    )
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        for _ in range(300):
+            if process.poll() is not None:
+                raise RuntimeError("API process exited during startup")
+            try:
+                await client.get("/")
+                return process
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("API did not start within 30 seconds")
+
+
+async def drive(client: httpx.AsyncClient, rps: float, duration: float, mix: Dict[str, float], max_in_flight: int) -> dict:
+    headers = auth_headers()
+    operations = {
+        "create": lambda i: client.post(
+            "/api/v1/tweets/", json={"original_text": f"{random.choice(TWEETS)} {i}"}, headers=headers
+        ),
+        "list": lambda i: client.get("/api/v1/tweets/", params={"limit": 10}, headers=headers),
+        "count": lambda i: client.get("/api/v1/tweets/count", headers=headers),
+        "login": lambda i: client.post("/api/v1/auth/login", data=LOGIN_FORM),
+    }
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+    dropped = 0
+    in_flight = set()
+
+    async def one(name: str, i: int):
+        start = time.perf_counter()
+        try:
+            response = await operations[name](i)
+            statuses[name][str(response.status_code)] += 1
+        except httpx.HTTPError as e:
+            statuses[name][type(e).__name__] += 1
+        latencies[name].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    next_arrival = start
+    i = 0
+    while next_arrival - start < duration:
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        if len(in_flight) >= max_in_flight:
+            dropped += 1
+        else:
+            task = asyncio.create_task(one(random.choices(names, weights)[0], i))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        i += 1
+        next_arrival += random.expovariate(rps)
+    sent_s = time.perf_counter() - start
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    elapsed = time.perf_counter() - start
+
+    completed = sum(len(samples) for samples in latencies.values())
+    endpoints = {}
+    for name in names:
+        endpoints[name] = {
+            "latency": summarize(latencies[name]),
+            "throughput_rps": round(len(latencies[name]) / elapsed, 2),
+            "status_codes": dict(statuses[name]),
+        }
+    return {
+        "offered_rps": round(i / sent_s, 2),
+        "achieved_rps": round(completed / elapsed, 2),
+        "dropped": dropped,
+        "latency": summarize([sample for samples in latencies.values() for sample in samples]),
+        "endpoints": endpoints,
+    }
+
+
+async def run(args) -> dict:
+    stub_options = dict(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    async with run_stub(port=args.stub_port, **stub_options) as base_url:
+        setup_environment(base_url)
+        os.environ.setdefault("OPENAI_LOG_TOKEN_SAVINGS", "false")
+        api = await start_api(args.api_port)
+        try:
+            limits = httpx.Limits(max_connections=args.max_in_flight)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.api_port}", timeout=60, limits=limits) as client, \
+                    httpx.AsyncClient(base_url=base_url[: -len("/v1")]) as stub:
+                if args.warmup:
+                    await drive(client, args.rps, args.warmup, args.mix, args.max_in_flight)
+                    await stub.post("/stub/reset")
+                results = await drive(client, args.rps, args.duration, args.mix, args.max_in_flight)
+                results["upstream"] = (await stub.get("/stub/stats")).json()
+        finally:
+            api.terminate()
+            api.wait(timeout=10)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rps", type=float, default=50, help="Target request rate")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of unmeasured load first")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Operation weights (default {DEFAULT_MIX})")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Stub extra seconds, uniform")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of stub completions that fail")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="Arrivals beyond this many open requests are dropped")
+    parser.add_argument("--api-port", type=int, default=9120)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--output", type=Path, default=None, help="JSON file (default: benchmarks/results/load_test-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    started_at = datetime.now(timezone.utc)
+    results = {
+        "commit": commit,
+        "started_at": started_at.isoformat(),
+        "config": {
+            "rps": args.rps,
+            "duration_s": args.duration,
+            "mix": args.mix,
+            "stub_latency_s": args.latency,
+            "stub_jitter_s": args.jitter,
+            "stub_error_rate": args.error_rate,
+        },
+        **asyncio.run(run(args)),
+    }
+
+    output = args.output or RESULTS_DIR / f"load_test-{commit or 'unknown'}-{started_at:%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# benchmarks/stub_openai.py
+"""
+Local stand-in for the OpenAI chat-completions API
+Run with: python -m benchmarks.stub_openai --port 9100 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ORIGINAL_TEXT_RE = re.compile(r'Original text: "(.*)"', re.DOTALL)
+BATCH_TEXTS_RE = re.compile(r"Texts: (\[.*\])", re.DOTALL)
+STUB_EXPLANATION = (
+    "Your text looks good. (stub response) This explanation is deliberately long, like a real one: "
+    "it walks through each change, why the original phrasing sounds unnatural to a native speaker, "
+    "which grammar rule applies, and gives a couple of alternative ways to say the same thing so "
+    "the learner can pick the one that fits their style best."
+)
+STREAM_CHUNK_CHARS = 4  # Roughly one token per streamed chunk
+
+
+def _extract_original(messages: List[Dict[str, Any]]) -> str:
+    """
+    Pull the tweet text back out of the user prompt
+    """
+    content = messages[-1]["content"]
+    match = ORIGINAL_TEXT_RE.search(content)
+    return match.group(1) if match else content.strip()
+
+
+def _completion(model: str, content: str, prompt_tokens: int) -> Dict[str, Any]:
+    completion_tokens = max(1, len(content) // 4)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+async def _stream(model: str, content: str, latency: float) -> AsyncIterator[str]:
+    """
+    Emit the completion as chat.completion.chunk events spread evenly over latency
+    """
+    chunks = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+    delay = latency / max(1, len(chunks))
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    for piece in chunks + [None]:
+        if piece is not None:
+            await asyncio.sleep(delay)
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {"content": piece} if piece is not None else {},
+                    "finish_reason": None if piece is not None else "stop",
+                }
+            ],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def _batch_content(items: List[Dict[str, Any]], malformed_rate: float) -> str:
+    results = []
+    for item in items:
+        if random.random() < malformed_rate:
+            results.append({"id": item["id"], "corrected": item["text"]})
+        else:
+            results.append({"id": item["id"], "corrected_text": item["text"], "explanation": STUB_EXPLANATION})
+    return json.dumps({"results": results})
+
+
+def create_stub_app(
+    latency: float = 0.5,
+    malformed_rate: float = 0.0,
+    fast_model: Optional[str] = None,
+    fast_latency: float = 0.1,
+    low_confidence_rate: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    slow_rate: float = 0.0,
+    slow_latency: float = 5.0,
+) -> FastAPI:
+    """
+    Build a FastAPI app that answers chat completions after a fixed delay plus up
+    to jitter seconds of uniform noise (streamed completions are spread over the
+    same delay). Faults: an error_rate share of the calls fails with a 500 after
+    the delay, and a slow_rate share takes slow_latency instead (a heavy tail).
+    POST /stub/faults changes error_rate, slow_rate and slow_latency at runtime,
+    e.g. to simulate an outage and its recovery.
+
+    Requests for fast_model are answered after fast_latency instead. Prompts that
+    ask for a confidence get one, below any sensible threshold for a
+    low_confidence_rate share of the answers.
+
+    Batch prompts (a JSON array of {id, text}, bare or after "Texts: ") get a
+    {"results": [...]} answer;
+    malformed_rate is the share of batch elements returned without valid fields.
+    """
+    app = FastAPI(title="OpenAI stub")
+    app.state.calls = 0
+    app.state.calls_by_model = {}
+    app.state.errors = 0
+    app.state.prompt_tokens = 0
+    app.state.completion_tokens = 0
+    app.state.faults = {"error_rate": error_rate, "slow_rate": slow_rate, "slow_latency": slow_latency}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(payload: Dict[str, Any]):
+        app.state.calls += 1
+        model = payload.get("model", "stub")
+        app.state.calls_by_model[model] = app.state.calls_by_model.get(model, 0) + 1
+        delay = fast_latency if fast_model and model == fast_model else latency
+        delay += random.uniform(0, jitter)
+        faults = app.state.faults
+        if random.random() < faults["slow_rate"]:
+            delay = faults["slow_latency"]
+        fail = random.random() < faults["error_rate"]
+        if not payload.get("stream") or fail:
+            await asyncio.sleep(delay)
+        if fail:
+            app.state.errors += 1
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Stub server error", "type": "server_error", "code": None}},
+            )
+
+        messages = payload["messages"]
+        user_content = messages[-1]["content"]
+        batch = BATCH_TEXTS_RE.search(user_content)
+        if batch or user_content.lstrip().startswith("["):
+            items = json.loads(batch.group(1) if batch else user_content)
+            content = _batch_content(items, malformed_rate)
+        else:
+            answer = {"corrected_text": _extract_original(messages), "explanation": STUB_EXPLANATION}
+            if "confidence" in messages[0]["content"]:
+                answer["confidence"] = 0.3 if random.random() < low_confidence_rate else 0.95
+            content = json.dumps(answer)
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        if payload.get("stream"):
+            app.state.prompt_tokens += prompt_tokens
+            return StreamingResponse(_stream(model, content, delay), media_type="text/event-stream")
+        completion = _completion(model, content, prompt_tokens)
+        app.state.prompt_tokens += completion["usage"]["prompt_tokens"]
+        app.state.completion_tokens += completion["usage"]["completion_tokens"]
+        return completion
+
+    @app.get("/stub/stats")
+    async def stats():
+        return {
+            "calls": app.state.calls,
+            "calls_by_model": app.state.calls_by_model,
+            "errors": app.state.errors,
+            "prompt_tokens": app.state.prompt_tokens,
+            "completion_tokens": app.state.completion_tokens,
+        }
+
+    @app.post("/stub/faults")
+    async def set_faults(changes: Dict[str, float]):
+        unknown = set(changes) - set(app.state.faults)
+        if unknown:
+            return JSONResponse(status_code=400, content={"detail": f"Unknown faults: {sorted(unknown)}"})
+        app.state.faults.update(changes)
+        return app.state.faults
+
+    @app.post("/stub/reset")
+    async def reset():
+        app.state.calls = 0
+        app.state.calls_by_model = {}
+        app.state.errors = 0
+        app.state.prompt_tokens = 0
+        app.state.completion_tokens = 0
+        return {"ok": True}
+
+    return app
+
+
+@asynccontextmanager
+async def serve(app: FastAPI, host: str, port: int) -> AsyncIterator[str]:
+    """
+    Serve an ASGI app with uvicorn in the current event loop and yield its URL
+    """
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+@asynccontextmanager
+async def run_stub(host: str = "127.0.0.1", port: int = 9100, **options) -> AsyncIterator[str]:
+    """
+    Serve the stub in the current event loop and yield its OpenAI base URL
+    """
+    async with serve(create_stub_app(**options), host, port) as url:
+        yield f"{url}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI chat-completions stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds per completion")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of completions that fail with a 500")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of completions that take --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of bad batch elements")
+    args = parser.parse_args()
+
+    app = create_stub_app(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        malformed_rate=args.malformed_rate,
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
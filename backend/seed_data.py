@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Seed the database with realistic volumes of users and tweets, e.g. to validate
+indexes and pagination at 10M rows
+
+Tweets are spread over users with a long tail (a few very active learners, many
+occasional ones), over the last --days with more activity in the evening, and
+have tweet-like lengths. --perfect-ratio of them needed no correction; the rest
+contain a common learner mistake with its correction and explanation.
+
+Postgres is loaded with COPY; other databases (the local SQLite file) with
+batched executemany. Per-user counters are rebuilt at the end.
+Run with: python -m seed_data --users 10000 --tweets 10000000 --perfect-ratio 0.4
+"""
+import argparse
+import asyncio
+import bisect
+import math
+import os
+import random
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+USERNAME_PREFIX = "seed-user"
+PASSWORD = "Password123"
+
+TWEET_COLUMNS = ("user_id", "original_text", "corrected_text", "explanation", "status", "created_at", "updated_at")
+USER_COLUMNS = ("email", "username", "hashed_password", "is_active", "is_superuser", "created_at", "updated_at")
+
+PERFECT_EXPLANATION = "Great job! Your text looks correct, no changes needed."
+
+# (mistake, correction, explanation)
+MISTAKES = [
+    ("I am agree", "I agree", "'Agree' is a verb, so it does not take 'am'."),
+    ("since three years", "for three years", "Use 'for' with a duration and 'since' with a starting point."),
+    ("he go", "he goes", "Add -s to the verb after he, she or it in the present simple."),
+    ("more better", "better", "'Better' is already comparative, so 'more' is not needed."),
+    ("I didn't went", "I didn't go", "After 'did' or 'didn't' use the base form of the verb."),
+    ("the informations", "the information", "'Information' is uncountable and has no plural."),
+    ("people is", "people are", "'People' is plural, so it takes 'are'."),
+    ("I have 20 years", "I am 20 years old", "In English age is expressed with 'to be'."),
+    ("explain me", "explain to me", "'Explain' needs 'to' before the person."),
+    ("in the weekend", "at the weekend", "British English says 'at the weekend' (American: 'on the weekend')."),
+]
+
+WORDS = (
+    "today yesterday tomorrow morning evening weekend friends family work school coffee music movie "
+    "book city park dinner lunch weather rain sun trip train bus office meeting project class teacher "
+    "really very quite always never often sometimes maybe finally just still already again "
+    "went saw made took found watched played cooked learned visited started finished enjoyed "
+    "with about after before during because but and so then when while the a my our their new old "
+    "great little big long short happy tired busy interesting beautiful difficult easy"
+).split()
+
+# Relative activity per hour of the day (UTC), evenings busiest
+HOUR_WEIGHTS = [2, 1, 1, 1, 1, 2, 3, 5, 6, 6, 6, 6, 7, 7, 6, 6, 7, 8, 10, 12, 12, 10, 7, 4]
+
+
+def tweet_length(rng: random.Random) -> int:
+    # Log-normal around 70 characters, capped like the column
+    return max(12, min(280, int(rng.lognormvariate(math.log(70), 0.6))))
+
+
+def filler(rng: random.Random, length: int) -> str:
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def make_pool(rng: random.Random, size: int, perfect: bool) -> list:
+    """
+    Distinct (original_text, corrected_text, explanation) triples to draw from
+    """
+    pool = []
+    for _ in range(size):
+        length = tweet_length(rng)
+        if perfect:
+            text = filler(rng, length).capitalize()[:280] + "."
+            pool.append((text, text, PERFECT_EXPLANATION))
+        else:
+            mistake, correction, explanation = rng.choice(MISTAKES)
+            rest = filler(rng, max(0, length - len(mistake) - 2))
+            original = f"{mistake} {rest}".capitalize()[:279] + "."
+            corrected = f"{correction} {rest}".capitalize()[:279] + "."
+            pool.append((original, corrected, explanation))
+    return pool
+
+
+class TweetGenerator:
+    """
+    Rows of TWEET_COLUMNS for the given user ids
+    """
+
+    def __init__(self, user_ids: list, perfect_ratio: float, days: int, seed: int):
+        self.rng = random.Random(seed)
+        self.user_ids = list(user_ids)
+        # Zipf-like activity: the user at rank r tweets about 1/r as often as the first
+        self.user_weights = list(accumulate(1 / (rank + 1) ** 0.9 for rank in range(len(user_ids))))
+        self.rng.shuffle(self.user_ids)
+        self.perfect_ratio = perfect_ratio
+        self.perfect = make_pool(self.rng, 5000, perfect=True)
+        self.corrected = make_pool(self.rng, 20000, perfect=False)
+        self.hour_weights = list(accumulate(HOUR_WEIGHTS))
+        self.end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        self.days = days
+
+    def created_at(self) -> datetime:
+        rng = self.rng
+        day = self.end - timedelta(days=rng.randrange(self.days))
+        hour = bisect.bisect_right(self.hour_weights, rng.random() * self.hour_weights[-1])
+        return day.replace(hour=hour) - timedelta(seconds=rng.randrange(3600))
+
+    def rows(self, count: int) -> list:
+        rng = self.rng
+        users = rng.choices(self.user_ids, cum_weights=self.user_weights, k=count)
+        rows = []
+        for user_id in users:
+            pool = self.perfect if rng.random() < self.perfect_ratio else self.corrected
+            original, corrected, explanation = pool[rng.randrange(len(pool))]
+            created_at = self.created_at()
+            rows.append((user_id, original, corrected, explanation, "done", created_at, created_at))
+        return rows
+
+
+def report(label: str, rows: int, seconds: float) -> None:
+    print(f"{label}: {rows} rows in {seconds:.1f}s ({rows / seconds if seconds else 0:,.0f} rows/s)")
+
+
+async def reset(session) -> None:
+    from sqlalchemy import delete, select
+
+    from app.models.tweet import Tweet
+    from app.models.tweet_stats import TweetStats
+    from app.models.user import User
+
+    seeded = select(User.id).where(User.username.like(f"{USERNAME_PREFIX}-%"))
+    await session.execute(delete(Tweet).where(Tweet.user_id.in_(seeded)))
+    await session.execute(delete(TweetStats).where(TweetStats.user_id.in_(seeded)))
+    await session.execute(delete(User).where(User.username.like(f"{USERNAME_PREFIX}-%")))
+    await session.commit()
+    print("Removed previously seeded users and their tweets")
+
+
+async def create_users(session, copy, users: int) -> list:
+    """
+    Create the missing seed users and return the ids of all of them
+    """
+    from sqlalchemy import insert, select
+
+    from app.core.security import get_password_hash
+    from app.models.user import User
+
+    names = [f"{USERNAME_PREFIX}-{i}" for i in range(users)]
+    existing = set((await session.execute(select(User.username).where(User.username.like(f"{USERNAME_PREFIX}-%")))).scalars())
+    # One bcrypt hash shared by every seed user; hashing per user would dominate
+    hashed_password = get_password_hash(PASSWORD)
+    now = datetime.now(timezone.utc)
+    rows = [
+        (f"{name}@example.com", name, hashed_password, True, False, now, now)
+        for name in names if name not in existing
+    ]
+
+    start = time.perf_counter()
+    if copy is not None:
+        await copy("user", rows, USER_COLUMNS)
+    elif rows:
+        await session.execute(insert(User), [dict(zip(USER_COLUMNS, row)) for row in rows])
+        await session.commit()
+    report("Users", len(rows), time.perf_counter() - start)
+
+    result = await session.execute(select(User.id).where(User.username.in_(names)).order_by(User.id))
+    return list(result.scalars())
+
+
+async def load_tweets(session, copy, generator: TweetGenerator, tweets: int, batch_size: int) -> None:
+    from sqlalchemy import insert
+
+    from app.models.tweet import Tweet
+
+    start = time.perf_counter()
+    loaded = 0
+    next_report = start + 10
+    while loaded < tweets:
+        rows = generator.rows(min(batch_size, tweets - loaded))
+        if copy is not None:
+            await copy("tweet", rows, TWEET_COLUMNS)
+        else:
+            await session.execute(insert(Tweet), [dict(zip(TWEET_COLUMNS, row)) for row in rows])
+            await session.commit()
+        loaded += len(rows)
+        if time.perf_counter() >= next_report:
+            report(f"Tweets so far ({100 * loaded // tweets}%)", loaded, time.perf_counter() - start)
+            next_report += 10
+    report("Tweets", loaded, time.perf_counter() - start)
+
+
+async def seed(args) -> None:
+    from sqlalchemy import text
+
+    from app.db.base import Base
+    from app.db.session import async_session, engine
+    from app.services.tweet_store import SqlTweetStore
+
+    postgres = engine.dialect.name == "postgresql"
+    if not postgres:
+        # Local database: make sure the tables exist
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    total_start = time.perf_counter()
+    async with AsyncExitStack() as stack:
+        session = await stack.enter_async_context(async_session())
+        copy = None
+        if postgres:
+            copy_conn = await stack.enter_async_context(engine.connect())
+            driver = (await copy_conn.get_raw_connection()).driver_connection
+
+            async def copy(table, rows, columns):
+                # Each COPY commits on its own, outside SQLAlchemy's transaction
+                await driver.copy_records_to_table(table, records=rows, columns=columns)
+
+        if args.reset:
+            await reset(session)
+        user_ids = await create_users(session, copy, args.users)
+        generator = TweetGenerator(user_ids, args.perfect_ratio, args.days, args.seed)
+        await load_tweets(session, copy, generator, args.tweets, args.batch_size)
+
+        start = time.perf_counter()
+        repaired = await SqlTweetStore(session).reconcile_counters()
+        print(f"Rebuilt counters of {repaired} users in {time.perf_counter() - start:.1f}s")
+        if postgres:
+            start = time.perf_counter()
+            await session.execute(text("ANALYZE tweet"))
+            await session.execute(text('ANALYZE "user"'))
+            await session.commit()
+            print(f"Analyzed tables in {time.perf_counter() - start:.1f}s")
+
+    await engine.dispose()
+    report("Total", args.users + args.tweets, time.perf_counter() - total_start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tweets", type=int, default=100000)
+    parser.add_argument("--perfect-ratio", type=float, default=0.4, help="Share of tweets that needed no correction")
+    parser.add_argument("--days", type=int, default=365, help="Tweets are spread over this many past days")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Rows per COPY or executemany batch")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible data")
+    parser.add_argument("--reset", action="store_true", help="Delete previously seeded users and tweets first")
+    parser.add_argument("--database-url", default=None, help="Defaults to DATABASE_URL")
+    args = parser.parse_args()
+
+    if not 0 <= args.perfect_ratio <= 1:
+        parser.error("--perfect-ratio must be between 0 and 1")
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    asyncio.run(seed(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# tests/conftest.py
+import os
+import sys
+
+# Settings are read at import time; these are enough for code that needs no services
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("SECRET_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,31 @@
+# tests/test_correction_queue.py
+import asyncio
+
+from app.services.correction_queue import CorrectionWorkerPool
+
+
+async def _noop(*args):
+    pass
+
+
+def test_wait_for_unseen_job_leaves_no_event():
+    pool = CorrectionWorkerPool(_noop, _noop)
+
+    async def wait():
+        await asyncio.gather(pool.wait_for(1, 0.01), pool.wait_for(1, 0.02), pool.wait_for(2, 0.01))
+
+    asyncio.run(wait())
+    assert pool._events == {}
+
+
+def test_notify_wakes_every_waiter():
+    pool = CorrectionWorkerPool(_noop, _noop)
+
+    async def wait():
+        waiters = [asyncio.create_task(pool.wait_for(1, 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        pool._notify(1)
+        await asyncio.wait_for(asyncio.gather(*waiters), 1)
+
+    asyncio.run(wait())
+    assert pool._events == {}
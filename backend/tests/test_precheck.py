@@ -0,0 +1,96 @@
+# tests/test_precheck.py
+import pytest
+
+from app.core.config import settings
+from app.services.precheck import CLEAN, Prechecker
+
+# Learner errors the pre-check must never let skip the LLM
+LEARNER_ERRORS = [
+    "She don't like apples.",
+    "He don't want to go.",
+    "They was happy.",
+    "We was at home.",
+    "You is my friend.",
+    "I has a dog.",
+    "I is very tired.",
+    "He have a car.",
+    "She go to work every day.",
+    "It are a good day.",
+    "I go to school yesterday.",
+    "Yesterday I go to the park.",
+    "We see a movie last night.",
+    "I visit my family two weeks ago.",
+    "I can to swim.",
+    "You should to call her.",
+    "He will goes home.",
+    "She can plays the piano.",
+    "Me and him goes to the park.",
+    "Him and me are friends.",
+    "I am agree with you.",
+    "I didn't went to work.",
+    "People is nice here.",
+    "This is more better.",
+    "Can you explain me the rule?",
+    "I have 20 years.",
+    "I goed to the park.",
+    "She has two childs.",
+    "I need some informations.",
+    "i like coffee.",
+]
+
+# Correct sentences the rules must not flag
+CORRECT = [
+    "I was happy.",
+    "I went to school yesterday.",
+    "She likes music.",
+    "I can swim.",
+    "If I were you, I would wait.",
+    "They were tired after work.",
+    "It was a great day.",
+]
+
+
+@pytest.fixture
+def prechecker(monkeypatch):
+    # Worst case: nothing is shadowed, every "clean" decision skips the LLM
+    monkeypatch.setattr(settings, "PRECHECK_ENABLED", True)
+    monkeypatch.setattr(settings, "PRECHECK_SHADOW_RATE", 0.0)
+    return Prechecker()
+
+
+@pytest.mark.parametrize("text", LEARNER_ERRORS)
+def test_learner_errors_are_not_skipped(prechecker, text):
+    result = prechecker.check(text)
+    assert not result.skip_llm, result
+    assert result.decision != CLEAN
+
+
+@pytest.mark.parametrize("text", CORRECT)
+def test_correct_sentences_match_no_rule(prechecker, text):
+    result = prechecker.check(text)
+    assert result.decision == CLEAN, result
+
+
+def test_clean_precision(prechecker):
+    # Precision of "clean" on the labelled sentences backs the default shadow rate:
+    # every tweet it lets skip the LLM must be correct
+    clean = [text for text in LEARNER_ERRORS + CORRECT if prechecker.check(text).decision == CLEAN]
+    assert clean == CORRECT
+
+
+def test_default_skips_most_clean_tweets(monkeypatch):
+    monkeypatch.setattr(settings, "PRECHECK_ENABLED", True)
+    assert 0.0 < settings.PRECHECK_SHADOW_RATE < 1.0
+    checker = Prechecker()
+    results = [checker.check("It was a great day.") for _ in range(1000)]
+    assert all(result.decision == CLEAN for result in results)
+    skipped = sum(result.skip_llm for result in results)
+    assert 0.8 < skipped / len(results) < 0.98
+
+
+def test_shadow_mode_skips_nothing(monkeypatch):
+    monkeypatch.setattr(settings, "PRECHECK_ENABLED", True)
+    monkeypatch.setattr(settings, "PRECHECK_SHADOW_RATE", 1.0)
+    result = Prechecker().check("It was a great day.")
+    assert result.decision == CLEAN
+    assert not result.skip_llm
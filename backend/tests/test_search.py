@@ -0,0 +1,43 @@
+# tests/test_search.py
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.tweet_store import SqlTweetStore
+
+
+class RecordingSession:
+    """
+    Session of a Postgres bind that records statements and returns no rows
+    """
+
+    def __init__(self):
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+        self.statements = []
+
+    async def execute(self, statement, *args):
+        self.statements.append(statement)
+        return []
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_postgres_search_ranks_and_highlights_with_the_index():
+    session = RecordingSession()
+    assert asyncio.run(SqlTweetStore(session).search(7, "went school", 20, after=(0.5, 42))) == []
+    [statement] = session.statements
+    sql = " ".join(_sql(statement).split())
+
+    query = "websearch_to_tsquery('english'::regconfig, 'went school')"
+    # Page: the user's matches, served by ix_tweet_user_id_search_vector and ordered by rank
+    assert f"tweet.search_vector @@ {query}" in sql
+    assert "tweet.user_id = 7" in sql
+    assert f"ts_rank(tweet.search_vector, {query})" in sql
+    assert "(ts_rank(" in sql and "tweet.id) < (CAST(0.5 AS REAL), 42)" in sql
+    assert "LIMIT 20" in sql
+    # Highlights only for the rows of the page
+    for field in ("original_text", "corrected_text", "explanation"):
+        assert f"ts_headline('english'::regconfig, coalesce(tweet.{field}, ''), {query}" in sql
@@ -0,0 +1,159 @@
+# tests/test_streaming.py
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.routers import tweets
+from app.services import openai_service
+from app.services.json_stream import FIELD_DELTA, FIELD_END, JsonFieldStreamer
+from app.simple_auth import get_current_user
+
+ORIGINAL = "She go to school yesterday."
+COMPLETE = '{"corrected_text": "She went to school yesterday.", "explanation": "Use the past tense."}'
+# Cut off by max_tokens inside the explanation
+TRUNCATED = '{"corrected_text": "She went to school yesterday.", "explanation": "Use the pa'
+# Not the JSON object asked for
+MALFORMED = 'She went to school yesterday. {"corrected_text: "She went'
+
+
+def _chunks(answer, size=7, finish_reason="stop"):
+    pieces = [answer[i:i + size] for i in range(0, len(answer), size)]
+    chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=p), finish_reason=None)]) for p in pieces]
+    chunks.append(SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason=finish_reason)]))
+    return chunks
+
+
+class FakeClient:
+    def __init__(self, answer, finish_reason):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self._chunks = _chunks(answer, finish_reason=finish_reason)
+
+    async def create(self, **request):
+        async def stream():
+            for chunk in self._chunks:
+                yield chunk
+        return stream()
+
+
+@pytest.fixture
+def cached(monkeypatch):
+    """
+    Model answers are served by a fake client; returns what was written to the cache
+    """
+    writes = []
+
+    async def get(key):
+        return None
+
+    async def set(key, value):
+        writes.append(value)
+
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test")
+    monkeypatch.setattr(settings, "OPENAI_CIRCUIT_ENABLED", False)
+    monkeypatch.setattr(openai_service.correction_cache, "get", get)
+    monkeypatch.setattr(openai_service.correction_cache, "set", set)
+    return writes
+
+
+def _answer(monkeypatch, answer, finish_reason="stop"):
+    monkeypatch.setattr(openai_service, "get_client", lambda: FakeClient(answer, finish_reason))
+
+
+def _stream(text):
+    async def collect():
+        return [event async for event in openai_service.stream_correction(text)]
+    return asyncio.run(collect())
+
+
+def _feed(parser, answer, size=5):
+    events = []
+    for i in range(0, len(answer), size):
+        events.extend(parser.feed(answer[i:i + size]))
+    return events
+
+
+def test_parser_emits_fields_across_chunks():
+    parser = JsonFieldStreamer()
+    events = _feed(parser, COMPLETE)
+    assert "".join(value for kind, key, value in events if kind == FIELD_DELTA and key == "explanation") == "Use the past tense."
+    assert (FIELD_END, "corrected_text", "She went to school yesterday.") in events
+    assert parser.fields == {"corrected_text": "She went to school yesterday.", "explanation": "Use the past tense."}
+
+
+def test_parser_leaves_truncated_field_incomplete():
+    parser = JsonFieldStreamer()
+    _feed(parser, TRUNCATED)
+    assert parser.fields == {"corrected_text": "She went to school yesterday."}
+
+
+def test_parser_finds_no_field_in_malformed_answer():
+    parser = JsonFieldStreamer()
+    _feed(parser, MALFORMED)
+    assert "corrected_text" not in parser.fields
+    assert "explanation" not in parser.fields
+
+
+def test_stream_correction_complete(monkeypatch, cached):
+    _answer(monkeypatch, COMPLETE)
+    events = _stream(ORIGINAL)
+    assert events[0] == ("corrected", "She went to school yesterday.")
+    assert events[-1] == ("done", ("She went to school yesterday.", "Use the past tense."))
+    assert cached == [("She went to school yesterday.", "Use the past tense.")]
+
+
+@pytest.mark.parametrize("answer,finish_reason", [(TRUNCATED, "length"), (MALFORMED, "stop")])
+def test_stream_correction_incomplete_answer_is_an_error(monkeypatch, cached, answer, finish_reason):
+    _answer(monkeypatch, answer, finish_reason)
+    errors = openai_service.LLM_ERRORS.labels("stream", settings.OPENAI_MODEL).value
+    events = _stream(ORIGINAL)
+    kinds = [kind for kind, _ in events]
+    assert "error" in kinds
+    assert kinds[-1] == "done"
+    assert events[-1][1][0] == ORIGINAL
+    assert cached == []
+    assert openai_service.LLM_ERRORS.labels("stream", settings.OPENAI_MODEL).value == errors + 1
+
+
+def _sse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+@pytest.fixture
+def client(monkeypatch, cached):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(settings, "TWEET_STORE", "memory")
+    app = FastAPI()
+    app.include_router(tweets.router, prefix="/tweets")
+    app.dependency_overrides[get_current_user] = lambda: {"id": 1}
+    return TestClient(app)
+
+
+def test_stream_route_truncated_answer(monkeypatch, client, cached):
+    _answer(monkeypatch, TRUNCATED, "length")
+    response = client.post("/tweets/stream", json={"original_text": ORIGINAL})
+    assert response.status_code == 200
+    events = _sse_events(response.text)
+    # The partial explanation was already streamed; the error tells the client to drop it
+    assert [event for event, _ in events][-2:] == ["error", "done"]
+    assert events[0][0] == "corrected"
+    assert events[-1][1]["explanation"].startswith("Could not process correction")
+    assert cached == []
+
+
+def test_stream_route_complete_answer(monkeypatch, client, cached):
+    _answer(monkeypatch, COMPLETE)
+    response = client.post("/tweets/stream", json={"original_text": ORIGINAL})
+    events = _sse_events(response.text)
+    assert events[0] == ("corrected", {"corrected_text": "She went to school yesterday."})
+    assert events[-1][0] == "done"
+    assert events[-1][1]["corrected_text"] == "She went to school yesterday."
+    assert events[-1][1]["explanation"] == "Use the past tense."
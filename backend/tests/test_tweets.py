@@ -0,0 +1,65 @@
+# tests/test_tweets.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.routers import tweets
+from app.services.openai_service import PRECHECK_EXPLANATION
+from app.services.tweet_store import memory_store
+from app.simple_auth import get_current_user
+
+CLEAN_TEXT = "It was a great day."
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """
+    Texts sent to the LLM; its answer fixes the first letter to lower case
+    """
+    calls = []
+
+    async def correct_tweet(text, raise_errors=False):
+        calls.append(text)
+        return text.lower(), "Corrected."
+
+    monkeypatch.setattr(tweets, "correct_tweet", correct_tweet)
+    return calls
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(settings, "TWEET_STORE", "memory")
+    monkeypatch.setattr(settings, "PRECHECK_ENABLED", True)
+    app = FastAPI()
+    app.include_router(tweets.router, prefix="/tweets")
+    app.dependency_overrides[get_current_user] = lambda: {"id": 1}
+    return TestClient(app)
+
+
+def test_create_tweet_skips_llm_for_clean_text(monkeypatch, client, llm_calls):
+    monkeypatch.setattr(settings, "PRECHECK_SHADOW_RATE", 0.0)
+    skipped = tweets.prechecker.llm_calls_skipped
+    response = client.post("/tweets/?mode=sync", json={"original_text": CLEAN_TEXT})
+    assert response.status_code == 200
+    tweet = response.json()
+    assert tweet["corrected_text"] == CLEAN_TEXT
+    assert tweet["explanation"] == PRECHECK_EXPLANATION
+    assert llm_calls == []
+    assert tweets.prechecker.llm_calls_skipped == skipped + 1
+    assert memory_store._tweets[tweet["id"]]["explanation"] == PRECHECK_EXPLANATION
+
+
+def test_create_tweet_in_shadow_mode_calls_llm(monkeypatch, client, llm_calls):
+    monkeypatch.setattr(settings, "PRECHECK_SHADOW_RATE", 1.0)
+    response = client.post("/tweets/?mode=sync", json={"original_text": CLEAN_TEXT})
+    assert response.json()["explanation"] == "Corrected."
+    assert llm_calls == [CLEAN_TEXT]
+
+
+def test_create_tweet_sends_learner_errors_to_llm(monkeypatch, client, llm_calls):
+    monkeypatch.setattr(settings, "PRECHECK_SHADOW_RATE", 0.0)
+    response = client.post("/tweets/?mode=sync", json={"original_text": "She don't like apples."})
+    assert response.json()["explanation"] == "Corrected."
+    assert llm_calls == ["She don't like apples."]
@@ -85,7 +85,8 @@ export function useTweets() {
             'Content-Type': 'application/json',
             'Authorization': `Bearer ${token}`,
           },
-          cache: 'no-store',
+          // Revalidate every time: the browser sends If-None-Match and reuses its copy on a 304
+          cache: 'no-cache',
           signal: controller.signal
         });
         
@@ -151,7 +152,8 @@ export function useTweets() {
             'Content-Type': 'application/json',
             'Authorization': `Bearer ${token}`,
           },
-          cache: 'no-store',
+          // Revalidate every time: the browser sends If-None-Match and reuses its copy on a 304
+          cache: 'no-cache',
           signal: controller.signal
         });
         